@@ -0,0 +1,297 @@
+from cfg import parse_instr
+import json
+import mmap
+import struct
+import sys
+
+# == Machine-readable artifacts: tokens, symbols and IR as records ===
+# Two encodings of the same records, selected with --format:
+#
+# jsonl: a header line {"artifact": kind, "schema": version, "fields": [...]},
+#   then one JSON object per record.
+#
+# bin: little-endian, for mmap and random access.
+#   HEADER                 see below; records_offset etc. are file offsets
+#   records                record_count fixed-width records of record_size bytes
+#   pool                   pool_count u32s: the elements of the array fields
+#   strings                UTF-8 string table
+#   A str field is (offset, length) into the string table; a u32[] field is
+#   (index, count) into the pool and a str[] field is (index, count) pairs of
+#   pool entries, each an (offset, length) string reference.
+#
+# A schema lists the fields of a kind of record. Its version changes whenever
+# the fields do; readers reject versions they do not know.
+
+MAGIC = b'MCCA'
+CONTAINER_VERSION = 1
+HEADER = struct.Struct('<4sHH16sIIQQQQQ')
+FIELD_FORMATS = {'str': 'II', 'u32': 'I', 'u32[]': 'II', 'str[]': 'II'}
+
+SCHEMAS = {
+    'tokens': (1, [('type', 'str'), ('value', 'str'), ('line', 'u32'), ('column', 'u32')]),
+    'symbols': (1, [('token_no', 'u32'), ('data_type', 'str'), ('token_type', 'str'),
+                    ('name', 'str'), ('lines', 'u32[]'), ('dimension', 'u32'),
+                    ('address', 'u32')]),
+    # One record per IR line; absent parts are ''. text is the line itself.
+    'ir': (1, [('function', 'str'), ('kind', 'str'), ('dest', 'str'), ('op', 'str'),
+               ('args', 'str[]'), ('target', 'str'), ('text', 'str')]),
+}
+
+# Reports that can be written as artifacts instead of text tables
+ARTIFACT_REPORTS = {
+    'lexical_output.txt': 'tokens',
+    'symbol_table_output.txt': 'symbols',
+    'intermediate_code_output.txt': 'ir',
+}
+REPORT_FORMATS = ('text', 'jsonl', 'bin')
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def record_struct(kind):
+    _, fields = SCHEMAS[kind]
+    return struct.Struct('<' + ''.join(FIELD_FORMATS[ftype] for _, ftype in fields))
+
+
+# == Records ===
+
+def token_records(tokens):
+    return [{'type': t['TYPE'], 'value': t['VALUE'], 'line': t['LINE'], 'column': t['COLUMN']}
+            for t in tokens]
+
+
+def symbol_records(symtab):
+    return [{'token_no': s.token_no, 'data_type': s.data_type, 'token_type': s.token_type,
+             'name': s.token_value, 'lines': list(s.line_of_code), 'dimension': s.dimension,
+             'address': s.address}
+            for s in symtab.table.values()]
+
+
+def ir_records(ir_lines):
+    records = []
+    function = ''
+    for line in ir_lines:
+        ins = parse_instr(line)
+        if ins.kind == 'label' and ins.dest.startswith('FUNC_'):
+            function = ins.dest[len('FUNC_'):]
+        records.append({'function': function, 'kind': ins.kind, 'dest': ins.dest or '',
+                        'op': ins.op or '', 'args': list(ins.args), 'target': ins.target or '',
+                        'text': line.rstrip('\n')})
+        if ins.kind == 'label' and ins.dest == f"END_FUNC_{function}":
+            function = ''
+    return records
+
+
+# == Writers ===
+
+def dump_jsonl(kind, records):
+    """Text of a .jsonl artifact."""
+    version, fields = SCHEMAS[kind]
+    out = [json.dumps({'artifact': kind, 'schema': version,
+                       'fields': [name for name, _ in fields]}) + '\n']
+    out.extend(json.dumps(r) + '\n' for r in records)
+    return "".join(out)
+
+
+def dump_binary(kind, records):
+    """Bytes of a .bin artifact."""
+    version, fields = SCHEMAS[kind]
+    packer = record_struct(kind)
+    strings = {}        # text -> (offset, length)
+    blob = bytearray()
+    pool = []
+
+    def ref(text):
+        if text not in strings:
+            data = text.encode('utf-8')
+            strings[text] = (len(blob), len(data))
+            blob.extend(data)
+        return strings[text]
+
+    body = bytearray()
+    for r in records:
+        values = []
+        for name, ftype in fields:
+            value = r[name]
+            if ftype == 'str':
+                values.extend(ref(value))
+            elif ftype == 'u32':
+                values.append(value)
+            elif ftype == 'u32[]':
+                values += [len(pool), len(value)]
+                pool.extend(value)
+            else:
+                values += [len(pool), len(value)]
+                for item in value:
+                    pool.extend(ref(item))
+        body += packer.pack(*values)
+
+    records_offset = HEADER.size
+    pool_offset = records_offset + len(body)
+    strings_offset = pool_offset + 4 * len(pool)
+    header = HEADER.pack(MAGIC, CONTAINER_VERSION, version, kind.encode(), packer.size,
+                         len(records), records_offset, pool_offset, len(pool),
+                         strings_offset, len(blob))
+    return b"".join([header, bytes(body), struct.pack(f'<{len(pool)}I', *pool), bytes(blob)])
+
+
+def render_artifact(kind, result, fmt):
+    """The kind artifact of a CompileResult in format fmt ('jsonl' or 'bin')."""
+    if kind == 'tokens':
+        records = token_records(result.tokens)
+    elif kind == 'symbols':
+        records = symbol_records(result.symtab)
+    else:
+        records = ir_records(result.ir)
+    return dump_jsonl(kind, records) if fmt == 'jsonl' else dump_binary(kind, records)
+
+
+# == Loaders ===
+
+class BinaryArtifact:
+    """A .bin artifact, memory-mapped. Records are decoded when indexed, so
+    opening a file and reading record i costs the same whatever its size."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ArtifactError(f"{path}: empty file")
+        try:
+            self.read_header(path)
+        except ArtifactError:
+            self.close()
+            raise
+
+    def read_header(self, path):
+        if len(self.map) < HEADER.size:
+            raise ArtifactError(f"{path}: not an artifact file")
+        (magic, container, self.schema_version, kind, self.record_size, self.count,
+         self.records_offset, self.pool_offset, _, self.strings_offset,
+         _) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or container != CONTAINER_VERSION:
+            raise ArtifactError(f"{path}: not a version {CONTAINER_VERSION} artifact file")
+        self.kind = kind.rstrip(b'\0').decode('ascii', 'replace')
+        check_schema(path, self.kind, self.schema_version)
+        self.fields = SCHEMAS[self.kind][1]
+        self.struct = record_struct(self.kind)
+        if self.struct.size != self.record_size:
+            raise ArtifactError(f"{path}: record size {self.record_size}, "
+                                f"expected {self.struct.size}")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("artifact record index out of range")
+        values = self.struct.unpack_from(self.map, self.records_offset + index * self.record_size)
+        record = {}
+        at = 0
+        for name, ftype in self.fields:
+            if ftype == 'u32':
+                record[name] = values[at]
+                at += 1
+                continue
+            first, second = values[at], values[at + 1]
+            at += 2
+            if ftype == 'str':
+                record[name] = self.string(first, second)
+            elif ftype == 'u32[]':
+                record[name] = list(self.pool(first, second))
+            else:
+                pairs = self.pool(first, 2 * second)
+                record[name] = [self.string(pairs[i], pairs[i + 1])
+                                for i in range(0, len(pairs), 2)]
+        return record
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.map[start:start + length].decode('utf-8')
+
+    def pool(self, index, count):
+        return struct.unpack_from(f'<{count}I', self.map, self.pool_offset + 4 * index)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlArtifact:
+    """A .jsonl artifact, read into memory; same interface as BinaryArtifact."""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+                self.kind, self.schema_version = header['artifact'], header['schema']
+            except (ValueError, TypeError, KeyError):
+                raise ArtifactError(f"{path}: not a JSONL artifact file")
+            check_schema(path, self.kind, self.schema_version)
+            self.fields = SCHEMAS[self.kind][1]
+            self.records = [json.loads(line) for line in f]
+        self.count = len(self.records)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_schema(path, kind, version):
+    if kind not in SCHEMAS:
+        raise ArtifactError(f"{path}: unknown artifact kind {kind!r}")
+    if version != SCHEMAS[kind][0]:
+        raise ArtifactError(f"{path}: {kind} schema version {version}, "
+                            f"this compiler reads version {SCHEMAS[kind][0]}")
+
+
+def open_artifact(path):
+    """Open a .bin or .jsonl artifact (told apart by content, not name)."""
+    with open(path, 'rb') as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    return BinaryArtifact(path) if binary else JsonlArtifact(path)
+
+
+if __name__ == '__main__':
+    # Usage: python artifacts.py FILE [INDEX]  - print the records as JSON lines
+    try:
+        with open_artifact(sys.argv[1]) as artifact:
+            print(f"# {artifact.kind} schema {artifact.schema_version}, {len(artifact)} record(s)")
+            if len(sys.argv) > 2:
+                print(json.dumps(artifact[int(sys.argv[2])]))
+            else:
+                for record in artifact:
+                    print(json.dumps(record))
+    except (OSError, ArtifactError, IndexError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,299 +1,430 @@
-import re
-
-class AssemblyGenerator:
-    def __init__(self):
-        self.reg_count = 0
-        self.label_count = 0
-        self.asm_code = []
-        
-        # Operation mapping from IR to assembly
-        self.op_map = {
-            '+': 'ADD',
-            '-': 'SUB', 
-            '*': 'MUL',
-            '/': 'DIV',
-            '%': 'MOD',
-            '&&': 'AND',
-            '||': 'OR',
-            '==': 'CMP_EQ',
-            '!=': 'CMP_NE',
-            '<': 'CMP_LT',
-            '>': 'CMP_GT',
-            '<=': 'CMP_LE',
-            '>=': 'CMP_GE'
-        }
-
-    def new_reg(self):
-        """Generate a new register name."""
-        self.reg_count += 1
-        return f"R{self.reg_count}"
-
-    def new_asm_label(self):
-        """Generate a new assembly label."""
-        self.label_count += 1
-        return f"LABEL{self.label_count}"
-
-    def emit(self, line):
-        """Emit an assembly instruction."""
-        self.asm_code.append("    " + line)
-
-    def emit_label(self, line):
-        """Emit a label (without indentation)."""
-        self.asm_code.append(line)
-
-    def comment(self, text):
-        """Emit a comment."""
-        self.emit(f"; {text}")
-
-    def generate_asm(self, ir_lines):
-        """Generate assembly code from intermediate code."""
-        self.asm_code = []
-        
-        self.emit_label("; Assembly Code Generation Output")
-        self.emit_label("; ===============================")
-        self.emit_label("")
-        
-        # Skip the header lines from IR
-        skip_header = True
-        
-        # Process each IR line
-        for line in ir_lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-                
-            # Skip IR header lines
-            if skip_header:
-                if line.startswith('# Intermediate Code Generation Output'):
-                    continue
-                elif line.startswith('# ==================================='):
-                    continue
-                elif line.startswith('#'):
-                    # Skip other header comments
-                    continue
-                else:
-                    skip_header = False
-            
-            # Process comments
-            if line.startswith('#'):
-                self.comment(line[1:].strip())
-                continue
-            
-            # Process different IR instructions
-            if self.process_function(line):
-                continue
-            elif self.process_label(line):
-                continue
-            elif self.process_return(line):
-                continue
-            elif self.process_if(line):
-                continue
-            elif self.process_goto(line):
-                continue
-            elif self.process_param(line):
-                continue
-            elif self.process_call(line):
-                continue
-            elif self.process_assignment(line):
-                continue
-            else:
-                self.comment(f"Unprocessed: {line}")
-
-        return self.asm_code
-
-    def process_function(self, line):
-        """Process function definition."""
-        if line.startswith('FUNC_') and line.endswith(':'):
-            func_name = line[:-1]
-            self.emit_label("")
-            self.emit_label(f"{func_name}:")
-            self.emit("PUSH BP")
-            self.emit("MOV BP, SP")
-            return True
-        elif line.startswith('END_FUNC_'):
-            func_name = line[:-1] if line.endswith(':') else line
-            self.emit("POP BP")
-            self.emit("RET")
-            return True
-        return False
-
-    def process_label(self, line):
-        """Process label definition."""
-        if line.endswith(':') and not line.startswith('FUNC_') and not line.startswith('END_FUNC_'):
-            self.emit_label(line)
-            return True
-        return False
-
-    def process_return(self, line):
-        """Process return statement."""
-        match = re.match(r'RETURN\s*(.*)$', line.strip())
-        if match:
-            value = match.group(1).strip()
-            if value:
-                # Return with value
-                self.emit(f"MOV R0, {value}")  # R0 is return value register
-            self.emit("POP BP")
-            self.emit("RET")
-            return True
-        return False
-
-    def process_if(self, line):
-        """Process conditional jump."""
-        match = re.match(r'IF\s+(\S+)\s+==\s+0\s+GOTO\s+(\S+)', line)
-        if match:
-            condition = match.group(1)
-            label = match.group(2)
-            
-            # Compare condition with 0 and jump if equal (false)
-            self.emit(f"CMP {condition}, 0")
-            self.emit(f"JE {label}")
-            return True
-        return False
-
-    def process_goto(self, line):
-        """Process unconditional jump."""
-        match = re.match(r'GOTO\s+(\S+)', line)
-        if match:
-            label = match.group(1)
-            self.emit(f"JMP {label}")
-            return True
-        return False
-
-    def process_param(self, line):
-        """Process parameter passing."""
-        match = re.match(r'PARAM\s+(\S+)', line)
-        if match:
-            param = match.group(1)
-            self.emit(f"PUSH {param}")
-            return True
-        return False
-
-    def process_call(self, line):
-        """Process function call."""
-        match = re.match(r'(\S+)\s*=\s*CALL\s+(\S+)', line)
-        if match:
-            result_var = match.group(1)
-            func_name = match.group(2)
-            
-            self.emit(f"CALL {func_name}")
-            self.emit(f"MOV {result_var}, R0")  # Get return value from R0
-            return True
-        return False
-
-    def process_assignment(self, line):
-        """Process assignment and binary operations."""
-        # Simple assignment: x = y
-        simple_match = re.match(r'(\S+)\s*=\s*(\S+)$', line)
-        if simple_match:
-            dest = simple_match.group(1)
-            src = simple_match.group(2)
-            self.emit(f"MOV {dest}, {src}")
-            return True
-        
-        # Binary operation: t1 = a + b
-        bin_match = re.match(r'(\S+)\s*=\s*(\S+)\s*([+\-*/%])\s*(\S+)', line)
-        if bin_match:
-            dest = bin_match.group(1)
-            left = bin_match.group(2)
-            op = bin_match.group(3)
-            right = bin_match.group(4)
-            
-            asm_op = self.op_map.get(op, op.upper())
-            
-            if asm_op.startswith('CMP_'):
-                # Comparison operations
-                cmp_label = self.new_asm_label()
-                end_label = self.new_asm_label()
-                self.emit(f"CMP {left}, {right}")
-                self.emit(f"MOV {dest}, 1")  # Set to true
-                self.emit(f"{asm_op[4:]} {cmp_label}")  # JE, JNE, etc.
-                self.emit(f"MOV {dest}, 0")
-                self.emit_label(f"{cmp_label}:")
-            else:
-                # Arithmetic operations
-                self.emit(f"MOV {dest}, {left}")
-                self.emit(f"{asm_op} {dest}, {right}")
-            
-            return True
-        
-        # Logical operations: t1 = a && b
-        logical_match = re.match(r'(\S+)\s*=\s*(\S+)\s*(&&|\|\|)\s*(\S+)', line)
-        if logical_match:
-            dest = logical_match.group(1)
-            left = logical_match.group(2)
-            op = logical_match.group(3)
-            right = logical_match.group(4)
-            
-            false_label = self.new_asm_label()
-            end_label = self.new_asm_label()
-            
-            if op == '&&':
-                # AND operation
-                self.emit(f"CMP {left}, 0")
-                self.emit(f"JE {false_label}")
-                self.emit(f"CMP {right}, 0")
-                self.emit(f"JE {false_label}")
-                self.emit(f"MOV {dest}, 1")
-                self.emit(f"JMP {end_label}")
-                self.emit_label(f"{false_label}:")
-                self.emit(f"MOV {dest}, 0")
-                self.emit_label(f"{end_label}:")
-            else:  # OR operation
-                self.emit(f"CMP {left}, 0")
-                self.emit(f"JNE {end_label}")
-                self.emit(f"CMP {right}, 0")
-                self.emit(f"JNE {end_label}")
-                self.emit(f"MOV {dest}, 0")
-                self.emit(f"JMP {end_label}")
-                self.emit_label(f"{end_label}:")
-                self.emit(f"MOV {dest}, 1")
-            
-            return True
-        
-        return False
-
-    def write_assembly(self, filename='assembly_output.asm'):
-        """Write assembly code to file."""
-        with open(filename, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write("; Assembly Code Generation Output\n")
-            f.write("; ===============================\n")
-            f.write("\n.DATA\n")
-            f.write("    ; Variable declarations would go here\n")
-            f.write("\n.CODE\n")
-            f.write("START:\n")
-            f.write("    ; Main program entry point\n")
-            f.write("    CALL FUNC_main\n")
-            f.write("    HLT\n")
-            f.write("\n")
-            
-            # Write generated assembly code
-            for line in self.asm_code:
-                f.write(line + "\n")
-        
-        print(f"Assembly code written to {filename}")
-
-def generate_asm_from_ir(ir_filename='intermediate_code_output.txt', 
-                        asm_filename='assembly_output.asm'):
-    """Generate assembly code from IR file."""
-    try:
-        # Read IR code
-        with open(ir_filename, 'r', encoding='utf-8') as f:
-            ir_lines = f.readlines()
-        
-        # Generate assembly
-        generator = AssemblyGenerator()
-        asm_code = generator.generate_asm(ir_lines)
-        generator.write_assembly(asm_filename)
-        
-        print(f"Successfully generated assembly code from {ir_filename}")
-        
-    except FileNotFoundError:
-        print(f"Error: Could not find {ir_filename}")
-    except Exception as e:
-        print(f"Error during assembly generation: {e}")
-
-if __name__ == '__main__':
+import re
+
+from peephole import PeepholeOptimizer
+from regalloc import allocate_registers
+from frame import ARG_REGISTERS, layout_frames
+
+# == Precompiled IR line patterns (used for lines the token dispatch does not recognise) ===
+RETURN_RE = re.compile(r'RETURN\s*(.*)$')
+IF_RE = re.compile(r'IF\s+(\S+)\s+(==|!=|<=|>=|<|>)\s+(\S+)\s+GOTO\s+(\S+)')
+GOTO_RE = re.compile(r'GOTO\s+(\S+)')
+PARAM_RE = re.compile(r'PARAM\s+(\S+)')
+CALL_RE = re.compile(r'(\S+)\s*=\s*CALL\s+(\S+)')
+SIMPLE_RE = re.compile(r'(\S+)\s*=\s*(\S+)$')
+BINARY_RE = re.compile(r'(\S+)\s*=\s*(\S+)\s*(==|!=|<=|>=|<|>|[+\-*/%])\s*(\S+)')
+LOGICAL_RE = re.compile(r'(\S+)\s*=\s*(\S+)\s*(&&|\|\|)\s*(\S+)')
+
+RELOPS = frozenset(('==', '!=', '<=', '>=', '<', '>'))
+BINARY_OPS = RELOPS | frozenset('+-*/%')
+
+# == Assembly file layout: ASM_FILE_HEADER, .DATA lines, ASM_STARTUP, functions ===
+ASM_FILE_HEADER = ["; Assembly Code Generation Output", "; ===============================", "", ".DATA"]
+ASM_STARTUP = ["", ".CODE", "START:", "    ; Main program entry point",
+               "    CALL FUNC_main", "    HLT", ""]
+NO_DATA = "    ; No global data"
+
+class AssemblyGenerator:
+    def __init__(self, frames=None, data=None, arg_registers=ARG_REGISTERS):
+        self.reg_count = 0
+        self.label_count = 0
+        self.asm_code = []
+        self.frames = frames or {}      # function name -> frame.Frame
+        self.data = data                # .DATA lines (None: no layout was done)
+        self.arg_registers = arg_registers
+        self.frame = None               # Frame of the function being translated
+        self.function = None            # and its name
+        self.arg_count = 0              # arguments passed so far for the next CALL
+        
+        # Operation mapping from IR to assembly
+        self.op_map = {
+            '+': 'ADD',
+            '-': 'SUB', 
+            '*': 'MUL',
+            '/': 'DIV',
+            '%': 'MOD',
+            '&&': 'AND',
+            '||': 'OR',
+            '==': 'CMP_EQ',
+            '!=': 'CMP_NE',
+            '<': 'CMP_LT',
+            '>': 'CMP_GT',
+            '<=': 'CMP_LE',
+            '>=': 'CMP_GE'
+        }
+        
+        # Conditional jump taken when the relation holds after CMP a, b
+        self.jump_map = {
+            '==': 'JE',
+            '!=': 'JNE',
+            '<': 'JL',
+            '>': 'JG',
+            '<=': 'JLE',
+            '>=': 'JGE'
+        }
+
+    def new_reg(self):
+        """Generate a new register name."""
+        self.reg_count += 1
+        return f"R{self.reg_count}"
+
+    def new_asm_label(self):
+        """Generate a new assembly label, numbered per function."""
+        self.label_count += 1
+        return f"{self.function}_LABEL{self.label_count}"
+
+    def emit(self, line):
+        """Emit an assembly instruction."""
+        self.asm_code.append("    " + line)
+
+    def emit_label(self, line):
+        """Emit a label (without indentation)."""
+        self.asm_code.append(line)
+
+    def comment(self, text):
+        """Emit a comment."""
+        self.emit(f"; {text}")
+
+    def generate_asm(self, ir_lines):
+        """Generate assembly code from intermediate code."""
+        self.asm_code = []
+        
+        self.emit_label("; Assembly Code Generation Output")
+        self.emit_label("; ===============================")
+        self.emit_label("")
+        
+        # Skip the header lines from IR
+        skip_header = True
+        
+        # Process each IR line
+        for line in ir_lines:
+            line = line.strip()
+            
+            # Skip empty lines
+            if not line:
+                continue
+                
+            # Skip IR header lines
+            if skip_header:
+                if line.startswith('# Intermediate Code Generation Output'):
+                    continue
+                elif line.startswith('# ==================================='):
+                    continue
+                elif line == 'Intermediate Code Generation Output:' or set(line) == {'='}:
+                    # Banner written by IRGenerator.write_output
+                    continue
+                else:
+                    skip_header = False
+            
+            # Process comments
+            if line.startswith('#'):
+                self.comment(line[1:].strip())
+                continue
+            
+            self.translate(line)
+
+        return self.asm_code
+
+    def translate(self, line):
+        """Translate one IR line, classifying it by its tokens in a single pass.
+
+        Lines that do not have one of the regular shapes produced by IRGenerator
+        go through the process_* handlers, which give the same result for
+        regular lines and define the behaviour for everything else.
+        """
+        if line[-1] == ':' or line.startswith('END_FUNC_'):
+            if not self.process_function(line):
+                self.emit_label(line)
+            return
+        if line.startswith('RETURN'):
+            self.process_return(line)
+            return
+        
+        parts = line.split()
+        count = len(parts)
+        head = parts[0]
+        if head == 'IF':
+            if count >= 6 and parts[2] in RELOPS and parts[4] == 'GOTO':
+                self.emit_conditional_jump(parts[1], parts[2], parts[3], parts[5])
+                return
+        elif head == 'GOTO':
+            if count >= 2:
+                self.emit(f"JMP {parts[1]}")
+                return
+        elif head == 'PARAM':
+            if count >= 2:
+                self.emit_argument(parts[1])
+                return
+        elif count >= 3 and parts[1] == '=':
+            if count == 3:
+                self.emit(f"MOV {head}, {parts[2]}")
+                return
+            if parts[2] == 'CALL':
+                self.emit_call(head, parts[3])
+                return
+            if count == 5 and parts[3] in BINARY_OPS:
+                self.emit_binary(head, parts[2], parts[3], parts[4])
+                return
+        self.translate_irregular(line)
+
+    def translate_irregular(self, line):
+        """Try every handler in turn (lines of unusual shape)."""
+        if self.process_function(line):
+            return
+        elif self.process_label(line):
+            return
+        elif self.process_return(line):
+            return
+        elif self.process_if(line):
+            return
+        elif self.process_goto(line):
+            return
+        elif self.process_param(line):
+            return
+        elif self.process_call(line):
+            return
+        elif self.process_assignment(line):
+            return
+        else:
+            self.comment(f"Unprocessed: {line}")
+
+    def process_function(self, line):
+        """Process function definition."""
+        if line.startswith('FUNC_') and line.endswith(':'):
+            func_name = line[:-1]
+            self.function = func_name[len('FUNC_'):]
+            self.label_count = 0
+            self.frame = self.frames.get(self.function)
+            self.emit_label("")
+            self.emit_label(f"{func_name}:")
+            if self.frame and self.frame.elided:
+                return True
+            self.emit("PUSH BP")
+            self.emit("MOV BP, SP")
+            if self.frame and self.frame.size:
+                self.emit(f"SUB SP, {self.frame.size}")
+            return True
+        elif line.startswith('END_FUNC_'):
+            func_name = line[:-1] if line.endswith(':') else line
+            self.emit_epilogue()
+            return True
+        return False
+
+    def process_label(self, line):
+        """Process label definition."""
+        if line.endswith(':') and not line.startswith('FUNC_') and not line.startswith('END_FUNC_'):
+            self.emit_label(line)
+            return True
+        return False
+
+    def process_return(self, line):
+        """Process return statement."""
+        match = RETURN_RE.match(line.strip())
+        if match:
+            value = match.group(1).strip()
+            if value:
+                # Return with value
+                self.emit(f"MOV R0, {value}")  # R0 is return value register
+            self.emit_epilogue()
+            return True
+        return False
+
+    def emit_epilogue(self):
+        """Release the stack slots (if any) and return, popping the stack arguments."""
+        frame = self.frame
+        if not (frame and frame.elided):
+            if frame and frame.size:
+                self.emit("MOV SP, BP")
+            self.emit("POP BP")
+        if frame and frame.arg_bytes:
+            self.emit(f"RET {frame.arg_bytes}")
+        else:
+            self.emit("RET")
+
+    def process_if(self, line):
+        """Process conditional jump."""
+        match = IF_RE.match(line)
+        if match:
+            self.emit_conditional_jump(*match.groups())
+            return True
+        return False
+
+    def emit_conditional_jump(self, left, relop, right, label):
+        """Compare and jump when the relation holds."""
+        self.emit(f"CMP {left}, {right}")
+        self.emit(f"{self.jump_map[relop]} {label}")
+
+    def process_goto(self, line):
+        """Process unconditional jump."""
+        match = GOTO_RE.match(line)
+        if match:
+            label = match.group(1)
+            self.emit(f"JMP {label}")
+            return True
+        return False
+
+    def process_param(self, line):
+        """Process parameter passing."""
+        match = PARAM_RE.match(line)
+        if match:
+            self.emit_argument(match.group(1))
+            return True
+        return False
+
+    def emit_argument(self, value):
+        """Pass the next argument of a call: in a register while there are any left."""
+        if self.arg_count < len(self.arg_registers):
+            self.emit(f"MOV {self.arg_registers[self.arg_count]}, {value}")
+        else:
+            self.emit(f"PUSH {value}")
+        self.arg_count += 1
+
+    def process_call(self, line):
+        """Process function call."""
+        match = CALL_RE.match(line)
+        if match:
+            self.emit_call(match.group(1), match.group(2))
+            return True
+        return False
+
+    def emit_call(self, result_var, func_name):
+        self.emit(f"CALL {func_name}")  # The callee pops its stack arguments
+        self.emit(f"MOV {result_var}, R0")  # Get return value from R0
+        self.arg_count = 0
+
+    def process_assignment(self, line):
+        """Process assignment and binary operations."""
+        # Simple assignment: x = y
+        simple_match = SIMPLE_RE.match(line)
+        if simple_match:
+            dest = simple_match.group(1)
+            src = simple_match.group(2)
+            self.emit(f"MOV {dest}, {src}")
+            return True
+        
+        # Binary operation: t1 = a + b
+        bin_match = BINARY_RE.match(line)
+        if bin_match:
+            self.emit_binary(*bin_match.groups())
+            return True
+        
+        # Logical operations: t1 = a && b
+        logical_match = LOGICAL_RE.match(line)
+        if logical_match:
+            dest = logical_match.group(1)
+            left = logical_match.group(2)
+            op = logical_match.group(3)
+            right = logical_match.group(4)
+            
+            false_label = self.new_asm_label()
+            end_label = self.new_asm_label()
+            
+            if op == '&&':
+                # AND operation
+                self.emit(f"CMP {left}, 0")
+                self.emit(f"JE {false_label}")
+                self.emit(f"CMP {right}, 0")
+                self.emit(f"JE {false_label}")
+                self.emit(f"MOV {dest}, 1")
+                self.emit(f"JMP {end_label}")
+                self.emit_label(f"{false_label}:")
+                self.emit(f"MOV {dest}, 0")
+                self.emit_label(f"{end_label}:")
+            else:  # OR operation
+                self.emit(f"CMP {left}, 0")
+                self.emit(f"JNE {end_label}")
+                self.emit(f"CMP {right}, 0")
+                self.emit(f"JNE {end_label}")
+                self.emit(f"MOV {dest}, 0")
+                self.emit(f"JMP {end_label}")
+                self.emit_label(f"{end_label}:")
+                self.emit(f"MOV {dest}, 1")
+            
+            return True
+        
+        return False
+
+    def emit_binary(self, dest, left, op, right):
+        """Binary operation: t1 = a + b"""
+        asm_op = self.op_map.get(op, op.upper())
+        
+        if asm_op.startswith('CMP_'):
+            # Comparison operations
+            cmp_label = self.new_asm_label()
+            self.emit(f"CMP {left}, {right}")
+            self.emit(f"MOV {dest}, 1")  # Set to true
+            self.emit(f"{self.jump_map[op]} {cmp_label}")  # JE, JNE, etc.
+            self.emit(f"MOV {dest}, 0")
+            self.emit_label(f"{cmp_label}:")
+        else:
+            # Arithmetic operations
+            self.emit(f"MOV {dest}, {left}")
+            self.emit(f"{asm_op} {dest}, {right}")
+
+    def format_assembly(self):
+        """Lines of the assembly file: header, .DATA, startup code, then the functions."""
+        lines = list(ASM_FILE_HEADER)
+        if self.data is None:
+            lines.append("    ; Variable declarations would go here")
+        elif not self.data:
+            lines.append(NO_DATA)
+        lines.extend(self.data or [])
+        lines += ASM_STARTUP
+        lines.extend(self.asm_code)
+        return lines
+
+    def write_assembly(self, filename='assembly_output.asm'):
+        """Write assembly code to file."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for line in self.format_assembly():
+                f.write(line + "\n")
+        
+        print(f"Assembly code written to {filename}")
+
+def compile_asm(ir_lines, peephole=False, registers=0, allocator='graph', return_types=None):
+    """Generate assembly from IR lines in memory.
+
+    registers > 0 allocates R1..R<registers> with the given allocator mode
+    ('graph' or 'linear') first. The frame layout then places everything else in
+    stack slots and .DATA; peephole=True runs the peephole optimizer over the
+    result. return_types gives the return types of functions that are called
+    but not in ir_lines. Returns the AssemblyGenerator holding the code and the
+    statistics of those passes, keyed by pass name.
+    """
+    stats = {}
+    if registers:
+        ir_lines, stats['regalloc'] = allocate_registers(ir_lines, registers, allocator)
+    ir_lines, frames, data, stats['frame'] = layout_frames(ir_lines, return_types=return_types)
+    
+    generator = AssemblyGenerator(frames, data)
+    asm_code = generator.generate_asm(ir_lines)
+    if peephole:
+        optimizer = PeepholeOptimizer()
+        generator.asm_code = optimizer.optimize(asm_code)
+        stats['peephole'] = optimizer.stats()
+    return generator, stats
+
+def generate_asm_from_ir(ir_filename='intermediate_code_output.txt', 
+                        asm_filename='assembly_output.asm', peephole=False,
+                        registers=0, allocator='graph'):
+    """Generate assembly code from IR file (see compile_asm for the options).
+
+    Returns the statistics of the passes that ran, keyed by pass name.
+    """
+    try:
+        # Read IR code
+        with open(ir_filename, 'r', encoding='utf-8') as f:
+            ir_lines = f.readlines()
+        
+        generator, stats = compile_asm(ir_lines, peephole, registers, allocator)
+        generator.write_assembly(asm_filename)
+        
+        print(f"Successfully generated assembly code from {ir_filename}")
+        return stats
+        
+    except FileNotFoundError:
+        print(f"Error: Could not find {ir_filename}")
+    except Exception as e:
+        print(f"Error during assembly generation: {e}")
+
+if __name__ == '__main__':
     generate_asm_from_ir()
\ No newline at end of file
@@ -1,90 +1,91 @@
-; Assembly Code Generation Output
-; ===============================
-
-.DATA
-    ; Variable declarations would go here
-
-.CODE
-START:
-    ; Main program entry point
-    CALL FUNC_main
-    HLT
-
-; Assembly Code Generation Output
-; ===============================
-
-Intermediate Code Generation Output:
-    MOV ================================================, =
-    ; Intermediate Code Generation Output
-    ; ===================================
-    ; Function: int main
-
-FUNC_main:
-    PUSH BP
-    MOV BP, SP
-    ; Declare int x
-    MOV x, 10
-    ; Declare float y
-    MOV y, 5.5
-    ; Declare int result
-    ; Unprocessed: t1 = x > 5
-    CMP t1, 0
-    JE L1
-    MOV t2, x
-    ADD t2, y
-    MOV result, t2
-    ; Expression: result
-    JMP L2
-L1:
-    MOV t3, x
-    SUB t3, y
-    MOV result, t3
-    ; Expression: result
-L2:
-L3:
-    ; Unprocessed: t4 = x > 0
-    CMP t4, 0
-    JE L4
-    MOV t5, x
-    SUB t5, 1
-    MOV x, t5
-    ; Expression: x
-    JMP L3
-L4:
-    MOV i, 0
-L5:
-    ; Unprocessed: t6 = i < 5
-    CMP t6, 0
-    JE L7
-    JMP L6
-L6:
-    MOV t7, result
-    ADD t7, i
-    MOV result, t7
-    ; Expression: result
-    MOV t8, i
-    ADD t8, 1
-    MOV i, t8
-    JMP L5
-L7:
-    MOV R0, result
-    POP BP
-    RET
-    POP BP
-    RET
-    ; Function: float calculate
-
-FUNC_calculate:
-    PUSH BP
-    MOV BP, SP
-    PUSH a
-    PUSH b
-    MOV t9, a
-    MUL t9, b
-    MOV t10, t9
-    ADD t10, 2.0
-    MOV R0, t10
-    POP BP
-    RET
-    POP BP
-    RET
+; Assembly Code Generation Output
+; ===============================
+
+.DATA
+    i DD 0
+    main_LC0 DQ 5.5
+    calculate_LC0 DQ 2.0
+
+.CODE
+START:
+    ; Main program entry point
+    CALL FUNC_main
+    HLT
+
+; Assembly Code Generation Output
+; ===============================
+
+    ; Function: int main()
+
+FUNC_main:
+    PUSH BP
+    MOV BP, SP
+    SUB SP, 24
+    ; Declare int x
+    MOV [BP-4], 10
+    ; Declare float y
+    MOV [BP-16], main_LC0
+    ; Declare int result
+    CMP [BP-4], 5
+    JLE main_L1
+    MOV [BP-24], [BP-4]
+    ADD [BP-24], [BP-16]
+    MOV [BP-8], [BP-24]
+    ; Expression: result
+    JMP main_L2
+main_L1:
+    MOV [BP-24], [BP-4]
+    SUB [BP-24], [BP-16]
+    MOV [BP-8], [BP-24]
+    ; Expression: result
+main_L2:
+main_L3:
+    CMP [BP-4], 0
+    JLE main_L4
+    MOV [BP-4], [BP-4]
+    SUB [BP-4], 1
+    MOV [BP-4], [BP-4]
+    ; Expression: x
+    JMP main_L3
+main_L4:
+    MOV i, 0
+main_L5:
+    CMP i, 5
+    JGE main_L7
+    JMP main_L6
+main_L6:
+    MOV [BP-4], [BP-8]
+    ADD [BP-4], i
+    MOV [BP-8], [BP-4]
+    ; Expression: result
+    MOV [BP-4], i
+    ADD [BP-4], 1
+    MOV i, [BP-4]
+    JMP main_L5
+main_L7:
+    MOV R0, [BP-8]
+    MOV SP, BP
+    POP BP
+    RET
+    MOV SP, BP
+    POP BP
+    RET
+    ; Function: float calculate(int a, float b)
+
+FUNC_calculate:
+    PUSH BP
+    MOV BP, SP
+    SUB SP, 8
+    ; Param int a in A1
+    ; Param float b in A2
+    MOV [BP-8], A1
+    MUL [BP-8], A2
+    MOV [BP-8], [BP-8]
+    ADD [BP-8], calculate_LC0
+    MOV R0, [BP-8]
+    MOV SP, BP
+    POP BP
+    RET
+    MOV SP, BP
+    POP BP
+    RET
@@ -0,0 +1,107 @@
+from compiler import CompileError, CompileOptions, compile_source
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import os
+import time
+
+
+class FileResult:
+    """Outcome of compiling one file in a batch."""
+
+    def __init__(self, path, out_dir, error=None, tokens=0, ir_lines=0, asm_lines=0,
+                 cache_stats=None):
+        self.path = path
+        self.out_dir = out_dir
+        self.error = error          # None on success, otherwise the message
+        self.tokens = tokens
+        self.ir_lines = ir_lines
+        self.asm_lines = asm_lines
+        self.cache_stats = cache_stats or {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def output_dirs(paths, out_root):
+    """Output directory of each input: its path relative to the inputs' common
+    directory, without the .c extension, under out_root (src/a/x.c -> out/a/x)."""
+    if not paths:
+        return []
+    parents = [os.path.dirname(os.path.abspath(p)) for p in paths]
+    common = os.path.commonpath(parents)
+    dirs = []
+    for p in paths:
+        rel = os.path.relpath(os.path.abspath(p), common)
+        dirs.append(os.path.join(out_root, os.path.splitext(rel)[0]))
+    return dirs
+
+
+def compile_file(job):
+    """Compile one (path, out_dir, options) job, writing its reports to out_dir.
+
+    Runs in a worker process, so it returns a FileResult instead of raising.
+    """
+    path, out_dir, options = job
+    options = copy.copy(options)
+    options.report_dir = out_dir
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError as e:
+        return FileResult(path, out_dir, f"{e.strerror}: {path}")
+    try:
+        result = compile_source(text, options)
+    except CompileError as e:
+        return FileResult(path, out_dir, f"{e.phase} failed: {e.message}")
+    except Exception as e:
+        return FileResult(path, out_dir, f"internal error: {type(e).__name__}: {e}")
+    return FileResult(path, out_dir, tokens=len(result.tokens), ir_lines=len(result.ir),
+                      asm_lines=len(result.asm), cache_stats=result.cache_stats)
+
+
+def compile_batch(paths, out_root, options=None, jobs=None):
+    """Compile many files, each into its own directory under out_root.
+
+    options.reports selects the reports written (default: all of them).
+    jobs worker processes (default: one per core) are started once and reused
+    for every file; files are handed out in chunks to keep the per-file
+    overhead small. jobs=1 compiles in this process. Returns the FileResults
+    in the order of paths, whichever worker finished first.
+    """
+    options = options or CompileOptions(reports=True)
+    jobs = jobs or os.cpu_count() or 1
+    work = [(p, d, options) for p, d in zip(paths, output_dirs(paths, out_root))]
+    if jobs == 1 or len(work) <= 1:
+        return [compile_file(job) for job in work]
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(compile_file, work, chunksize=chunksize))
+
+
+def run_batch(paths, out_root, options=None, jobs=None):
+    """Command-line batch driver: compile, print a summary and the errors.
+
+    Returns the exit status: 0 when every file compiled, 1 otherwise.
+    """
+    start = time.perf_counter()
+    results = compile_batch(paths, out_root, options, jobs)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if not r.ok]
+    print(f"Compiled {len(results) - len(failed)} of {len(results)} file(s) into {out_root} "
+          f"in {elapsed:.2f} s ({len(results) / elapsed if elapsed else 0:.1f} files/s, "
+          f"{jobs or os.cpu_count() or 1} job(s))")
+    cache = {}
+    for r in results:
+        for name, value in r.cache_stats.items():
+            cache[name] = cache.get(name, 0) + value
+    if cache:
+        print("  [cache] " + ", ".join(f"{k}: {v}" for k, v in cache.items()))
+    if failed:
+        print(f"\n{len(failed)} file(s) failed:")
+        for r in failed:
+            print(f"  {r.path}: {r.error}")
+    return 1 if failed else 0
+
@@ -0,0 +1,326 @@
+from lexer import tokenize
+from parser import Parser
+from ir_generator import IRGenerator
+from asm_generator import AssemblyGenerator
+from optimizer import optimize_ir
+from regalloc import allocate_registers
+from frame import ARG_REGISTERS, layout_frames
+from peephole import PeepholeOptimizer, parse_asm_line
+from simulator import Simulator
+from vm import BytecodeCompiler, VirtualMachine
+import os
+import sys
+import tempfile
+import time
+
+# A small program touching every kind of IR line the generator emits
+SAMPLE_PROGRAM = """
+int helper(int a, int b) {
+    int c;
+    c = a * b + a / 2 - b % 3;
+    if (c > 10 && a != b) {
+        c = c - 1;
+    } else {
+        c = c + 1;
+    }
+    return c;
+}
+
+int main() {
+    int i;
+    int s;
+    float f = 1.5;
+    s = 0;
+    for (i = 0; i < 100; i = i + 1) {
+        s = s + helper(i, s);
+        f = f * 2.0;
+        while (s > 1000 || s < 0) {
+            s = s / 2;
+        }
+    }
+    s = s - i;
+    return s;
+}
+"""
+
+
+# Nested loops with a little arithmetic and a branch, about a million instructions
+LOOP_PROGRAM = """
+int main() {
+    int i;
+    int j;
+    int s;
+    s = 0;
+    for (i = 0; i < 300; i = i + 1) {
+        for (j = 0; j < 300; j = j + 1) {
+            s = s + i * j % 7;
+            if (s > 100000) {
+                s = s - 100000;
+            }
+        }
+    }
+    return s;
+}
+"""
+
+# Recursion: calls, returns and frames dominate
+FIB_PROGRAM = """
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+int main() {
+    return fib(22);
+}
+"""
+
+# A data-dependent loop full of division, remainder and branches
+COLLATZ_PROGRAM = """
+int steps(int n) {
+    int count;
+    count = 0;
+    while (n != 1) {
+        if (n % 2 == 0) {
+            n = n / 2;
+        } else {
+            n = 3 * n + 1;
+        }
+        count = count + 1;
+    }
+    return count;
+}
+
+int main() {
+    int i;
+    int total;
+    total = 0;
+    for (i = 1; i < 3000; i = i + 1) {
+        total = total + steps(i);
+    }
+    return total;
+}
+"""
+
+VM_PROGRAMS = {
+    'loops': LOOP_PROGRAM,
+    'fib': FIB_PROGRAM,
+    'collatz': COLLATZ_PROGRAM,
+}
+
+
+def branchy_program(sections):
+    """One function of 6 * sections + 1 blocks: each section is an if/else and a while loop."""
+    lines = ["int main() {", "    int s;", "    int i;", "    int x;", "    s = 0;", "    x = 1;"]
+    for k in range(sections):
+        lines += [f"    int a{k};",
+                  f"    a{k} = x + {k};",
+                  f"    if (a{k} > s) {{ s = s + a{k}; }} else {{ s = s - 1; }}",
+                  "    i = 0;",
+                  f"    while (i < 3) {{ s = s + i * {k % 7 + 1}; i = i + 1; }}"]
+    lines += ["    return s;", "}"]
+    return "\n".join(lines) + "\n"
+
+
+# Straight-line code in which every function runs exactly once, so counting
+# the instructions of the listing counts the instructions executed
+CALL_PROGRAM = """
+int add3(int a, int b, int c) {
+    return a + b + c;
+}
+
+float scale(int a, float b) {
+    return a * b + 2.0;
+}
+
+int mix(int a, int b, int c, int d, int e, int f) {
+    return a - b + c - d + e - f;
+}
+
+int inc(int x) {
+    return x + 1;
+}
+
+int twice(int x) {
+    int y;
+    y = inc(x);
+    return y + y;
+}
+
+int main() {
+    int s;
+    float f;
+    s = add3(1, 2, 3);
+    f = scale(s, 1.5);
+    s = s + mix(s, 1, 2, 3, 4, 5);
+    s = s + twice(s);
+    return s;
+}
+"""
+
+# Instructions that read or write the stack besides their memory operands
+STACK_OPS = ('PUSH', 'POP', 'CALL', 'RET')
+
+
+def sample_ir(source=SAMPLE_PROGRAM):
+    """IR lines of a program (SAMPLE_PROGRAM by default)."""
+    program = Parser(tokenize(source)).parse()
+    irgen = IRGenerator(debug=False)
+    return irgen.generate(program)
+
+
+def compile_optimized(ir_lines, arg_registers=ARG_REGISTERS):
+    """Assembly of ir_lines through the -O pipeline, for a given calling convention."""
+    ir_lines, _ = optimize_ir(ir_lines)
+    ir_lines, _ = allocate_registers(ir_lines)
+    ir_lines, frames, data, _ = layout_frames(ir_lines, arg_registers)
+    asm = AssemblyGenerator(frames, data, arg_registers).generate_asm(ir_lines)
+    return PeepholeOptimizer().optimize(asm), data
+
+
+def memory_operations(asm_lines, data_lines):
+    """Memory accesses of a listing: stack operations plus frame slot and .DATA operands."""
+    labels = {line.split()[0] for line in data_lines}
+    count = 0
+    for line in asm_lines:
+        e = parse_asm_line(line)
+        if e.kind != 'code':
+            continue
+        if e.op in STACK_OPS:
+            count += 1
+        count += sum(1 for a in e.args if a.startswith('[') or a in labels)
+    return count
+
+
+def write_synthetic_ir(filename, line_count):
+    """Write an IR file of line_count lines by repeating the sample program."""
+    lines = sample_ir()
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("Intermediate Code Generation Output:\n")
+        f.write("=" * 50 + "\n\n")
+        written = 0
+        while written < line_count:
+            for line in lines[:line_count - written]:
+                f.write(line + "\n")
+            written += min(len(lines), line_count - written)
+
+
+def best_time(fn, repeat):
+    """Fastest of repeat runs of fn(), in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_asm(line_count=1_000_000, repeat=3):
+    """IR lines per second translated by AssemblyGenerator.generate_asm."""
+    fd, filename = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_synthetic_ir(filename, line_count)
+        with open(filename, 'r', encoding='utf-8') as f:
+            ir_lines = f.readlines()
+    finally:
+        os.remove(filename)
+
+    elapsed = best_time(lambda: AssemblyGenerator().generate_asm(ir_lines), repeat)
+    rate = len(ir_lines) / elapsed
+    print(f"  asm: {len(ir_lines):,} IR lines in {elapsed:.2f}s ({rate:,.0f} lines/s)")
+    return rate
+
+
+def bench_calls(line_count=None, repeat=None):
+    """Memory operations per call of CALL_PROGRAM with stack and register arguments.
+
+    The program is fixed, so line_count and repeat are ignored.
+    """
+    ir_lines = sample_ir(CALL_PROGRAM)
+    calls = sum(1 for line in ir_lines if ' CALL ' in line)
+    results = {}
+    for name, registers in (('stack arguments', ()), ('register arguments', ARG_REGISTERS)):
+        asm, data = compile_optimized(ir_lines, registers)
+        results[name] = memory_operations(asm, data)
+        print(f"  calls: {name}: {results[name]} memory operations, "
+              f"{results[name] / calls:.1f} per call ({calls} calls)")
+    return results
+
+
+def bench_simulator(line_count=None, repeat=3):
+    """Simulated instructions per second on the optimized LOOP_PROGRAM (line_count is ignored)."""
+    asm, data = compile_optimized(sample_ir(LOOP_PROGRAM))
+    simulator = Simulator(['.DATA'] + data + ['.CODE'] + asm)
+    result = simulator.run()
+    elapsed = best_time(simulator.run, repeat)
+    rate = result.instructions / elapsed
+    print(f"  simulator: {result.instructions:,} instructions, {result.cycles:,} cycles "
+          f"in {elapsed:.3f}s ({rate:,.0f} instructions/s)")
+    return rate
+
+
+def bench_vm(line_count=None, repeat=3):
+    """Bytecode VM instructions per second on VM_PROGRAMS, before and after optimize_ir.
+
+    Both versions of a program must return the same value; line_count is ignored.
+    """
+    rates = {}
+    for name, source in VM_PROGRAMS.items():
+        ir_lines = sample_ir(source)
+        results = []
+        for label, lines in (('plain', ir_lines), ('optimized', optimize_ir(ir_lines)[0])):
+            vm = VirtualMachine(BytecodeCompiler().compile(lines))
+            result = vm.run()
+            elapsed = best_time(vm.run, repeat)
+            rates[f"{name} {label}"] = result.instructions / elapsed
+            results.append(result.return_value)
+            print(f"  vm: {name} ({label}): returned {result.return_value}, "
+                  f"{result.instructions:,} instructions in {elapsed:.3f}s "
+                  f"({result.instructions / elapsed:,.0f} instructions/s)")
+        if results[0] != results[1]:
+            print(f"  vm: {name}: MISMATCH, optimized code returned {results[1]} instead of {results[0]}")
+    return rates
+
+
+def bench_blocks(line_count=None, repeat=3):
+    """Frame layout and optimize_ir time of one function with many blocks, at two sizes.
+
+    The function is branchy_program. A time that grows much more than twice
+    from the first size to the second points at a superlinear pass;
+    line_count is ignored.
+    """
+    times = {}
+    for sections in (120, 240):
+        ir_lines = sample_ir(branchy_program(sections))
+        for name, fn in (('frame layout', layout_frames), ('optimize_ir', optimize_ir)):
+            elapsed = best_time(lambda: fn(list(ir_lines)), repeat)
+            times[f"{name} {sections}"] = elapsed
+            print(f"  blocks: {name} of {6 * sections + 1} blocks in {elapsed:.3f}s")
+    return times
+
+
+BENCHMARKS = {
+    'asm': bench_asm,
+    'blocks': bench_blocks,
+    'calls': bench_calls,
+    'simulator': bench_simulator,
+    'vm': bench_vm,
+}
+
+
+if __name__ == '__main__':
+    # Usage: python benchmarks.py [name ...] [--lines N]
+    args = sys.argv[1:]
+    options = {}
+    if '--lines' in args:
+        at = args.index('--lines')
+        options['line_count'] = int(args[at + 1])
+        del args[at:at + 2]
+    print("Mini C Compiler - Benchmarks")
+    print("=" * 50)
+    for name in args or list(BENCHMARKS):
+        BENCHMARKS[name](**options)
@@ -0,0 +1,119 @@
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+DEFAULT_CACHE_DIR = '.minicc_cache'
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024     # bytes
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version():
+    """Hash of the compiler's own sources, so editing any pass invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(os.path.basename(path).encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """Content address of a phase's inputs: the compiler version and parts."""
+    digest = hashlib.sha256(compiler_version().encode())
+    for part in parts:
+        digest.update(b'\0' + str(part).encode())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """Artifacts of compiler phases on disk, addressed by the hash of their inputs.
+
+    Entries are pickled dicts at <directory>/<key[:2]>/<key>.<phase>. Writes go
+    to a temporary file that is renamed into place, so concurrent compilers in
+    other threads or processes only ever see whole entries. A hit refreshes the
+    entry's mtime; evict() removes the least recently used entries until the
+    directory fits in max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = {}          # phase -> count
+        self.misses = {}
+        self.written = 0        # bytes
+        self.evicted = 0        # entries
+
+    def path(self, phase, key):
+        return os.path.join(self.directory, key[:2], f"{key}.{phase}")
+
+    def get(self, phase, key):
+        """The entry stored for key, or None."""
+        path = self.path(phase, key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            entry = None
+        except Exception:
+            # Unreadable, corrupt or written by an incompatible compiler (unpickling
+            # can raise almost anything): a miss, and the entry is dropped
+            entry = None
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        counts = self.misses if entry is None else self.hits
+        counts[phase] = counts.get(phase, 0) + 1
+        return entry
+
+    def put(self, phase, key, entry):
+        path = self.path(phase, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.written += size
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if item.name.endswith('.tmp'):
+                    continue
+                try:
+                    st = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, item.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def stats(self):
+        return {'hits': sum(self.hits.values()), 'misses': sum(self.misses.values()),
+                'bytes written': self.written, 'entries evicted': self.evicted}
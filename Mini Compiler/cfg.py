@@ -0,0 +1,490 @@
+import re
+
+# == Operand classification ===
+NUMBER_RE = re.compile(r'^-?\d+(\.\d+)?([eE][+-]?\d+)?$')
+TEMP_RE = re.compile(r'^t\d+$')
+HEADER_RE = re.compile(r'#\s*Function:\s*(\w+)\s+(\w+)\s*(?:\((.*)\))?')
+DECLARE_RE = re.compile(r'#\s*Declare\s+(\w+)\s+(\w+)')
+
+COMMUTATIVE_OPS = ('+', '*', '==', '!=', '&&', '||')
+RELATIONAL_OPS = ('==', '!=', '<', '>', '<=', '>=')
+UNARY_OPS = ('-', '+', '!')
+
+# Negation and operand-swap of relational operators
+NEGATED_RELOP = {'==': '!=', '!=': '==', '<': '>=', '>=': '<', '>': '<=', '<=': '>'}
+SWAPPED_RELOP = {'==': '==', '!=': '!=', '<': '>', '>': '<', '<=': '>=', '>=': '<='}
+
+
+def is_const(operand):
+    """Check whether an IR operand is a numeric literal."""
+    return bool(NUMBER_RE.match(operand))
+
+
+def is_temp(operand):
+    """Check whether an IR operand is a compiler temporary (t1, t2, ...)."""
+    return bool(TEMP_RE.match(operand))
+
+
+def is_name(operand):
+    """Check whether an IR operand names a variable or temporary."""
+    return bool(operand) and not is_const(operand)
+
+
+class Instr:
+    """One line of intermediate code in structured form."""
+
+    __slots__ = ('kind', 'dest', 'op', 'args', 'target', 'text')
+
+    def __init__(self, kind, dest=None, op=None, args=(), target=None, text=None):
+        self.kind = kind        # copy, binary, unary, cast, call, param, arg, if, goto, return, label, phi, comment, blank
+        self.dest = dest        # defined name (or label name for 'label')
+        self.op = op            # operator, cast type or called function
+        self.args = list(args)  # operands read by the instruction
+        self.target = target    # jump target label
+        self.text = text        # raw text for comments and unrecognised lines
+
+    def uses(self):
+        """Names read by this instruction."""
+        if self.kind in ('copy', 'binary', 'unary', 'cast', 'arg', 'if', 'return', 'phi'):
+            return [a for a in self.args if is_name(a)]
+        return []
+
+    def defs(self):
+        """Names written by this instruction."""
+        if self.kind in ('copy', 'binary', 'unary', 'cast', 'call', 'param', 'phi'):
+            return [self.dest]
+        return []
+
+    def is_pure(self):
+        """True for side-effect free computations that may be removed or reused."""
+        return self.kind in ('copy', 'binary', 'unary', 'cast')
+
+    def is_jump(self):
+        return self.kind in ('if', 'goto')
+
+    def ends_block(self):
+        return self.kind in ('if', 'goto', 'return')
+
+    def is_code(self):
+        """False for comments and blank lines."""
+        return self.kind not in ('comment', 'blank')
+
+    def render(self):
+        """Format the instruction exactly as IRGenerator emits it."""
+        k = self.kind
+        if k == 'copy':
+            return f"    {self.dest} = {self.args[0]}"
+        if k == 'binary':
+            return f"    {self.dest} = {self.args[0]} {self.op} {self.args[1]}"
+        if k == 'unary':
+            return f"    {self.dest} = {self.op}{self.args[0]}"
+        if k == 'cast':
+            return f"    {self.dest} = ({self.op}) {self.args[0]}"
+        if k == 'call':
+            return f"    {self.dest} = CALL {self.op}"
+        if k == 'param':
+            return f"    PARAM {self.dest}"
+        if k == 'arg':
+            return f"    PARAM {self.args[0]}"
+        if k == 'if':
+            return f"    IF {self.args[0]} {self.op} {self.args[1]} GOTO {self.target}"
+        if k == 'goto':
+            return f"    GOTO {self.target}"
+        if k == 'return':
+            return f"    RETURN {self.args[0]}" if self.args else "    RETURN"
+        if k == 'label':
+            return f"{self.dest}:"
+        if k == 'phi':
+            return f"    {self.dest} = PHI({', '.join(self.args)})"
+        return self.text
+
+    def copy(self):
+        return Instr(self.kind, self.dest, self.op, self.args, self.target, self.text)
+
+    def __repr__(self):
+        return f"Instr({self.render().strip()!r})"
+
+
+def parse_instr(line):
+    """Parse one IR line (as produced by IRGenerator) into an Instr."""
+    raw = line.rstrip('\n')
+    s = raw.strip()
+    if not s:
+        return Instr('blank', text=raw)
+    if s.startswith('#'):
+        return Instr('comment', text=raw)
+    if s.endswith(':') and ' ' not in s:
+        return Instr('label', dest=s[:-1])
+
+    parts = s.split()
+    head = parts[0]
+    if head == 'GOTO' and len(parts) == 2:
+        return Instr('goto', target=parts[1])
+    if head == 'IF' and len(parts) == 6 and parts[4] == 'GOTO':
+        return Instr('if', op=parts[2], args=[parts[1], parts[3]], target=parts[5])
+    if head == 'RETURN':
+        return Instr('return', args=parts[1:2])
+    if head == 'PARAM' and len(parts) == 2:
+        return Instr('arg', args=[parts[1]])
+
+    if len(parts) >= 3 and parts[1] == '=':
+        dest, rhs = parts[0], parts[2:]
+        if rhs[0].startswith('PHI('):
+            args = ' '.join(rhs)[len('PHI('):-1]
+            return Instr('phi', dest=dest, args=[a.strip() for a in args.split(',') if a.strip()])
+        if len(rhs) == 1:
+            val = rhs[0]
+            if len(val) > 1 and val[0] in UNARY_OPS and not is_const(val):
+                return Instr('unary', dest=dest, op=val[0], args=[val[1:]])
+            return Instr('copy', dest=dest, args=[val])
+        if len(rhs) == 2 and rhs[0] == 'CALL':
+            return Instr('call', dest=dest, op=rhs[1])
+        if len(rhs) == 2 and rhs[0].startswith('(') and rhs[0].endswith(')'):
+            return Instr('cast', dest=dest, op=rhs[0][1:-1], args=[rhs[1]])
+        if len(rhs) == 3:
+            return Instr('binary', dest=dest, op=rhs[1], args=[rhs[0], rhs[2]])
+
+    # Keep anything we do not understand verbatim
+    return Instr('comment', text=raw)
+
+
+class IRFunction:
+    """The intermediate code of one function."""
+
+    def __init__(self, name, pre, body):
+        self.name = name
+        self.pre = pre          # raw lines before FUNC_<name>: (headers, comments)
+        self.body = body        # Instr list between FUNC_ and END_FUNC_
+        self.ret_type = 'int'
+        self.params = []        # [(type, name)]
+        self.locals = {}        # declared local name -> type
+        self.label_count = 0
+        self.temp_count = 0
+        self._read_signature()
+
+    def _read_signature(self):
+        for line in self.pre:
+            m = HEADER_RE.search(line)
+            if m:
+                self.ret_type = m.group(1)
+                if m.group(3) is not None:
+                    self.params = [tuple(p.split()) for p in m.group(3).split(',') if p.strip()]
+
+        # Formal parameters are the PARAM lines that open the function body
+        formals = {name for _, name in self.params}
+        if not self.params:
+            # Older IR without a signature: take the leading run of PARAM lines
+            for ins in self.body:
+                if ins.kind != 'arg' or is_const(ins.args[0]) or ins.args[0] in formals:
+                    break
+                formals.add(ins.args[0])
+                self.params.append(('int', ins.args[0]))
+        seen = set()
+        for ins in self.body:
+            if ins.kind != 'arg' or ins.args[0] not in formals or ins.args[0] in seen:
+                break
+            seen.add(ins.args[0])
+            ins.kind, ins.dest, ins.args = 'param', ins.args[0], []
+
+        for ins in self.body:
+            if ins.kind == 'comment':
+                m = DECLARE_RE.search(ins.text)
+                if m:
+                    self.locals[m.group(2)] = m.group(1)
+
+    def param_names(self):
+        return [name for _, name in self.params]
+
+    def declared_type(self, name):
+        """Declared type of a local or parameter, None for temps and unknown names."""
+        if name in self.locals:
+            return self.locals[name]
+        for ptype, pname in self.params:
+            if pname == name:
+                return ptype
+        return None
+
+    def new_label(self):
+        """A label that is unique to this function and cannot clash with IRGenerator's."""
+        if self.label_count == 0:
+            self.used_labels = {ins.dest for ins in self.body if ins.kind == 'label'}
+        while True:
+            self.label_count += 1
+            label = f"{self.name}_B{self.label_count}"
+            if label not in self.used_labels:
+                return label
+
+    def new_temp(self):
+        """A temp name not used anywhere in this function."""
+        if self.temp_count == 0:
+            for ins in self.body:
+                for name in ins.defs() + ins.uses():
+                    if is_temp(name):
+                        self.temp_count = max(self.temp_count, int(name[1:]))
+        self.temp_count += 1
+        return f"t{self.temp_count}"
+
+    def is_local(self, name):
+        """True for names that cannot be touched by a call (temps, locals, params)."""
+        base, dot, version = name.rpartition('.')
+        if dot and version.isdigit():
+            name = base     # SSA version or split live range of a variable
+        return is_temp(name) or name in self.locals or name in self.param_names()
+
+    def render(self):
+        lines = list(self.pre)
+        lines.append(f"FUNC_{self.name}:")
+        lines.extend(ins.render() for ins in self.body)
+        lines.append(f"END_FUNC_{self.name}:")
+        return lines
+
+
+class IRProgram:
+    """A whole IR listing split into functions."""
+
+    def __init__(self, functions, trailer):
+        self.functions = functions
+        self.trailer = trailer
+
+    def render(self):
+        lines = []
+        for func in self.functions:
+            lines.extend(func.render())
+        lines.extend(self.trailer)
+        return lines
+
+
+def parse_program(ir_lines):
+    """Split IR lines (IRGenerator.code or a file's lines) into an IRProgram."""
+    functions = []
+    pending = []
+    current = None
+    body = []
+    for line in ir_lines:
+        line = line.rstrip('\n')
+        s = line.strip()
+        if current is None:
+            if s.startswith('FUNC_') and s.endswith(':'):
+                current = s[len('FUNC_'):-1]
+                body = []
+            else:
+                pending.append(line)
+        elif s == f"END_FUNC_{current}:":
+            functions.append(IRFunction(current, pending, body))
+            current = None
+            pending = []
+        else:
+            body.append(parse_instr(line))
+    if current is not None:
+        functions.append(IRFunction(current, pending, body))
+        pending = []
+    return IRProgram(functions, pending)
+
+
+class Block:
+    """A basic block: a maximal straight-line run of instructions."""
+
+    def __init__(self, index):
+        self.index = index
+        self.instrs = []
+        self.succs = []
+        self.preds = []
+
+    @property
+    def label(self):
+        for ins in self.instrs:
+            if ins.kind == 'label':
+                return ins.dest
+            if ins.is_code():
+                return None
+        return None
+
+    def last(self):
+        """Last real instruction of the block (comments skipped)."""
+        for ins in reversed(self.instrs):
+            if ins.is_code():
+                return ins
+        return None
+
+    def __repr__(self):
+        return f"B{self.index}({self.label})"
+
+
+def build_cfg(instrs):
+    """Split an instruction list into basic blocks and link them."""
+    blocks = []
+    current = Block(0)
+    for ins in instrs:
+        if ins.kind == 'label' and any(i.is_code() for i in current.instrs):
+            blocks.append(current)
+            current = Block(len(blocks))
+        current.instrs.append(ins)
+        if ins.ends_block():
+            blocks.append(current)
+            current = Block(len(blocks))
+    if current.instrs or not blocks:
+        blocks.append(current)
+
+    by_label = {}
+    for b in blocks:
+        for ins in b.instrs:
+            if ins.kind == 'label':
+                by_label[ins.dest] = b
+
+    for i, b in enumerate(blocks):
+        last = b.last()
+        nxt = blocks[i + 1] if i + 1 < len(blocks) else None
+        targets = []
+        if last is not None and last.kind == 'goto':
+            targets.append(by_label.get(last.target))
+        elif last is not None and last.kind == 'if':
+            targets.append(by_label.get(last.target))
+            targets.append(nxt)
+        elif last is None or last.kind != 'return':
+            targets.append(nxt)
+        for t in targets:
+            if t is not None and t not in b.succs:
+                b.succs.append(t)
+                t.preds.append(b)
+    return blocks
+
+
+def flatten(blocks):
+    """Concatenate block instructions back into a list."""
+    out = []
+    for b in blocks:
+        out.extend(b.instrs)
+    return out
+
+
+def reverse_postorder(blocks):
+    """Blocks reachable from the entry, in reverse postorder."""
+    if not blocks:
+        return []
+    seen = {blocks[0].index}
+    order = []
+    stack = [(blocks[0], iter(blocks[0].succs))]
+    while stack:
+        b, it = stack[-1]
+        for s in it:
+            if s.index not in seen:
+                seen.add(s.index)
+                stack.append((s, iter(s.succs)))
+                break
+        else:
+            order.append(b)
+            stack.pop()
+    order.reverse()
+    return order
+
+
+def dominators(blocks):
+    """Immediate dominators (Cooper, Harvey & Kennedy). Returns {block index: idom index}."""
+    rpo = reverse_postorder(blocks)
+    if not rpo:
+        return {}
+    number = {b.index: i for i, b in enumerate(rpo)}
+    entry = rpo[0].index
+    idom = {entry: entry}
+
+    def intersect(a, b):
+        while a != b:
+            while number[a] > number[b]:
+                a = idom[a]
+            while number[b] > number[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for b in rpo[1:]:
+            new = None
+            for p in b.preds:
+                if p.index in idom:
+                    new = p.index if new is None else intersect(p.index, new)
+            if idom.get(b.index) != new:
+                idom[b.index] = new
+                changed = True
+    return idom
+
+
+def dominator_tree(blocks, idom):
+    """Children lists of the dominator tree, keyed by block index."""
+    children = {b.index: [] for b in blocks}
+    for b in blocks:
+        d = idom.get(b.index)
+        if d is not None and d != b.index:
+            children[d].append(b.index)
+    return children
+
+
+def dominates(idom, a, b):
+    """True if block a dominates block b (both given as indices)."""
+    while True:
+        if a == b:
+            return True
+        parent = idom.get(b)
+        if parent is None or parent == b:
+            return False
+        b = parent
+
+
+def dominance_frontiers(blocks, idom):
+    """Dominance frontier of every reachable block, keyed by block index."""
+    df = {b.index: set() for b in blocks}
+    for b in blocks:
+        if b.index not in idom or len(b.preds) < 2:
+            continue
+        for p in b.preds:
+            runner = p.index
+            if runner not in idom:
+                continue
+            while runner != idom[b.index]:
+                df[runner].add(b.index)
+                runner = idom[runner]
+    return df
+
+
+def block_use_def(block):
+    """Upward-exposed uses and definitions of a block."""
+    use, defs = set(), set()
+    for ins in block.instrs:
+        for u in ins.uses():
+            if u not in defs:
+                use.add(u)
+        defs.update(ins.defs())
+    return use, defs
+
+
+def liveness(blocks, names=None):
+    """Backward liveness analysis. Returns (live_in, live_out) keyed by block index.
+
+    With names given, only the liveness of those names is computed.
+    """
+    use, defs = {}, {}
+    for b in blocks:
+        use[b.index], defs[b.index] = block_use_def(b)
+        if names is not None:
+            use[b.index] &= names
+            defs[b.index] &= names
+    live_in = {b.index: set(use[b.index]) for b in blocks}
+    live_out = {b.index: set() for b in blocks}
+
+    worklist = list(blocks)
+    queued = {b.index for b in blocks}
+    while worklist:
+        b = worklist.pop()
+        queued.discard(b.index)
+        out = set()
+        for s in b.succs:
+            out |= live_in[s.index]
+        live_out[b.index] = out
+        new_in = use[b.index] | (out - defs[b.index])
+        if new_in != live_in[b.index]:
+            live_in[b.index] = new_in
+            for p in b.preds:
+                if p.index not in queued:
+                    queued.add(p.index)
+                    worklist.append(p)
+    return live_in, live_out
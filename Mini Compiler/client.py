@@ -0,0 +1,160 @@
+import base64
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Same default as server.DEFAULT_SOCKET; not imported so the client stays light
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"minicc-{os.getuid()}.sock")
+
+# main.py's options (also not imported). The server compiles input.c with the
+# first ones; the others, or input files, run main.py's driver in this process.
+SERVER_SWITCHES = ('-O', '--linear-scan', '--x86', '--ssa')
+SERVER_VALUES = ('--reports', '--format')
+LOCAL_SWITCHES = ('--simulate', '--profile', '--watch', '--stream', '--no-cache')
+LOCAL_VALUES = ('--cprofile', '-j', '-o', '--cache-dir')
+
+
+class ServerUnavailable(Exception):
+    pass
+
+
+class CompileClient:
+    """Connection to a compile server; send() may be called any number of times."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(socket_path)
+        except OSError as e:
+            self.sock.close()
+            raise ServerUnavailable(f"no compile server on {socket_path} ({e.strerror})") from e
+        self.file = self.sock.makefile('rb')
+
+    def send(self, request):
+        self.sock.sendall(json.dumps(request).encode() + b'\n')
+        line = self.file.readline()
+        if not line:
+            raise ServerUnavailable("the compile server closed the connection")
+        return json.loads(line)
+
+    def compile(self, source, optimize=False, allocator='graph', x86=False, reports=True,
+                report_format='text', ssa=False):
+        return self.send({'source': source, 'options': {'optimize': optimize,
+                                                        'allocator': allocator, 'x86': x86,
+                                                        'ssa': ssa, 'reports': reports,
+                                                        'format': report_format}})
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def print_stats(stats):
+    for name, counters in stats.items():
+        summary = ", ".join(f"{k}: {v}" for k, v in counters.items())
+        print(f"  [{name}] {summary}")
+
+
+def run_local(argv):
+    """main.py's command line, in this process; returns the exit status."""
+    import main
+    return main.main(argv)
+
+
+def run_client(filename='input.c', optimize=False, allocator='graph', x86=False,
+               socket_path=DEFAULT_SOCKET, reports=True, report_format='text', ssa=False):
+    """Compile filename on the server and write the reports like main.run_all does.
+
+    Returns the exit status. Raises ServerUnavailable when there is no server.
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except FileNotFoundError:
+        print(f"Error: Could not find {filename}")
+        return 1
+    client = CompileClient(socket_path)
+    try:
+        response = client.compile(source, optimize, allocator, x86, reports, report_format, ssa)
+    finally:
+        client.close()
+
+    binary = response.get('binary', [])
+    for name, text in response.get('reports', {}).items():
+        if name in binary:
+            with open(name, 'wb') as f:
+                f.write(base64.b64decode(text))
+        else:
+            with open(name, 'w', encoding='utf-8') as f:
+                f.write(text)
+        print(f"  Wrote {name}")
+    if not response['ok']:
+        print(f"{response['phase'].capitalize()} failed: {response['error']}")
+        return 1
+    print(f"  Generated {response['tokens']} tokens")
+    print(f"  Found {response['functions']} function(s)")
+    if response['warnings']:
+        print(f"Semantic analysis completed with {len(response['warnings'])} warnings")
+    else:
+        print("Semantic analysis completed - No errors found")
+    if optimize:
+        print_stats(response['ir_stats'])
+        print_stats(response['asm_stats'])
+    if response['cache_stats']:
+        print_stats({'cache': response['cache_stats']})
+    print("  Compilation completed successfully!")
+    return 0
+
+
+if __name__ == '__main__':
+    # Usage: python client.py [--socket PATH] [main.py options]
+    #        python client.py --stats | --shutdown [--socket PATH]
+    # Takes every option main.py does, with the same meaning. Without a server,
+    # main.py's driver runs in this process.
+    args = [part for a in sys.argv[1:]
+            for part in (a.split('=', 1) if a.startswith('--format=') else [a])]
+    socket_path = DEFAULT_SOCKET
+    if '--socket' in args:
+        at = args.index('--socket')
+        socket_path = args[at + 1]
+        del args[at:at + 2]
+    if '--stats' in args or '--shutdown' in args:
+        try:
+            client = CompileClient(socket_path)
+            print(client.send({'command': 'stats' if '--stats' in args else 'shutdown'}))
+            client.close()
+        except ServerUnavailable as e:
+            print(f"Compile server unavailable: {e}")
+            sys.exit(2)
+        sys.exit(0)
+    argv = list(args)
+    values = {}
+    for flag in SERVER_VALUES + LOCAL_VALUES:
+        if flag in args:
+            at = args.index(flag)
+            values[flag] = args[at + 1] if at + 1 < len(args) else None
+            del args[at:at + 2]
+    unknown = [a for a in args if a.startswith('-') and a not in SERVER_SWITCHES + LOCAL_SWITCHES]
+    missing = [flag for flag, value in values.items() if value is None]
+    if unknown or missing:
+        print(f"Error: {'unknown option' if unknown else 'missing value for'} "
+              f"{(unknown or missing)[0]}")
+        sys.exit(1)
+    files = [a for a in args if not a.startswith('-')]
+    local = [a for a in args if a in LOCAL_SWITCHES] + [f for f in values if f in LOCAL_VALUES]
+    if files or local:
+        sys.exit(run_local(argv))
+    reports = values.get('--reports', 'all')
+    reports = True if reports == 'all' else [] if reports == 'none' else reports.split(',')
+    try:
+        status = run_client('input.c', optimize='-O' in args,
+                            allocator='linear' if '--linear-scan' in args else 'graph',
+                            x86='--x86' in args, socket_path=socket_path, reports=reports,
+                            report_format=values.get('--format', 'text'), ssa='--ssa' in args)
+    except ServerUnavailable as e:
+        print(f"Compile server unavailable: {e}; compiling in this process")
+    else:
+        sys.exit(status)
+    sys.exit(run_local(argv))
@@ -0,0 +1,258 @@
+from lexer import tokenize
+from parser import Parser, ParserError
+from semantic import SemanticAnalyzer
+from lowering import FunctionPool, function_ir, lower_program, optimize_functions, splice_ir
+from mini_ast import count_nodes
+from reports import REPORT_FILES, X86_REPORT, ReportSink, select_reports, write_report
+from artifacts import REPORT_FORMATS
+from x86_backend import generate_x86
+from profiler import PhaseProfiler
+from cache import CompileCache, DEFAULT_CACHE_SIZE, cache_key
+from optimizer import DEFAULT_PIPELINE, SSA_PIPELINE
+import os
+
+
+class CompileError(Exception):
+    """A phase rejected the program; reports holds what was produced up to then."""
+
+    def __init__(self, phase, message, reports=None):
+        super().__init__(f"{phase}: {message}")
+        self.phase = phase
+        self.message = message
+        self.reports = reports or {}
+
+
+class CompileOptions:
+    """What compile_source does besides lexing, parsing and code generation.
+
+    optimize turns on the IR optimizer, register allocation (with the given
+    allocator mode) and the peephole optimizer; with ssa the IR optimizer also
+    takes the functions through SSA form and back (SSA_PIPELINE). x86 also
+    produces x86-64 assembly; reports renders the text reports (file name ->
+    contents): True for all, or a selection as reports.select_reports takes
+    it. report_dir, if set, writes them there as well (all of them unless
+    reports selects), each as soon as its phase is done, on a background
+    thread. report_format 'jsonl' or 'bin' renders the tokens, symbols and IR
+    reports as records (see artifacts.py) instead of text tables. profile
+    records time, allocations and counters per phase in result.profile, and
+    cprofile_dir (which implies profile) dumps a cProfile file per phase
+    there. cache_dir turns on the content-addressed phase cache (see
+    run_cached), bounded to cache_size bytes; profiling bypasses it, since a
+    hit would skip the phases being measured. jobs > 1 optimizes and lowers
+    the functions in that many worker processes; the output is the same for
+    any number of jobs.
+    """
+
+    def __init__(self, optimize=False, allocator='graph', x86=False, reports=False, report_dir=None,
+                 profile=False, cprofile_dir=None, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE,
+                 jobs=1, report_format='text', ssa=False):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"unknown report format {report_format!r}")
+        self.optimize = optimize
+        self.passes = SSA_PIPELINE if ssa else DEFAULT_PIPELINE     # IR passes under optimize
+        self.allocator = allocator
+        self.x86 = x86
+        self.reports = select_reports(True if reports is False and report_dir is not None
+                                      else reports)
+        self.report_dir = report_dir
+        self.profile = profile or cprofile_dir is not None
+        self.cprofile_dir = cprofile_dir
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.jobs = jobs
+        self.report_format = report_format
+
+
+class CompileResult:
+    """Everything one compilation produced, kept in memory."""
+
+    def __init__(self):
+        self.tokens = []
+        self.program = None
+        self.symtab = None
+        self.warnings = []      # semantic errors; they do not stop compilation
+        self.ir = []            # IR lines (optimized under optimize)
+        self.asm = []           # lines of the assembly listing
+        self.x86 = None         # x86-64 assembly lines, if requested
+        self.ir_stats = {}
+        self.asm_stats = {}
+        self.reports = {}       # report file name -> text (bytes for .bin)
+        self.profile = None     # PhaseProfiler, if profiling was requested
+        self.cache_stats = {}   # CompileCache.stats(), if the cache was used
+
+    def write_reports(self, directory):
+        """Write the rendered reports into directory; returns the paths written."""
+        paths = []
+        for name, text in self.reports.items():
+            path = os.path.join(directory, name)
+            write_report(path, text)
+            paths.append(path)
+        return paths
+
+
+def compile_source(text, options=None):
+    """Compile Mini C source text and return a CompileResult.
+
+    Every phase gets fresh objects and hands its output to the next in memory,
+    so concurrent calls from several threads do not interfere (each has its
+    own report writer thread, if any). Nothing is
+    printed, and nothing is written unless options.report_dir,
+    options.cprofile_dir or options.cache_dir is set. Raises CompileError when
+    the source does not lex or parse.
+    """
+    options = options or CompileOptions()
+    result = CompileResult()
+    profiler = PhaseProfiler(options.profile, options.cprofile_dir)
+    cache = None
+    if options.cache_dir and not options.profile:
+        cache = CompileCache(options.cache_dir, options.cache_size)
+    pool = FunctionPool(options.jobs)
+    sink = ReportSink(result, options.reports, options.report_dir, options.report_format)
+    try:
+        run_cached(text, options, result, profiler, pool, cache, sink)
+    finally:
+        pool.close()
+        sink.close()
+        profiler.close()
+    if options.profile:
+        result.profile = profiler
+    if cache:
+        if cache.written:
+            cache.evict()
+        result.cache_stats = cache.stats()
+    return result
+
+
+# == Cached compilation ===
+# Each stage's entry is keyed by the hash of its own inputs: the front end
+# (tokens through semantic analysis) by the source, the IR by the front end's
+# key and -O, the backends by the IR's key and their options. Changing
+# only a backend option therefore still reuses the cached AST and IR. A final
+# entry holds the whole result, reports included, so an unchanged compilation
+# does no work at all.
+
+def run_cached(text, options, result, profiler, pool, cache, sink):
+    if cache is None:
+        run_phases(text, options, result, profiler, pool, sink)
+        return
+    front_key = cache_key('front', text)
+    ir_key = cache_key('ir', front_key, options.optimize, options.passes)
+    asm_key = cache_key('asm', ir_key, options.optimize, options.allocator)
+    x86_key = cache_key('x86', ir_key)
+    result_key = cache_key('result', asm_key, x86_key if options.x86 else None, options.reports,
+                           options.report_format)
+
+    entry = cache.get('result', result_key)
+    if entry is not None:
+        vars(result).update(entry)
+        sink.ready(*sink.selected)
+        sink.flush()
+        return
+    run_phases(text, options, result, profiler, pool, sink, cache,
+               (front_key, ir_key, asm_key, x86_key))
+    entry = dict(vars(result))
+    entry['profile'] = None
+    entry['cache_stats'] = {}
+    cache.put('result', result_key, entry)
+
+
+def run_phases(text, options, result, profiler, pool, sink, cache=None, keys=None):
+    front_key, ir_key, asm_key, x86_key = keys or (None,) * 4
+    front = cache.get('front', front_key) if cache else None
+    if front is not None:
+        result.tokens, result.program, result.symtab, result.warnings = front
+        sink.ready(*REPORT_FILES[:5])
+    else:
+        run_front_end(text, options, result, profiler, sink)
+        if cache:
+            cache.put('front', front_key, (result.tokens, result.program, result.symtab,
+                                           result.warnings))
+    functions = result.program.functions
+
+    # IR and assembly are produced function by function (see lowering.py)
+    ir = cache.get('ir', ir_key) if cache else None
+    if ir is not None:
+        chunks, result.ir_stats = ir
+    else:
+        with profiler.phase('ir generation') as stats:
+            chunks = [function_ir(func) for func in functions]
+        if profiler.enabled:
+            stats.counters['ir instructions'] = sum(len(chunk) for chunk in chunks)
+        if options.optimize:
+            with profiler.phase('ir optimization') as stats:
+                chunks, result.ir_stats = optimize_functions(chunks, pool, options.passes)
+            if profiler.enabled:
+                stats.counters['ir instructions'] = sum(len(chunk) for chunk in chunks)
+        if cache:
+            cache.put('ir', ir_key, (chunks, result.ir_stats))
+    result.ir = splice_ir(chunks)
+    sink.ready('intermediate_code_output.txt')
+
+    asm = cache.get('asm', asm_key) if cache else None
+    if asm is not None:
+        result.asm, result.asm_stats = asm
+    else:
+        return_types = {func.name: func.ret_type for func in functions}
+        with profiler.phase('assembly generation') as stats:
+            result.asm, result.asm_stats = lower_program(
+                chunks, [func.name for func in functions], options, return_types, pool)
+        if profiler.enabled:
+            stats.counters['assembly lines'] = len(result.asm)
+        if cache:
+            cache.put('asm', asm_key, (result.asm, result.asm_stats))
+    sink.ready('assembly_output.asm')
+
+    if options.x86:
+        result.x86 = cache.get('x86', x86_key) if cache else None
+        if result.x86 is None:
+            with profiler.phase('x86 generation') as stats:
+                result.x86 = generate_x86(result.ir)
+            if profiler.enabled:
+                stats.counters['assembly lines'] = len(result.x86)
+            if cache:
+                cache.put('x86', x86_key, result.x86)
+        sink.ready(X86_REPORT)
+
+    if options.reports:
+        # Rendered here without a report_dir; otherwise waits for the writer
+        with profiler.phase('reports') as stats:
+            sink.flush()
+        if profiler.enabled:
+            stats.counters['bytes'] = sum(len(t) for t in result.reports.values())
+
+
+def run_front_end(text, options, result, profiler, sink):
+    """Lex, parse and analyze text into result."""
+    with profiler.phase('lexical analysis') as stats:
+        try:
+            result.tokens = tokenize(text)
+        except RuntimeError as e:
+            raise CompileError('lexical analysis', str(e)) from e
+    if profiler.enabled:
+        stats.counters.update({'characters': len(text), 'tokens': len(result.tokens),
+                               'tokens/sec': stats.rate(len(result.tokens))})
+    sink.ready('lexical_output.txt')
+
+    parser = Parser(result.tokens)
+    with profiler.phase('syntax analysis') as stats:
+        try:
+            result.program = parser.parse()
+        except ParserError as e:
+            sink.set('syntax_output.txt', f"Syntax Error: {e}\n")
+            sink.flush()
+            raise CompileError('syntax analysis', str(e), result.reports) from e
+    if profiler.enabled:
+        stats.counters.update({'ast nodes': count_nodes(result.program),
+                               'Parser.match calls': parser.match_calls,
+                               'functions': len(result.program.functions)})
+    sink.ready('syntax_output.txt')
+
+    analyzer = SemanticAnalyzer()
+    with profiler.phase('semantic analysis') as stats:
+        result.warnings = analyzer.analyze(result.program)
+    result.symtab = analyzer.symtab
+    if profiler.enabled:
+        stats.counters.update({'symbol lookups': analyzer.symtab.lookups,
+                               'symbols': len(analyzer.symtab.table),
+                               'warnings': len(result.warnings)})
+    sink.ready('symbol_table_output.txt', 'semantic_report.txt', 'ast_dump.txt')
@@ -0,0 +1,119 @@
+from cfg import build_cfg, flatten, liveness, reverse_postorder
+
+
+class DeadCodeElimination:
+    """Remove unreachable blocks, redundant jumps, unused labels and dead assignments.
+
+    The four cleanups feed each other (dropping `GOTO L6` right before `L6:` leaves
+    the label unused, which may let two blocks merge), so they run until nothing
+    changes. Each round is a constant number of linear scans plus one liveness solve.
+    """
+
+    name = 'dce'
+
+    def __init__(self):
+        self.unreachable = 0
+        self.jumps = 0
+        self.labels = 0
+        self.dead = 0
+
+    def stats(self):
+        return {
+            'unreachable instructions': self.unreachable,
+            'redundant jumps': self.jumps,
+            'unused labels': self.labels,
+            'dead assignments': self.dead,
+        }
+
+    def run(self, func):
+        """Clean up one IRFunction in place."""
+        changed = True
+        while changed:
+            changed = self.remove_unreachable(func)
+            changed = self.remove_redundant_jumps(func) or changed
+            changed = self.remove_unused_labels(func) or changed
+            changed = self.remove_dead_assignments(func) or changed
+
+    def remove_unreachable(self, func):
+        """Drop blocks that cannot be reached from the function entry."""
+        blocks = build_cfg(func.body)
+        reachable = {b.index for b in reverse_postorder(blocks)}
+        body = []
+        removed = 0
+        for b in blocks:
+            if b.index in reachable:
+                body.extend(b.instrs)
+                continue
+            for ins in b.instrs:
+                # Keep comments such as '# Declare int x'; they carry declarations
+                if not ins.is_code():
+                    body.append(ins)
+                elif ins.kind != 'label':
+                    removed += 1
+        if len(body) == len(func.body):
+            return False
+        func.body = body
+        self.unreachable += removed
+        return True
+
+    def remove_redundant_jumps(self, func):
+        """Drop jumps whose target label directly follows them."""
+        body = func.body
+        # Labels that sit right after position i (only comments and labels in between)
+        following = [None] * len(body)
+        labels = set()
+        for i in range(len(body) - 1, -1, -1):
+            following[i] = labels
+            ins = body[i]
+            if ins.kind == 'label':
+                labels = labels | {ins.dest}
+            elif ins.is_code():
+                labels = set()
+
+        keep = []
+        removed = 0
+        for i, ins in enumerate(body):
+            if ins.is_jump() and ins.target in following[i]:
+                removed += 1
+                continue
+            keep.append(ins)
+        if not removed:
+            return False
+        func.body = keep
+        self.jumps += removed
+        return True
+
+    def remove_unused_labels(self, func):
+        """Drop labels that no jump refers to."""
+        targets = {ins.target for ins in func.body if ins.is_jump()}
+        keep = [ins for ins in func.body if ins.kind != 'label' or ins.dest in targets]
+        removed = len(func.body) - len(keep)
+        if not removed:
+            return False
+        func.body = keep
+        self.labels += removed
+        return True
+
+    def remove_dead_assignments(self, func):
+        """Drop pure assignments to locals and temps whose value is never read."""
+        blocks = build_cfg(func.body)
+        _, live_out = liveness(blocks)
+        removed = 0
+        for b in blocks:
+            live = set(live_out[b.index])
+            keep = []
+            for ins in reversed(b.instrs):
+                if ins.is_pure() and func.is_local(ins.dest) and (
+                        ins.dest not in live or (ins.kind == 'copy' and ins.args[0] == ins.dest)):
+                    removed += 1
+                    continue
+                live.difference_update(ins.defs())
+                live.update(ins.uses())
+                keep.append(ins)
+            keep.reverse()
+            b.instrs = keep
+        if not removed:
+            return False
+        func.body = flatten(blocks)
+        self.dead += removed
+        return True
@@ -0,0 +1,232 @@
+import re
+
+from cfg import Instr, build_cfg, is_const, liveness, parse_program, RELATIONAL_OPS
+from regalloc import InterferenceGraph, split_webs
+
+# == Target data layout ===
+WORD_SIZE = 8                                   # stack pushes, saved BP, return address
+TYPE_SIZES = {'char': 1, 'int': 4, 'float': 8}  # a type's alignment equals its size
+DATA_DIRECTIVES = {1: 'DB', 4: 'DD', 8: 'DQ'}
+REGISTER_RE = re.compile(r'^[RA]\d+$')
+
+# == Calling convention ===
+# The first arguments travel in A1..A4, the rest are pushed first to last and
+# popped by the callee (RET n). Results come back in R0.
+ARG_REGISTERS = ('A1', 'A2', 'A3', 'A4')
+
+
+def is_float_literal(operand):
+    return is_const(operand) and ('.' in operand or 'e' in operand.lower())
+
+
+def base_name(name):
+    """Variable a web or SSA name (x.2) belongs to."""
+    base, dot, version = name.rpartition('.')
+    return base if dot and version.isdigit() else name
+
+
+def align(value, boundary):
+    return -(-value // boundary) * boundary
+
+
+class Frame:
+    """Stack frame of one function.
+
+    Layout, from high to low addresses: stack arguments (pushed first to last),
+    return address, saved BP (where BP points), then the local slots reserved
+    with SUB SP, size. A leaf function with no slots and no stack arguments
+    keeps its arguments in registers and has no frame at all.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.offsets = {}       # name -> BP-relative operand or argument register
+        self.size = 0           # bytes reserved below BP
+        self.arg_bytes = 0      # bytes of stack arguments the callee pops on return
+        self.elided = False     # no PUSH BP / MOV BP, SP / POP BP
+        self.literals = {}      # float literal text -> pool label (<function>_LC<n>)
+        self.globals = {}       # globals this function uses -> type, in order of first use
+
+
+class FrameLayout:
+    """Give every parameter, local and temp of a function a BP-relative slot.
+
+    Slots are sized and aligned by type (ints 4 bytes, floats 8), and names whose
+    live ranges do not interfere share storage, so a frame only needs room for
+    what is live at the same time. Names that belong to no function are globals
+    and float literals are moved into a per-function literal pool; both go in
+    .DATA. return_types adds the return types of functions defined elsewhere,
+    for laying out functions one at a time.
+    """
+
+    name = 'frame'
+
+    def __init__(self, functions, arg_registers=ARG_REGISTERS, return_types=None):
+        self.return_types = dict(return_types or {})
+        self.return_types.update((f.name, f.ret_type) for f in functions)
+        self.arg_registers = arg_registers
+        self.frames = {}
+        self.globals = {}       # name -> type, in order of first use
+        self.slots = 0
+        self.unshared = 0       # bytes the slots would need without sharing
+
+    def stats(self):
+        return {'slots': self.slots,
+                'frame bytes': sum(f.size for f in self.frames.values()),
+                'bytes without reuse': self.unshared,
+                'frames elided': sum(1 for f in self.frames.values() if f.elided),
+                'globals': len(self.globals),
+                'pooled literals': sum(len(f.literals) for f in self.frames.values())}
+
+    def run(self, func):
+        """Rewrite one IRFunction in terms of frame slots, globals and pool labels."""
+        frame = Frame(func.name)
+        self.frames[func.name] = frame
+        types = self.infer_types(func)
+
+        params = func.param_names()
+        in_registers = dict(zip(params, self.arg_registers))
+        on_stack = params[len(in_registers):]
+        frame.arg_bytes = WORD_SIZE * len(on_stack)
+        for i, name in enumerate(on_stack):
+            frame.offsets[name] = f"[BP+{2 * WORD_SIZE + WORD_SIZE * (len(on_stack) - 1 - i)}]"
+        # A leaf can leave its register arguments where they are; otherwise
+        # the next call overwrites them, so they are copied to slots on entry
+        leaf = not any(ins.kind == 'call' for ins in func.body)
+        if leaf:
+            frame.offsets.update(in_registers)
+
+        order = {}
+        for ins in func.body:
+            for n in ins.defs() + ins.uses():
+                if n not in order and n not in frame.offsets and func.is_local(n):
+                    order[n] = len(order)
+        blocks = build_cfg(func.body)
+        order = split_webs(blocks, order)
+        _, live_out = liveness(blocks)
+        graph = InterferenceGraph(order, blocks, live_out)
+
+        # Slots either coincide or are disjoint, so one operand never partly
+        # aliases another (the peephole optimizer relies on that)
+        placed = {}     # name -> (depth, size): bytes [BP-depth, BP-depth+size)
+        slots = set()   # distinct (depth, size) pairs in use
+        straddled = {s: set() for s in TYPE_SIZES.values()}     # size -> depths at which
+        for n in order:                                          # it overlaps another slot
+            size = TYPE_SIZES.get(types.get(base_name(n)), TYPE_SIZES['int'])
+            taken = {placed[m][0] for m in graph.adj[n]
+                     if m in placed and placed[m][1] == size}
+            # Depths are multiples of the size, so a slot of the same size either
+            # is this one or is disjoint from it; only neighbours rule one out
+            depth = size
+            while depth in taken or depth in straddled[size]:
+                depth += size
+            if (depth, size) not in slots:
+                slots.add((depth, size))
+                for other in straddled:
+                    if other != size:
+                        start = (depth - size) // other * other + other
+                        straddled[other].update(range(start, depth + other, other))
+            placed[n] = (depth, size)
+            frame.offsets[n] = f"[BP-{depth}]"
+            self.unshared += size
+        frame.size = align(max((d for d, _ in placed.values()), default=0), WORD_SIZE)
+        frame.elided = leaf and not frame.size and not on_stack
+        self.slots += len(placed)
+
+        body = []
+        for ins in func.body:
+            if ins.kind == 'param':
+                name = ins.dest
+                where = 'in' if frame.offsets[name] in self.arg_registers else 'at'
+                body.append(Instr('comment', text=(
+                    f"    # Param {types.get(name, 'int')} {name} {where} {frame.offsets[name]}")))
+                if name in in_registers and not leaf:
+                    body.append(Instr('copy', dest=frame.offsets[name], args=[in_registers[name]]))
+                continue
+            ins.args = [self.operand(frame, types, a) for a in ins.args]
+            if ins.defs():
+                ins.dest = self.operand(frame, types, ins.dest)
+            body.append(ins)
+        func.body = body
+
+    def operand(self, frame, types, name):
+        if name in frame.offsets:
+            return frame.offsets[name]
+        if is_float_literal(name):
+            return frame.literals.setdefault(name, f"{frame.name}_LC{len(frame.literals)}")
+        if is_const(name) or REGISTER_RE.match(name):
+            return name
+        add_global(frame.globals, name, types.get(base_name(name), 'int'))
+        add_global(self.globals, name, types.get(base_name(name), 'int'))
+        return name
+
+    def infer_types(self, func):
+        """Declared types of locals and parameters, and inferred types of everything else."""
+        types = dict(func.locals)
+        types.update((name, ptype) for ptype, name in func.params)
+        declared = set(types)
+
+        # Twice, since a loop can use a temp before its definition in the listing
+        for _ in range(2):
+            for ins in func.body:
+                if not ins.defs() or ins.kind == 'param' or base_name(ins.dest) in declared:
+                    continue
+                kind = value_type(ins, types, self.return_types)
+                key = base_name(ins.dest)
+                if types.get(key) != 'float':
+                    types[key] = kind
+        return types
+
+    def data_section(self):
+        return data_section(self.globals, self.frames.values())
+
+
+def operand_type(types, operand):
+    """Type of an operand, given the types of the names (see FrameLayout.infer_types)."""
+    if is_const(operand):
+        return 'float' if is_float_literal(operand) else 'int'
+    return types.get(base_name(operand), 'int')
+
+
+def value_type(ins, types, return_types):
+    """Type of the value an instruction computes, before it is stored in its destination."""
+    if ins.kind == 'binary' and ins.op in RELATIONAL_OPS + ('&&', '||'):
+        return 'int'
+    if ins.kind == 'unary' and ins.op == '!':
+        return 'int'
+    if ins.kind == 'cast':
+        return ins.op
+    if ins.kind == 'call':
+        return return_types.get(ins.op, 'int')
+    return 'float' if any(operand_type(types, a) == 'float' for a in ins.args) else 'int'
+
+
+def add_global(global_types, name, kind):
+    """Record a use of a global; float wins if functions disagree on its type."""
+    if global_types.get(name) != 'float':
+        global_types[name] = kind
+
+
+def data_section(global_types, frames):
+    """Lines of the .DATA section: globals, then the literal pools of the frames."""
+    lines = []
+    for name, kind in global_types.items():
+        size = TYPE_SIZES.get(kind, TYPE_SIZES['int'])
+        lines.append(f"    {name} {DATA_DIRECTIVES[size]} {'0.0' if kind == 'float' else '0'}")
+    for frame in frames:
+        for literal, label in frame.literals.items():
+            lines.append(f"    {label} {DATA_DIRECTIVES[TYPE_SIZES['float']]} {literal}")
+    return lines
+
+
+def layout_frames(ir_lines, arg_registers=ARG_REGISTERS, return_types=None):
+    """Lay out the frames of a whole IR listing.
+
+    Returns the rewritten IR lines, {function name: Frame}, the .DATA lines and
+    the layout statistics.
+    """
+    program = parse_program(ir_lines)
+    layout = FrameLayout(program.functions, arg_registers, return_types)
+    for func in program.functions:
+        layout.run(func)
+    return program.render(), layout.frames, layout.data_section(), layout.stats()
@@ -0,0 +1,223 @@
+from compiler import CompileError, CompileResult
+from lexer import tokenize
+from lowering import function_ir, lower_function, splice_asm, splice_ir
+from mini_ast import Call
+from optimizer import optimize_ir
+from parser import Parser, ParserError
+from reports import render_reports
+from semantic import SemanticAnalyzer
+from symbol_table import SymbolTable
+from x86_backend import generate_x86
+import hashlib
+import os
+import time
+
+
+def fingerprint(node, base_line=0):
+    """Hash of an AST subtree. Line numbers count from base_line, so a function
+    that only moved up or down in the file keeps its fingerprint."""
+    digest = hashlib.sha256()
+
+    def walk(n):
+        if isinstance(n, (list, tuple)):
+            digest.update(b'[')
+            for item in n:
+                walk(item)
+            digest.update(b']')
+        elif hasattr(n, '__dict__'):
+            digest.update(type(n).__name__.encode() + b'(')
+            for key, value in sorted(vars(n).items()):
+                if key == 'lineno' and value:
+                    value -= base_line
+                digest.update(key.encode() + b'=')
+                walk(value)
+            digest.update(b')')
+        else:
+            digest.update(repr(n).encode() + b';')
+
+    walk(node)
+    return digest.hexdigest()
+
+
+def called_functions(node, found=None):
+    """Names of the functions called anywhere in an AST subtree."""
+    found = set() if found is None else found
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            called_functions(item, found)
+    elif hasattr(node, '__dict__'):
+        if isinstance(node, Call):
+            found.add(node.name)
+        for value in vars(node).values():
+            called_functions(value, found)
+    return found
+
+
+def signature(func):
+    return (func.ret_type, tuple(ptype for ptype, _ in func.params))
+
+
+class RecordingSymbolTable(SymbolTable):
+    """Symbol table that logs its inserts, so a function's can be replayed."""
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def insert(self, data_type, token_type, token_value, line_no, dimension=1, address=0):
+        self.log.append((data_type, token_type, token_value, line_no, dimension, address))
+        super().insert(data_type, token_type, token_value, line_no, dimension, address)
+
+
+class FunctionUnit:
+    """What the phases produced for one function, and the inputs they depended on."""
+
+    def __init__(self, name):
+        self.name = name
+        self.fingerprint = None
+        self.calls = set()
+        # Semantic analysis: the symbol table is flat, so a function's result
+        # also depends on the names declared before it (env)
+        self.env = None
+        self.inserts = []       # symbol table inserts, lines relative to the function
+        self.errors = []
+        self.ir = []            # IR lines from IRGenerator.gen_function
+        # Backend: depends on the IR and on the signatures of the callees
+        self.backend_key = None
+        self.final_ir = []      # IR after optimization (the IR itself without -O)
+        self.lowered = None     # lowering.LoweredFunction
+
+
+class IncrementalCompiler:
+    """Recompile a changing source file function by function.
+
+    Every update lexes and parses the whole file (cheap next to the rest),
+    then compares each function with the previous version. Semantic analysis
+    reruns for a function whose AST changed or that sees different names
+    declared before it; IR generation for a function whose AST changed; the
+    backend (optimizer, register allocation, frames, assembly) for a function
+    whose IR changed or that calls a function whose signature changed. The
+    outputs are then spliced together from the per-function pieces, which is
+    what the per-function temp and label numbering makes possible: an
+    unchanged function's IR and assembly are the same text wherever it sits.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.units = {}         # function name -> FunctionUnit
+
+    def update(self, text):
+        """Compile text, reusing what is still valid. Returns (CompileResult, work)
+        where work maps phase -> names of the functions it ran for."""
+        opts = self.options
+        result = CompileResult()
+        try:
+            result.tokens = tokenize(text)
+        except RuntimeError as e:
+            raise CompileError('lexical analysis', str(e)) from e
+        try:
+            result.program = Parser(result.tokens).parse()
+        except ParserError as e:
+            raise CompileError('syntax analysis', str(e)) from e
+        functions = result.program.functions
+
+        signatures = {f.name: signature(f) for f in functions}
+        return_types = {name: sig[0] for name, sig in signatures.items()}
+        work = {'semantic': [], 'ir': [], 'backend': []}
+
+        analyzer = SemanticAnalyzer()
+        analyzer.symtab = RecordingSymbolTable()
+        env = hashlib.sha256()
+        units = {}
+        for func in functions:
+            unit = self.units.get(func.name) or FunctionUnit(func.name)
+            units[func.name] = unit
+            fp = fingerprint(func, func.lineno)
+            ast_changed = fp != unit.fingerprint
+            unit.fingerprint = fp
+            if ast_changed:
+                unit.calls = called_functions(func.body)
+
+            # Semantic analysis
+            env_key = env.hexdigest()
+            known = len(analyzer.symtab.table)
+            if ast_changed or env_key != unit.env:
+                analyzer.symtab.log = []
+                before = len(analyzer.errors)
+                analyzer.visit_function(func)
+                unit.inserts = [(d, t, v, line - func.lineno if line else None, dim, addr)
+                                for d, t, v, line, dim, addr in analyzer.symtab.log]
+                unit.errors = analyzer.errors[before:]
+                unit.env = env_key
+                work['semantic'].append(func.name)
+            else:
+                for d, t, v, line, dim, addr in unit.inserts:
+                    analyzer.symtab.insert(d, t, v, func.lineno + line if line is not None else 0,
+                                           dim, addr)
+                analyzer.errors.extend(unit.errors)
+            for name, sym in list(analyzer.symtab.table.items())[known:]:
+                env.update(f"{name}:{sym.data_type};".encode())
+
+            # IR generation
+            if ast_changed:
+                unit.ir = function_ir(func)
+                work['ir'].append(func.name)
+
+            # Backend: the call graph edges are in the key as the callees' signatures
+            backend_key = (fp, opts.optimize, tuple(opts.passes), opts.allocator,
+                           tuple(sorted((g, signatures.get(g)) for g in unit.calls)))
+            if backend_key != unit.backend_key:
+                unit.final_ir = optimize_ir(unit.ir, opts.passes)[0] if opts.optimize else unit.ir
+                unit.lowered = lower_function((func.name, unit.final_ir, opts.optimize,
+                                               opts.allocator, return_types))
+                unit.backend_key = backend_key
+                work['backend'].append(func.name)
+
+        self.units = units
+        result.symtab = analyzer.symtab
+        result.warnings = analyzer.errors
+        result.ir = splice_ir(units[f.name].final_ir for f in functions)
+        result.asm, _ = splice_asm(units[f.name].lowered for f in functions)
+        if opts.x86:
+            result.x86 = generate_x86(result.ir)
+        if opts.reports:
+            render_reports(result, opts.reports, opts.report_format)
+        return result, work
+
+
+def watch(filename, options, interval=0.5):
+    """Recompile filename whenever it changes, writing only the reports that
+    changed to the current directory. Runs until interrupted."""
+    compiler = IncrementalCompiler(options)
+    written = {}
+    stamp = None
+    print(f"Watching {filename} (Ctrl-C to stop)")
+    while True:
+        try:
+            st = os.stat(filename)
+            current = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            current = None
+        if current is not None and current != stamp:
+            stamp = current
+            with open(filename, 'r', encoding='utf-8') as f:
+                text = f.read()
+            start = time.perf_counter()
+            try:
+                result, work = compiler.update(text)
+            except CompileError as e:
+                print(f"{e.phase.capitalize()} failed: {e.message}")
+            else:
+                changed = [name for name, report in result.reports.items()
+                           if written.get(name) != report]
+                for name in changed:
+                    with open(name, 'w', encoding='utf-8') as f:
+                        f.write(result.reports[name])
+                    written[name] = result.reports[name]
+                total = len(result.program.functions)
+                print(f"[{time.strftime('%H:%M:%S')}] {total} function(s) in "
+                      f"{time.perf_counter() - start:.3f} s - semantic: {len(work['semantic'])}, "
+                      f"ir: {len(work['ir'])}, backend: {len(work['backend'])} "
+                      f"({', '.join(work['backend']) or 'none'}); "
+                      f"{len(changed)} file(s) rewritten")
+        time.sleep(interval)
@@ -0,0 +1,115 @@
+from cfg import build_cfg, flatten, is_const, liveness
+from loops import find_loops, insert_preheader
+
+# Operators that may fault, so they are never executed speculatively
+TRAPPING_OPS = ('/', '%')
+
+
+class LoopInvariantCodeMotion:
+    """Hoist loop-invariant computations into a preheader.
+
+    An instruction is hoisted when all its operands are loop-invariant, it is the only
+    definition of its destination in the loop, the destination is not live on entry
+    to the header, and either its block dominates every loop exit or it cannot fault
+    and its result is dead once the loop is left. Loops are processed innermost first,
+    so code can move out through several levels of nesting.
+    """
+
+    name = 'licm'
+
+    def __init__(self):
+        self.hoisted = 0
+        self.loops = 0
+
+    def stats(self):
+        return {'loops': self.loops, 'instructions hoisted': self.hoisted}
+
+    def run(self, func):
+        """Hoist invariant code out of every loop of one IRFunction."""
+        blocks = build_cfg(func.body)
+        loops, idom = find_loops(blocks)
+        live_in, _ = liveness(blocks)
+        by_index = {b.index: b for b in blocks}
+        for loop in loops:
+            if not loop.header.label:
+                continue
+            self.loops += 1
+            hoisted = self.find_invariants(func, by_index, loop, idom, live_in)
+            if not hoisted:
+                continue
+            moved = {id(ins) for ins in hoisted}
+            for index in loop.blocks:
+                b = by_index[index]
+                b.instrs = [ins for ins in b.instrs if id(ins) not in moved]
+            pre = insert_preheader(func, blocks, loop, hoisted, loops, idom)
+            by_index[pre.index] = pre
+            # Hoisting only changes liveness inside the loop, which is not asked
+            # about again; the preheader needs what the header needed
+            live_in[pre.index] = live_in[loop.header.index]
+            self.hoisted += len(hoisted)
+        func.body = flatten(blocks)
+
+    def find_invariants(self, func, by_index, loop, idom, live_in):
+        body = [by_index[i] for i in sorted(loop.blocks)]
+
+        def_count = {}
+        has_call = False
+        for b in body:
+            for ins in b.instrs:
+                has_call = has_call or ins.kind == 'call'
+                for d in ins.defs():
+                    def_count[d] = def_count.get(d, 0) + 1
+
+        exits = loop.exit_edges()
+        exit_blocks = {b.index for b, _ in exits}
+        live_at_exit = set()
+        for _, outside in exits:
+            live_at_exit |= live_in[outside.index]
+        header_live = live_in[loop.header.index]
+        # A block dominates every exit when it is on the idom chains of all of them,
+        # which run from the exits up to the header without leaving the loop
+        exit_dominators = set(loop.blocks)
+        for index in exit_blocks:
+            chain = {index}
+            while index != loop.header.index:
+                index = idom[index]
+                chain.add(index)
+            exit_dominators &= chain
+
+        hoisted = []
+        invariant = set()   # names whose loop definition has been hoisted
+
+        def is_invariant(operand):
+            if is_const(operand) or operand in invariant:
+                return True
+            if operand in def_count:
+                return False
+            # A call inside the loop may change anything that is not local
+            return func.is_local(operand) or not has_call
+
+        changed = True
+        while changed:
+            changed = False
+            for b in body:
+                dominates_exits = b.index in exit_dominators
+                for ins in b.instrs:
+                    if ins.kind not in ('binary', 'unary', 'cast', 'copy') or ins.dest in invariant:
+                        continue
+                    d = ins.dest
+                    if def_count.get(d) != 1 or d in header_live or not func.is_local(d):
+                        continue
+                    if not all(is_invariant(a) for a in ins.args):
+                        continue
+                    if not dominates_exits and (d in live_at_exit or self.may_trap(ins)):
+                        continue
+                    hoisted.append(ins)
+                    invariant.add(d)
+                    changed = True
+        return hoisted
+
+    def may_trap(self, ins):
+        """Division or modulo by anything but a non-zero literal."""
+        if ins.kind != 'binary' or ins.op not in TRAPPING_OPS:
+            return False
+        divisor = ins.args[1]
+        return not is_const(divisor) or float(divisor) == 0
@@ -0,0 +1,101 @@
+from cfg import Block, Instr, dominators, dominates, reverse_postorder
+
+
+class Loop:
+    """A natural loop: a header plus every block that reaches a back edge to it."""
+
+    def __init__(self, header):
+        self.header = header
+        self.blocks = {header.index}
+        self.latches = []
+
+    def exit_edges(self):
+        """(inside, outside) block pairs for every edge leaving the loop."""
+        edges = []
+        seen = set()
+        stack = [self.header]
+        while stack:
+            b = stack.pop()
+            if b.index in seen:
+                continue
+            seen.add(b.index)
+            for s in b.succs:
+                if s.index in self.blocks:
+                    stack.append(s)
+                else:
+                    edges.append((b, s))
+        return edges
+
+    def __repr__(self):
+        return f"Loop({self.header!r}, {sorted(self.blocks)})"
+
+
+def find_loops(blocks):
+    """Natural loops of a CFG, innermost (smallest) first. Returns (loops, idom)."""
+    idom = dominators(blocks)
+    # A dominator comes first in reverse postorder, so only an edge that goes back
+    # in it can be a back edge, and the walk up from its tail stops at the header
+    number = {b.index: i for i, b in enumerate(reverse_postorder(blocks))}
+    loops = {}
+    for b in blocks:
+        if b.index not in idom:
+            continue
+        for h in b.succs:
+            if number[h.index] > number[b.index] or not dominates(idom, h.index, b.index):
+                continue
+            loop = loops.setdefault(h.index, Loop(h))
+            loop.latches.append(b)
+            stack = [b]
+            while stack:
+                x = stack.pop()
+                if x.index in loop.blocks or x.index not in idom:
+                    continue
+                loop.blocks.add(x.index)
+                stack.extend(x.preds)
+    return sorted(loops.values(), key=lambda l: len(l.blocks)), idom
+
+
+def insert_preheader(func, blocks, loop, instrs, loops=(), idom=None):
+    """Put instrs in a new block that is entered instead of the header from outside the loop.
+
+    The preheader is laid out right before the header, so a fallthrough entry keeps
+    working; jumps from outside the loop are retargeted to its label. The CFG is
+    relinked in place and the preheader is numbered just below the header, so
+    sorted block indices still follow the layout. It joins every other loop of
+    loops that holds the header, and takes the header's place in idom, so the
+    loops of the CFG need not be found again. Callers flatten blocks into
+    func.body once they are done. Returns the new block.
+    """
+    header = loop.header
+    label = func.new_label()
+    outside = [p for p in header.preds if p.index not in loop.blocks]
+    for p in outside:
+        last = p.last()
+        if last is not None and last.is_jump() and last.target == header.label:
+            last.target = label
+
+    at = blocks.index(header)
+    if at > 0:
+        prev = blocks[at - 1]
+        last = prev.last()
+        if prev.index in loop.blocks and (last is None or last.kind not in ('goto', 'return')):
+            # A back edge that used to fall through into the header must now jump
+            prev.instrs.append(Instr('goto', target=header.label))
+
+    pre = Block(header.index - 0.5)
+    pre.instrs = [Instr('label', dest=label)] + list(instrs)
+    blocks.insert(at, pre)
+    pre.preds = outside
+    pre.succs = [header]
+    for p in outside:
+        p.succs = [pre if s is header else s for s in p.succs]
+    header.preds = [pre] + [p for p in header.preds if p.index in loop.blocks]
+
+    for other in loops:
+        if other is not loop and header.index in other.blocks:
+            other.blocks.add(pre.index)
+    if idom is not None and header.index in idom:
+        above = idom[header.index]
+        idom[pre.index] = pre.index if above == header.index else above
+        idom[header.index] = pre.index
+    return pre
@@ -0,0 +1,142 @@
+from asm_generator import AssemblyGenerator, compile_asm
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from frame import add_global, data_section
+from ir_generator import IRGenerator
+from optimizer import optimize_ir
+from regalloc import DEFAULT_REGISTERS
+
+# == Per-function lowering ===
+# After semantic analysis the functions are independent: temps and labels are
+# numbered per function (t3 in main and t3 in calculate are different temps;
+# labels are main_L2 and main_LABEL2), a function's literals are pooled under
+# its own labels, and a call only needs the callee's return type.
+# So each function is lowered on its own, possibly in another process, and the
+# listings are joined in source order; the text does not depend on how many
+# workers there were or which finished first.
+
+IR_HEADER = ["# Intermediate Code Generation Output", "# ==================================="]
+ASM_HEADER_LINES = 3        # comment lines AssemblyGenerator.generate_asm starts with
+SHARED_COUNTERS = ('registers',)    # the same for every function, so not summed
+
+
+class LoweredFunction:
+    """Assembly of one function and what splicing it into a listing needs."""
+
+    def __init__(self, name, asm, frame, stats):
+        self.name = name
+        self.asm = asm          # assembly lines, without generate_asm's header
+        self.frame = frame      # frame.Frame: literal pool and globals used
+        self.stats = stats
+
+
+def function_ir(func):
+    """Unoptimized IR lines of one function."""
+    irgen = IRGenerator(debug=False)
+    irgen.gen_function(func)
+    return irgen.code
+
+
+def lower_function(job):
+    """Backend for one (name, ir_lines, optimize, allocator, return_types) job:
+    register allocation and peephole under optimize, frame layout and assembly.
+
+    Runs in a worker process; return_types maps every function of the program
+    to its return type, for the calls.
+    """
+    name, ir_lines, optimize, allocator, return_types = job
+    generator, stats = compile_asm(ir_lines, peephole=optimize,
+                                   registers=DEFAULT_REGISTERS if optimize else 0,
+                                   allocator=allocator, return_types=return_types)
+    return LoweredFunction(name, generator.asm_code[ASM_HEADER_LINES:],
+                           generator.frames.get(name), stats)
+
+
+class FunctionPool:
+    """Maps per-function work over jobs worker processes, results in input order.
+
+    With jobs=1, or a single item, the work runs in this process. The workers
+    are started on first use and kept until close().
+    """
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self.executor = None
+
+    def map(self, fn, items):
+        items = list(items)
+        if self.jobs <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        chunksize = max(1, len(items) // (self.jobs * 4))
+        return list(self.executor.map(fn, items, chunksize=chunksize))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def optimize_functions(chunks, pool, passes=None):
+    """Optimize each function's IR with the passes (see optimize_ir); returns the
+    new chunks and the merged stats."""
+    optimized = pool.map(partial(optimize_ir, passes=passes), chunks)
+    return [lines for lines, _ in optimized], merge_stats([stats for _, stats in optimized])
+
+
+def merge_stats(per_function):
+    """Combine per-function {pass: {counter: value}} summaries into one.
+
+    Counts add up; text values (the allocator mode, per-function lists) are
+    listed once each, in order.
+    """
+    merged = {}
+    for stats in per_function:
+        for name, counters in stats.items():
+            into = merged.setdefault(name, {})
+            for key, value in counters.items():
+                if key not in into:
+                    into[key] = value
+                elif isinstance(value, int) and key not in SHARED_COUNTERS:
+                    into[key] += value
+                elif isinstance(value, str) and value not in into[key].split(', '):
+                    into[key] = f"{into[key]}, {value}"
+    return merged
+
+
+def splice_ir(chunks):
+    """The IR listing of the per-function chunks, in order."""
+    lines = list(IR_HEADER)
+    for chunk in chunks:
+        lines.extend(chunk)
+    return lines
+
+
+def splice_asm(lowered):
+    """The assembly listing of LoweredFunctions, in order, with the .DATA
+    section built from the globals and literal pools of all of them."""
+    asm_code = AssemblyGenerator().generate_asm([])[:ASM_HEADER_LINES]
+    global_types = {}
+    frames = []
+    for unit in lowered:
+        asm_code.extend(unit.asm)
+        if unit.frame:
+            frames.append(unit.frame)
+            for name, kind in unit.frame.globals.items():
+                add_global(global_types, name, kind)
+    generator = AssemblyGenerator(data=data_section(global_types, frames))
+    generator.asm_code = asm_code
+    return generator.format_assembly(), len(global_types)
+
+
+def lower_program(chunks, names, options, return_types, pool):
+    """Backend for every function; returns the assembly listing and the stats."""
+    jobs = [(name, chunk, options.optimize, options.allocator, return_types)
+            for name, chunk in zip(names, chunks)]
+    lowered = pool.map(lower_function, jobs)
+    asm, global_count = splice_asm(lowered)
+    stats = merge_stats([unit.stats for unit in lowered])
+    if 'frame' in stats:
+        stats['frame']['globals'] = global_count    # not the sum: functions share them
+    return asm, stats
@@ -1,118 +1,199 @@
-from lexer import tokenize, write_tokens
-from parser import Parser, ParserError
-from semantic import SemanticAnalyzer
-from ir_generator import IRGenerator
-from asm_generator import generate_asm_from_ir
-from mini_ast import pretty_print
-import sys
-import traceback
-
-def read_input(filename='input.c'):
-    """Read input C code file."""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        print(f"Error: Could not find {filename}")
-        print("Please create an input.c file with your C code.")
-        sys.exit(1)
-
-def run_all():
-    """Run all compiler phases."""
-    print("Mini C Compiler - Starting compilation...")
-    print("=" * 50)
-    
-    # 1. Read input
-    try:
-        code = read_input('input.c')
-        print("Read input file")
-        print(f"  Input size: {len(code)} characters")
-    except Exception as e:
-        print(f"Failed to read input: {e}")
-        sys.exit(1)
-    
-    # 2. Lexical Analysis
-    try:
-        tokens = tokenize(code)
-        write_tokens(tokens, 'lexical_output.txt')
-        print("Lexical analysis completed")
-        print(f"  Generated {len(tokens)} tokens")
-    except Exception as e:
-        print(f"Lexical analysis failed: {e}")
-        sys.exit(1)
-    
-    # 3. Syntax Analysis
-    try:
-        parser = Parser(tokens)
-        program = parser.parse()
-        parser.write_syntax_output(program, 'syntax_output.txt')
-        print("Syntax analysis completed")
-        print(f"  Found {len(program.functions)} function(s)")
-    except ParserError as e:
-        print(f"Syntax analysis failed: {e}")
-        with open('syntax_output.txt', 'w') as f:
-            f.write(f"Syntax Error: {e}\n")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Unexpected error in syntax analysis: {e}")
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # 4. Semantic Analysis
-    try:
-        analyzer = SemanticAnalyzer()
-        errors = analyzer.analyze(program)
-        analyzer.symtab.dump('symbol_table_output.txt')
-        analyzer.write_semantic_output('semantic_report.txt')
-        
-        if errors:
-            print(f"Semantic analysis completed with {len(errors)} warnings")
-        else:
-            print("Semantic analysis completed - No errors found")
-    except Exception as e:
-        print(f"Semantic analysis failed: {e}")
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # 5. Generate AST dump
-    try:
-        with open('ast_dump.txt', 'w', encoding='utf-8') as f:
-            for line in pretty_print(program):
-                f.write(line + '\n')
-        print("AST generated")
-    except Exception as e:
-        print(f"AST generation failed: {e}")
-    
-    # 6. Intermediate Code Generation
-    try:
-        irgen = IRGenerator(debug=False)
-        irgen.generate(program)
-        irgen.write_output('intermediate_code_output.txt')
-        print("Intermediate code generation completed")
-    except Exception as e:
-        print(f"Intermediate code generation failed: {e}")
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # 7. Assembly Code Generation
-    try:
-        generate_asm_from_ir('intermediate_code_output.txt', 'assembly_output.asm')
-        print("Assembly code generation completed")
-    except Exception as e:
-        print(f"Assembly code generation failed: {e}")
-        traceback.print_exc()
-        sys.exit(1)
-    
-    print("\n" + "=" * 50)
-    print("  Compilation completed successfully!")
-    print("\nGenerated output files:")
-    print("  - lexical_output.txt")
-    print("  - syntax_output.txt") 
-    print("  - symbol_table_output.txt")
-    print("  - semantic_report.txt")
-    print("  - ast_dump.txt")
-    print("  - intermediate_code_output.txt")
-    print("  - assembly_output.asm")
-
-if __name__ == '__main__':
-    run_all()
\ No newline at end of file
+from batch import run_batch
+from cache import DEFAULT_CACHE_DIR
+from compiler import CompileError, CompileOptions, compile_source
+from incremental import watch
+from optimizer import write_stats
+from profiler import write_profile
+from artifacts import REPORT_FORMATS
+from reports import select_reports
+from streaming import run_stream
+from simulator import SimulationError, Simulator, write_report
+from x86_backend import X86Error
+import sys
+import traceback
+
+def read_input(filename='input.c'):
+    """Read input C code file."""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Error: Could not find {filename}")
+        print("Please create an input.c file with your C code.")
+        sys.exit(1)
+
+def list_reports(reports):
+    """Print the names of the reports compile_source wrote."""
+    for name in reports:
+        print(f"  Wrote {name}")
+
+def run_all(optimize=False, allocator='graph', simulate=False, x86=False, profile=False,
+            cprofile_dir=None, cache_dir=DEFAULT_CACHE_DIR, jobs=1, reports=True,
+            report_format='text', ssa=False):
+    """Run all compiler phases.
+
+    optimize turns on the IR optimizer, register allocation (with the given
+    allocator mode) and the peephole optimizer (with ssa, the IR optimizer
+    also goes through SSA form and back); simulate runs the generated assembly
+    on the cycle-counting simulator afterwards; x86 also writes native x86-64
+    assembly for the GNU assembler. profile prints time, allocation peak and
+    counters per phase and writes them to profile_report.json; with
+    cprofile_dir each phase is also dumped there as a cProfile file. Phase
+    results are cached in cache_dir (None turns the cache off; profiling does
+    not use it). jobs > 1 optimizes and lowers the functions in that many
+    worker processes. reports selects the reports to write (see
+    reports.select_reports); they are written on a background thread while the
+    later phases run. report_format 'jsonl' or 'bin' writes the tokens,
+    symbols and IR reports as machine-readable artifacts (see artifacts.py)
+    instead of text tables.
+    """
+    print("Mini C Compiler - Starting compilation...")
+    print("=" * 50)
+    
+    # 1. Read input
+    try:
+        code = read_input('input.c')
+        print("Read input file")
+        print(f"  Input size: {len(code)} characters")
+    except Exception as e:
+        print(f"Failed to read input: {e}")
+        sys.exit(1)
+    
+    # 2. Compile: lexing, parsing, semantic analysis, IR and assembly
+    options = CompileOptions(optimize=optimize, allocator=allocator, x86=x86, reports=reports,
+                             report_dir='.', profile=profile, cprofile_dir=cprofile_dir,
+                             cache_dir=cache_dir, jobs=jobs, report_format=report_format,
+                             ssa=ssa)
+    try:
+        result = compile_source(code, options)
+    except CompileError as e:
+        print(f"{e.phase.capitalize()} failed: {e.message}")
+        list_reports(e.reports)
+        sys.exit(1)
+    except X86Error as e:
+        print(f"x86-64 code generation failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Compilation failed: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    
+    # 3. Reports (already written)
+    list_reports(result.reports)
+    print(f"  Generated {len(result.tokens)} tokens")
+    print(f"  Found {len(result.program.functions)} function(s)")
+    if result.warnings:
+        print(f"Semantic analysis completed with {len(result.warnings)} warnings")
+    else:
+        print("Semantic analysis completed - No errors found")
+    if optimize:
+        write_stats(result.ir_stats)
+        write_stats(result.asm_stats)
+    if result.cache_stats:
+        write_stats({'cache': result.cache_stats})
+    
+    # 4. Profile
+    if result.profile:
+        print("\nPhase profile:")
+        for line in result.profile.summary():
+            print(line)
+        write_profile(result.profile, 'profile_report.json',
+                      input={'file': 'input.c', 'characters': len(code),
+                             'lines': code.count('\n') + 1},
+                      options={'optimize': optimize, 'allocator': allocator, 'x86': x86,
+                               'ssa': ssa})
+        if cprofile_dir:
+            print(f"cProfile dumps written to {cprofile_dir}/")
+    
+    # 5. Simulation
+    if simulate:
+        try:
+            sim = Simulator(result.asm).run()
+            write_report(sim, 'simulation_report.txt')
+            print(f"  Returned {sim.return_value} after {sim.instructions:,} instructions, "
+                  f"{sim.cycles:,} cycles")
+        except SimulationError as e:
+            print(f"Simulation failed: {e}")
+            sys.exit(1)
+    
+    print("\n" + "=" * 50)
+    print("  Compilation completed successfully!")
+    print("\nGenerated output files:")
+    for name in result.reports:
+        print(f"  - {name}")
+    if profile:
+        print("  - profile_report.json")
+    if simulate:
+        print("  - simulation_report.txt")
+
+def main(argv):
+    """The command line: compile as the options in argv say; returns the exit status
+    (run_all exits by itself when compilation fails)."""
+    # Usage: python main.py [-O] [--linear-scan] [--simulate] [--x86] [--profile] [--cprofile DIR]
+    #                       [-j N]
+    #        python main.py [-O] [--linear-scan] [--x86] [-j N] [-o OUTDIR] FILE.c...
+    #        python main.py --watch [-O] [--linear-scan] [--x86] [FILE.c]
+    #        python main.py --stream [-O] [--linear-scan] [-o OUTDIR] [FILE.c]
+    # All of them take --ssa: with -O, the IR optimizer also goes through SSA form and back.
+    # The first two take [--cache-dir DIR | --no-cache], [--reports NAME,... | none] and
+    # [--format=text|jsonl|bin] (tokens, symbols and IR as .jsonl/.bin artifacts).
+    # -j is the number of worker processes: per function for input.c, per file for a batch
+    args = [part for a in argv
+            for part in (a.split('=', 1) if a.startswith('--format=') else [a])]
+    values = {}
+    for flag in ('--cprofile', '-j', '-o', '--cache-dir', '--reports', '--format'):
+        if flag in args:
+            at = args.index(flag)
+            values[flag] = args[at + 1]
+            del args[at:at + 2]
+    files = [a for a in args if not a.startswith('-')]
+    if '--watch' in args:
+        options = CompileOptions(optimize='-O' in args, ssa='--ssa' in args,
+                                 allocator='linear' if '--linear-scan' in args else 'graph',
+                                 x86='--x86' in args, reports=True)
+        try:
+            watch(files[0] if files else 'input.c', options)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+        return 0
+    if '--stream' in args:
+        options = CompileOptions(optimize='-O' in args, ssa='--ssa' in args,
+                                 allocator='linear' if '--linear-scan' in args else 'graph')
+        return run_stream(files[0] if files else 'input.c', values.get('-o', '.'), options)
+    cache_dir = None if '--no-cache' in args else values.get('--cache-dir', DEFAULT_CACHE_DIR)
+    # Report names: lexical, syntax, symbols, semantic, ast, ir, asm, x86 or file names
+    reports = values.get('--reports', 'all')
+    reports = True if reports == 'all' else [] if reports == 'none' else reports.split(',')
+    try:
+        select_reports(reports)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    report_format = values.get('--format', 'text')
+    if report_format not in REPORT_FORMATS:
+        print(f"Error: unknown report format {report_format!r} "
+              f"(expected {', '.join(REPORT_FORMATS)})")
+        return 1
+    if files:
+        options = CompileOptions(optimize='-O' in args, ssa='--ssa' in args,
+                                 allocator='linear' if '--linear-scan' in args else 'graph',
+                                 x86='--x86' in args, reports=reports, cache_dir=cache_dir,
+                                 report_format=report_format)
+        return run_batch(files, values.get('-o', 'build'), options,
+                         int(values['-j']) if '-j' in values else None)
+    cprofile_dir = values.get('--cprofile')
+    run_all(optimize='-O' in args,
+            ssa='--ssa' in args,
+            allocator='linear' if '--linear-scan' in args else 'graph',
+            simulate='--simulate' in args,
+            x86='--x86' in args,
+            profile='--profile' in args or cprofile_dir is not None,
+            cprofile_dir=cprofile_dir,
+            cache_dir=cache_dir,
+            jobs=int(values.get('-j', 1)),
+            reports=reports,
+            report_format=report_format)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,42 @@
+from cfg import parse_program
+from value_numbering import ValueNumbering
+from dead_code import DeadCodeElimination
+from ssa import SSARoundTrip
+from temp_recycling import TempRecycler
+from licm import LoopInvariantCodeMotion
+from strength_reduction import InductionVariables
+
+# == Available IR passes, in the order they run ===
+# 'ssa' (into SSA form and back, see ssa.py) only runs in SSA_PIPELINE (-O --ssa)
+PASSES = {
+    'gvn': ValueNumbering,
+    'licm': LoopInvariantCodeMotion,
+    'ivsr': InductionVariables,
+    'dce': DeadCodeElimination,
+    'ssa': SSARoundTrip,
+    'temps': TempRecycler,
+}
+DEFAULT_PIPELINE = ['gvn', 'licm', 'ivsr', 'dce', 'temps']
+SSA_PIPELINE = ['gvn', 'licm', 'ivsr', 'dce', 'ssa', 'temps']
+
+
+def optimize_ir(ir_lines, passes=None):
+    """Run IR optimization passes over every function.
+
+    Returns the optimized IR lines and a {pass name: {counter: value}} summary.
+    """
+    program = parse_program(ir_lines)
+    stats = {}
+    for name in passes or DEFAULT_PIPELINE:
+        opt = PASSES[name]()
+        for func in program.functions:
+            opt.run(func)
+        stats[name] = opt.stats()
+    return program.render(), stats
+
+
+def write_stats(stats):
+    """Print a short optimization summary."""
+    for name, counters in stats.items():
+        summary = ", ".join(f"{k}: {v}" for k, v in counters.items())
+        print(f"  [{name}] {summary}")
@@ -0,0 +1,364 @@
+import re
+
+from cfg import is_const, is_temp
+
+# == Instruction classes of the pseudo-assembly ===
+CONDITIONAL_JUMPS = ('JE', 'JNE', 'JL', 'JG', 'JLE', 'JGE')
+NEGATED_JUMP = {'JE': 'JNE', 'JNE': 'JE', 'JL': 'JGE', 'JGE': 'JL', 'JG': 'JLE', 'JLE': 'JG'}
+ARITH_OPS = ('ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'AND', 'OR')
+COMMUTATIVE_ARITH = ('ADD', 'MUL', 'AND', 'OR')
+
+# How far back a rule may look past comments and labels
+WINDOW = 8
+
+# Allocatable registers; R0 carries return values and is never forwarded
+SCRATCH_REGISTER_RE = re.compile(r'^R[1-9]\d*$')
+# Local frame slots (parameters live above BP and belong to the caller's view)
+FRAME_SLOT_RE = re.compile(r'^\[BP-\d+\]$')
+
+
+def read_location(operand):
+    """What an operand reads: unary IR is lowered to MOV d, -x and MOV d, !x, which read x."""
+    return operand[1:] if operand[:1] in ('-', '!') else operand
+
+
+def is_scratch(operand):
+    """Temps, allocatable registers and frame slots: values that only this function can see."""
+    return (is_temp(operand) or bool(SCRATCH_REGISTER_RE.match(operand))
+            or bool(FRAME_SLOT_RE.match(operand)))
+
+
+class AsmLine:
+    """One line of assembly: a 'code' instruction, a 'label', or 'other' (comment/blank)."""
+
+    __slots__ = ('kind', 'op', 'args', 'text', 'dead')
+
+    def __init__(self, kind, op=None, args=(), text=None):
+        self.kind = kind
+        self.op = op            # mnemonic, or the label name
+        self.args = list(args)
+        self.text = text        # original text of comments and blank lines
+        self.dead = False       # MOV d, t only: t is not live afterwards
+
+    def render(self):
+        if self.kind == 'label':
+            return f"{self.op}:"
+        if self.kind == 'other':
+            return self.text
+        if self.args:
+            return f"    {self.op} {', '.join(self.args)}"
+        return f"    {self.op}"
+
+    def derive(self, op, args):
+        """A new instruction replacing this one."""
+        return AsmLine('code', op, args)
+
+    def is_jump(self):
+        return self.kind == 'code' and (self.op == 'JMP' or self.op in CONDITIONAL_JUMPS)
+
+
+def parse_asm_line(line):
+    stripped = line.strip()
+    if not stripped or stripped.startswith(';'):
+        return AsmLine('other', text=line)
+    if stripped.endswith(':') and not line.startswith(' '):
+        return AsmLine('label', stripped[:-1])
+    parts = stripped.split(None, 1)
+    args = [a.strip() for a in parts[1].split(',')] if len(parts) > 1 else []
+    return AsmLine('code', parts[0], args)
+
+
+class PeepholeOptimizer:
+    """Sliding-window peephole optimizer over the output of AssemblyGenerator.
+
+    Lines are fed one at a time into an output window. Every line entering the
+    window is offered to the rules of RULES in order; a rule that matches may take
+    lines back out of the window and returns the lines to feed in their place, so
+    rewrites cascade (a removed jump can expose a redundant move, and so on). Each
+    rule looks at most WINDOW lines back, so the whole run is linear in the size of
+    the program.
+    """
+
+    name = 'peephole'
+
+    # (rule name, method) in the order they are tried
+    RULES = (
+        ('unreachable code', 'drop_unreachable'),
+        ('jump chain', 'collapse_jump_chain'),
+        ('constant compare', 'fold_constant_compare'),
+        ('compare with zero', 'compare_with_zero'),
+        ('redundant move', 'drop_redundant_move'),
+        ('temp forwarding', 'forward_temp'),
+        ('jump to next', 'drop_jump_to_next'),
+        ('branch over jump', 'invert_branch_over_jump'),
+    )
+
+    def __init__(self):
+        self.rules = [(name, getattr(self, method)) for name, method in self.RULES]
+        self.hits = {name: 0 for name, _ in self.RULES}
+        self.chain = {}
+        self.before = 0
+        self.after = 0
+
+    def stats(self):
+        counters = {'lines before': self.before, 'lines after': self.after}
+        counters.update(self.hits)
+        return counters
+
+    def optimize(self, asm_lines):
+        """Return the optimized version of a list of assembly lines."""
+        entries = [parse_asm_line(line) for line in asm_lines]
+        self.annotate(entries)
+        out = []
+        for e in entries:
+            self.feed(out, e)
+        self.before += sum(1 for e in entries if e.kind == 'code')
+        self.after += sum(1 for e in out if e.kind == 'code')
+        return [e.render() for e in out]
+
+    def feed(self, out, line):
+        pending = [line]
+        while pending:
+            e = pending.pop()
+            for name, rule in self.rules:
+                replacement = rule(out, e)
+                if replacement is not None:
+                    self.hits[name] += 1
+                    pending.extend(reversed(replacement))
+                    break
+            else:
+                out.append(e)
+
+    # == Analysis ===
+
+    def annotate(self, entries):
+        """Precompute scratch liveness after copies and the targets of jump chains."""
+        start = 0
+        for k, e in enumerate(entries + [AsmLine('label', 'FUNC_')]):
+            if e.kind == 'label' and e.op.startswith('FUNC_'):
+                self.mark_dead_copies(entries[start:k])
+                start = k
+
+        # Labels whose first instruction is an unconditional jump
+        direct = {}
+        waiting = []
+        for e in entries:
+            if e.kind == 'label':
+                waiting.append(e.op)
+            elif e.kind == 'code':
+                if e.op == 'JMP':
+                    for label in waiting:
+                        direct[label] = e.args[0]
+                waiting = []
+        for label in direct:
+            self.resolve(direct, label)
+
+    def mark_dead_copies(self, entries):
+        """Set .dead on every MOV d, t after which t (temp, register or slot) is dead (one function)."""
+        blocks = [[]]
+        for e in entries:
+            if e.kind == 'label' and blocks[-1]:
+                blocks.append([])
+            if e.kind != 'other':
+                blocks[-1].append(e)
+            if e.kind == 'code' and (e.is_jump() or e.op == 'RET'):
+                blocks.append([])
+        where = {}
+        for n, block in enumerate(blocks):
+            for e in block:
+                if e.kind == 'label':
+                    where[e.op] = n
+
+        succs = []
+        for n, block in enumerate(blocks):
+            last = block[-1] if block else None
+            targets = []
+            if last is not None and last.is_jump():
+                # A jump out of the function (should not happen) keeps everything live
+                targets.append(where.get(last.args[0], -1))
+            if last is None or (last.op != 'JMP' and last.op != 'RET'):
+                if n + 1 < len(blocks):
+                    targets.append(n + 1)
+            succs.append(targets)
+
+        def transfer(e, live):
+            if e.op in ('MOV', 'POP') and e.args and is_scratch(e.args[0]):
+                live.discard(e.args[0])
+            reads = e.args[1:] if e.op in ('MOV', 'POP') else e.args
+            live.update(read_location(a) for a in reads if is_scratch(read_location(a)))
+
+        everything = {read_location(a) for block in blocks for e in block if e.kind == 'code'
+                      for a in e.args if is_scratch(read_location(a))}
+        live_in = [set() for _ in blocks]
+        changed = True
+        while changed:
+            changed = False
+            for n in range(len(blocks) - 1, -1, -1):
+                live = set()
+                for m in succs[n]:
+                    live |= live_in[m] if m >= 0 else everything
+                for e in reversed(blocks[n]):
+                    if e.kind == 'code':
+                        transfer(e, live)
+                if live != live_in[n]:
+                    live_in[n] = live
+                    changed = True
+
+        for n, block in enumerate(blocks):
+            live = set()
+            for m in succs[n]:
+                live |= live_in[m] if m >= 0 else everything
+            for e in reversed(block):
+                if e.kind != 'code':
+                    continue
+                if e.op == 'MOV' and len(e.args) == 2 and is_scratch(e.args[1]):
+                    e.dead = e.args[1] not in live
+                transfer(e, live)
+
+    def resolve(self, direct, label):
+        """Final destination of a chain of jumps starting at label."""
+        path = []
+        seen = set()
+        while label in direct and label not in self.chain and label not in seen:
+            seen.add(label)
+            path.append(label)
+            label = direct[label]
+        final = self.chain.get(label, label)
+        if label in seen:
+            final = label       # a jump cycle: leave it alone
+        for p in path:
+            self.chain[p] = final
+        return final
+
+    # == Window helpers ===
+
+    def previous_code(self, out, start=None, skip_labels=False):
+        """Index of the closest code line before start, looking past comments (and labels)."""
+        i = len(out) - 1 if start is None else start - 1
+        stop = max(-1, i - WINDOW)
+        while i > stop:
+            kind = out[i].kind
+            if kind == 'code':
+                return i
+            if kind == 'label' and not skip_labels:
+                return None
+            i -= 1
+        return None
+
+    # == Rules ===
+
+    def drop_unreachable(self, out, e):
+        """Code after JMP or RET up to the next label can never run (e.g. a second epilogue)."""
+        if e.kind != 'code':
+            return None
+        i = self.previous_code(out)
+        if i is not None and out[i].op in ('JMP', 'RET'):
+            return []
+        return None
+
+    def collapse_jump_chain(self, out, e):
+        """Jump straight to the end of a chain of jumps."""
+        if not e.is_jump():
+            return None
+        final = self.chain.get(e.args[0])
+        if final is None or final == e.args[0]:
+            return None
+        return [e.derive(e.op, [final])]
+
+    def fold_constant_compare(self, out, e):
+        """CMP of two literals followed by a conditional jump is decided at compile time."""
+        if not e.is_jump() or e.op == 'JMP':
+            return None
+        i = self.previous_code(out)
+        if i is None or out[i].op != 'CMP' or not all(is_const(a) for a in out[i].args):
+            return None
+        a, b = (float(x) for x in out.pop(i).args)
+        taken = {'JE': a == b, 'JNE': a != b, 'JL': a < b, 'JG': a > b,
+                 'JLE': a <= b, 'JGE': a >= b}[e.op]
+        return [e.derive('JMP', e.args)] if taken else []
+
+    def compare_with_zero(self, out, e):
+        """CMP x, 0 becomes TEST x, x (same flags for every conditional jump)."""
+        if e.kind != 'code' or e.op != 'CMP' or e.args[1] != '0' or is_const(e.args[0]):
+            return None
+        return [e.derive('TEST', [e.args[0], e.args[0]])]
+
+    def drop_redundant_move(self, out, e):
+        """MOV a, a; MOV a, b after MOV b, a; and a MOV overwritten by the next MOV."""
+        if e.kind != 'code' or e.op != 'MOV':
+            return None
+        a, b = e.args
+        if a == b:
+            return []
+        i = self.previous_code(out)
+        if i is None or out[i].op != 'MOV':
+            return None
+        pa, pb = out[i].args
+        if pa == b and pb == a:
+            return []
+        if pa == a and read_location(b) != a:
+            del out[i]
+            return [e]
+        return None
+
+    def forward_temp(self, out, e):
+        """MOV t, x / OP t, y ... / MOV d, t with t dead afterwards: compute into d directly."""
+        if e.kind != 'code' or e.op != 'MOV' or not e.dead:
+            return None
+        d, t = e.args
+        chain = []
+        i = self.previous_code(out)
+        while i is not None and out[i].op in ARITH_OPS and out[i].args[0] == t and len(chain) < WINDOW:
+            chain.append(i)
+            i = self.previous_code(out, i)
+        if i is None or out[i].op != 'MOV' or out[i].args[0] != t:
+            return None
+        x = out[i].args[1]
+        ops = [out[k] for k in reversed(chain)]
+        operands = [read_location(op.args[1]) for op in ops]
+        if read_location(x) == t or t in operands:
+            return None
+
+        if d in operands:
+            # MOV d, x would clobber an operand before it is read, unless a single
+            # commutative operation can take its operands the other way round
+            if len(ops) != 1 or ops[0].op not in COMMUTATIVE_ARITH:
+                return None
+            code = [e.derive(ops[0].op, [d, x])]
+        else:
+            code = [e.derive(op.op, [d, op.args[1]]) for op in ops]
+            if d != x:
+                code.insert(0, e.derive('MOV', [d, x]))
+        for k in chain + [i]:
+            del out[k]
+        return code
+
+    def drop_jump_to_next(self, out, e):
+        """A jump to the label that immediately follows it (with its CMP if conditional)."""
+        if e.kind != 'label':
+            return None
+        i = self.previous_code(out, skip_labels=True)
+        if i is None or not out[i].is_jump() or out[i].args[0] != e.op:
+            return None
+        conditional = out[i].op != 'JMP'
+        del out[i]
+        if conditional:
+            j = self.previous_code(out, i)
+            if j == i - 1 and out[j].op in ('CMP', 'TEST'):
+                del out[j]
+        return [e]
+
+    def invert_branch_over_jump(self, out, e):
+        """Jcc L1 / JMP L2 / L1: becomes Jncc L2 / L1:"""
+        if e.kind != 'label':
+            return None
+        i = self.previous_code(out)
+        if i is None or out[i].op != 'JMP':
+            return None
+        j = self.previous_code(out, i)
+        if j is None or out[j].op not in CONDITIONAL_JUMPS or out[j].args[0] != e.op:
+            return None
+        jump = out[j].derive(NEGATED_JUMP[out[j].op], out[i].args)
+        del out[i]
+        del out[j]
+        return [jump, e]
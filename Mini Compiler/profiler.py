@@ -0,0 +1,137 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+
+
+class PhaseStats:
+    """Measurements of one compiler phase."""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0         # seconds
+        self.cpu = 0.0          # seconds of CPU time in the compiling thread
+        self.peak = 0           # bytes allocated at the peak, above the phase's start
+        self.allocated = 0      # bytes still allocated when the phase ended
+        self.counters = {}
+
+    def rate(self, count):
+        """count per second of wall time."""
+        return round(count / self.wall) if self.wall else 0
+
+    def to_dict(self):
+        return {'phase': self.name,
+                'wall ms': round(self.wall * 1000, 3),
+                'cpu ms': round(self.cpu * 1000, 3),
+                'peak kb': round(self.peak / 1024, 1),
+                'retained kb': round(self.allocated / 1024, 1),
+                'counters': self.counters}
+
+
+class PhaseTimer:
+    """Context manager that measures one phase into a PhaseStats."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.stats = PhaseStats(name)
+        self.cprofile = None
+        self.start_memory = 0
+
+    def __enter__(self):
+        if self.profiler.cprofile_dir is not None:
+            self.cprofile = cProfile.Profile()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_cpu = time.thread_time()
+        self.start_wall = time.perf_counter()
+        if self.cprofile:
+            self.cprofile.enable()
+        return self.stats
+
+    def __exit__(self, *exc):
+        if self.cprofile:
+            self.cprofile.disable()
+        stats = self.stats
+        stats.wall = time.perf_counter() - self.start_wall
+        stats.cpu = time.thread_time() - self.start_cpu
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stats.peak = max(0, peak - self.start_memory)
+            stats.allocated = current - self.start_memory
+        if self.cprofile:
+            slug = stats.name.replace(' ', '_')
+            self.cprofile.dump_stats(os.path.join(self.profiler.cprofile_dir, f"{slug}.prof"))
+        self.profiler.phases.append(stats)
+        return False
+
+
+class PhaseProfiler:
+    """Wall time, CPU time, allocation peak and counters per compiler phase.
+
+    Use phase(name) as a context manager around each phase; it yields the
+    PhaseStats, whose counters the caller fills in. tracemalloc is started
+    for the profiler's lifetime unless already running (allocation figures are
+    process-wide, so they are only exact for one compilation at a time). With
+    cprofile_dir set each phase also dumps a cProfile file, <phase>.prof, for
+    pstats, snakeviz or flameprof. Both slow the phases they measure down.
+    """
+
+    def __init__(self, enabled=True, cprofile_dir=None, trace_memory=True):
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir
+        self.phases = []
+        self.started_tracing = False
+        if enabled and trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if enabled and cprofile_dir is not None:
+            os.makedirs(cprofile_dir, exist_ok=True)
+
+    def phase(self, name):
+        if not self.enabled:
+            return NullPhase()
+        return PhaseTimer(self, name)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def report(self):
+        """The measurements as a JSON-serialisable dict."""
+        return {'phases': [p.to_dict() for p in self.phases],
+                'total': {'wall ms': round(sum(p.wall for p in self.phases) * 1000, 3),
+                          'cpu ms': round(sum(p.cpu for p in self.phases) * 1000, 3),
+                          'peak kb': round(max((p.peak for p in self.phases), default=0) / 1024, 1)}}
+
+    def summary(self):
+        """Lines of a table of the phases, for printing."""
+        lines = [f"  {'PHASE':<20}{'WALL ms':>10}{'CPU ms':>10}{'PEAK kb':>10}  COUNTERS"]
+        for p in self.phases:
+            counters = ", ".join(f"{k}: {v}" for k, v in p.counters.items())
+            lines.append(f"  {p.name:<20}{p.wall * 1000:>10.2f}{p.cpu * 1000:>10.2f}"
+                         f"{p.peak / 1024:>10.1f}  {counters}")
+        return lines
+
+
+class NullPhase:
+    """Stand-in for PhaseTimer when profiling is off; the stats it yields are thrown away."""
+
+    def __enter__(self):
+        return PhaseStats('')
+
+    def __exit__(self, *exc):
+        return False
+
+
+def write_profile(profiler, filename='profile_report.json', **extra):
+    """Write profiler.report() (plus any extra top-level keys) as JSON."""
+    report = dict(extra)
+    report.update(profiler.report())
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Profile report written to {filename}")
@@ -0,0 +1,392 @@
+import bisect
+import heapq
+from itertools import chain
+
+from cfg import build_cfg, liveness, parse_program
+from loops import find_loops
+
+# == Register file ===
+DEFAULT_REGISTERS = 8       # R1..R8; R0 is reserved for return values
+
+
+def register_names(count):
+    return [f"R{i}" for i in range(1, count + 1)]
+
+
+class RegisterAllocator:
+    """Assign the locals and temps of each function to registers R1..Rk.
+
+    Two modes share the same interference information:
+
+    - 'graph': Chaitin-Briggs colouring. Copies between non-interfering names are
+      coalesced when the Briggs test says the merged node stays colourable; when no
+      node of degree < k is left, the one with the lowest spill cost per neighbour
+      is pushed optimistically and only spilled if no colour is left for it.
+    - 'linear': linear scan over live intervals (Poletto & Sarkar), spilling the
+      interval that ends last. Faster to compute, no coalescing.
+
+    Registers are caller-saved, so names live across a CALL are always spilled.
+    Spilled names (renamed per web) stay in the IR and get their stack slots from
+    the frame layout; parameters and globals keep their memory operands.
+    """
+
+    name = 'regalloc'
+
+    def __init__(self, registers=DEFAULT_REGISTERS, mode='graph'):
+        if registers < 1:
+            raise ValueError("at least one allocatable register is needed")
+        if mode not in ('graph', 'linear'):
+            raise ValueError(f"unknown allocation mode '{mode}'")
+        self.registers = register_names(registers)
+        self.mode = mode
+        self.in_registers = 0
+        self.spilled = 0
+        self.coalesced = 0
+
+    def stats(self):
+        return {'mode': self.mode, 'registers': len(self.registers),
+                'names in registers': self.in_registers, 'names spilled': self.spilled,
+                'moves coalesced': self.coalesced}
+
+    def run(self, func):
+        """Rewrite one IRFunction in terms of registers."""
+        params = set(func.param_names())
+        order = {}
+        for ins in func.body:
+            for n in ins.defs() + ins.uses():
+                if n not in order and n not in params and func.is_local(n):
+                    order[n] = len(order)
+        if not order:
+            return
+
+        blocks = build_cfg(func.body)
+        order = split_webs(blocks, order)
+        live_in, live_out = liveness(blocks)
+        # Linear scan works from live intervals and needs no interference edges
+        graph = InterferenceGraph(order, blocks, live_out, edges=self.mode == 'graph')
+
+        if self.mode == 'graph':
+            colours = self.colour_graph(graph)
+        else:
+            colours = self.linear_scan(graph, blocks, live_in, live_out)
+
+        location = {}
+        for n in order:
+            rep = graph.find(n)
+            if rep in colours:
+                location[n] = self.registers[colours[rep]]
+            else:
+                location[n] = rep
+        self.in_registers += sum(1 for n in order if graph.find(n) in colours)
+        self.spilled += sum(1 for n in order if graph.find(n) not in colours)
+
+        body = []
+        for ins in func.body:
+            ins.args = [location.get(a, a) for a in ins.args]
+            if ins.defs() and ins.kind != 'param':
+                ins.dest = location.get(ins.dest, ins.dest)
+            if ins.kind == 'copy' and ins.dest == ins.args[0]:
+                self.coalesced += 1
+                continue
+            body.append(ins)
+        func.body = body
+
+    # == Graph colouring ===
+
+    def colour_graph(self, graph):
+        k = len(self.registers)
+        graph.coalesce(k)
+        nodes = [n for n in graph.nodes() if n not in graph.across_call]
+        in_graph = set(nodes)
+        adj = {n: [m for m in graph.neighbours(n) if m in in_graph] for n in nodes}
+        degree = {n: len(adj[n]) for n in nodes}
+
+        def spill_cost(m):
+            return graph.cost[m] / max(degree[m], 1)
+
+        stack = []
+        remaining = set(nodes)
+        low = [n for n in nodes if degree[n] < k]
+        # Spill candidates: (cost per interference, order, name). Degrees only
+        # fall, so a stored cost is never above the current one; a stale entry
+        # is pushed again with its current cost when it comes out on top
+        spills = [(spill_cost(n), graph.order[n], n) for n in nodes]
+        heapq.heapify(spills)
+        while remaining:
+            while low and low[-1] not in remaining:
+                low.pop()
+            if low:
+                n = low.pop()
+            else:
+                # Potential spill: cheapest per interference removed
+                while True:
+                    cost, _, n = heapq.heappop(spills)
+                    if n not in remaining:
+                        continue
+                    if cost == spill_cost(n):
+                        break
+                    heapq.heappush(spills, (spill_cost(n), graph.order[n], n))
+            remaining.discard(n)
+            stack.append(n)
+            for m in adj[n]:
+                if m in remaining:
+                    degree[m] -= 1
+                    if degree[m] == k - 1:
+                        low.append(m)
+
+        colours = {}
+        for n in reversed(stack):
+            taken = {colours[m] for m in adj[n] if m in colours}
+            for c in range(k):
+                if c not in taken:
+                    colours[n] = c
+                    break
+        return colours
+
+    # == Linear scan ===
+
+    def linear_scan(self, graph, blocks, live_in, live_out):
+        intervals = {}
+
+        def extend(n, at):
+            if n in graph.order and n not in graph.across_call:
+                lo, hi = intervals.get(n, (at, at))
+                intervals[n] = (min(lo, at), max(hi, at))
+
+        at = 0
+        for b in blocks:
+            start = at
+            for n in live_in[b.index]:
+                extend(n, start)
+            for ins in b.instrs:
+                for n in ins.uses() + ins.defs():
+                    extend(n, at)
+                at += 1
+            for n in live_out[b.index]:
+                extend(n, at - 1 if b.instrs else start)
+
+        k = len(self.registers)
+        free = list(range(k))       # heap: the lowest free register is taken first
+        active = []                 # (end, order, name), sorted; at most k long
+        colours = {}
+        for n in sorted(intervals, key=lambda m: (intervals[m][0], graph.order[m])):
+            start, end = intervals[n]
+            expired = bisect.bisect_left(active, (start,))
+            for _, _, m in active[:expired]:
+                heapq.heappush(free, colours[m])
+            del active[:expired]
+            if free:
+                colours[n] = heapq.heappop(free)
+            else:
+                last_end, _, last = active[-1]
+                if last_end <= end:
+                    continue        # n itself is spilled
+                colours[n] = colours.pop(last)
+                active.pop()
+            bisect.insort(active, (end, graph.order[n], n))
+        return colours
+
+
+def split_webs(blocks, order):
+    """Give every web (defs and uses connected by reaching definitions) its own name.
+
+    A temp or variable that is reused for unrelated values would otherwise be one
+    long live range that interferes with everything in between. The first web of
+    a name keeps it, later ones become name.1, name.2, ... Renames in place and
+    returns the new name -> first appearance order.
+    """
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    # Only names defined more than once can have several webs; the rest keep
+    # their name and stay out of the dataflow
+    def_count = {}
+    for b in blocks:
+        for ins in b.instrs:
+            if ins.defs() and ins.dest in order:
+                def_count[ins.dest] = def_count.get(ins.dest, 0) + 1
+    tracked = {n for n, c in def_count.items() if c > 1}
+
+    # Definition sites are numbered in layout order; -1 - k stands for "value on entry"
+    site = {}
+    for b in blocks:
+        for ins in b.instrs:
+            if ins.defs() and ins.dest in tracked:
+                site[id(ins)] = len(site)
+    entry = {n: -1 - k for k, n in enumerate(order)}
+
+    # A definition that reaches a block where its name is dead reaches no use
+    # through it, so the reach sets only hold live, tracked names
+    live_in, live_out = liveness(blocks, tracked)
+    reach_in = {b.index: {} for b in blocks}
+    if blocks:
+        reach_in[blocks[0].index] = {n: {entry[n]} for n in tracked
+                                     if n in live_in[blocks[0].index]}
+    reach_out = {}
+
+    def transfer(b, current, uses=None):
+        for ins in b.instrs:
+            if uses is not None:
+                for u in ins.uses():
+                    if u in tracked:
+                        ids = current.get(u) or {entry[u]}
+                        first = min(ids)
+                        for d in ids:
+                            union(first, d)
+                        uses[(id(ins), u)] = first
+            if ins.defs() and ins.dest in tracked:
+                current[ins.dest] = {site[id(ins)]}
+        return current
+
+    changed = True
+    while changed:
+        changed = False
+        for b in blocks:
+            current = reach_in[b.index]
+            live = live_in[b.index]
+            for p in b.preds:
+                for n, ds in reach_out.get(p.index, {}).items():
+                    if n in live:
+                        current.setdefault(n, set()).update(ds)
+            out = transfer(b, {n: set(ds) for n, ds in current.items()})
+            live = live_out[b.index]
+            out = {n: ds for n, ds in out.items() if n in live}
+            if out != reach_out.get(b.index):
+                reach_out[b.index] = out
+                changed = True
+
+    uses = {}
+    for b in blocks:
+        transfer(b, {n: set(ds) for n, ds in reach_in[b.index].items()}, uses)
+
+    names = {}
+    count = {}
+    new_order = {}
+
+    def web_name(var, d):
+        root = find(d)
+        if root not in names:
+            k = count.get(var, 0)
+            count[var] = k + 1
+            names[root] = var if k == 0 else f"{var}.{k}"
+            new_order[names[root]] = len(new_order)
+        return names[root]
+
+    for b in blocks:
+        for ins in b.instrs:
+            ins.args = [web_name(a, uses.get((id(ins), a), entry[a])) if a in order else a
+                        for a in ins.args]
+            if ins.defs() and ins.dest in order:
+                ins.dest = web_name(ins.dest, site.get(id(ins), entry[ins.dest]))
+    return new_order
+
+
+class InterferenceGraph:
+    """Interference between the allocatable names of one function, with copy coalescing.
+
+    With edges=False only the spill costs, copies and names live across calls
+    are collected.
+    """
+
+    def __init__(self, order, blocks, live_out, edges=True):
+        self.order = order
+        self.adj = {n: set() for n in order}
+        self.parent = {}
+        self.cost = {n: 0 for n in order}
+        self.moves = []
+        self.across_call = set()
+
+        depth = {b.index: 0 for b in blocks}
+        loops, _ = find_loops(blocks)
+        for loop in loops:
+            for index in loop.blocks:
+                depth[index] += 1
+
+        for b in blocks:
+            weight = 10 ** depth[b.index]
+            live = {n for n in live_out[b.index] if n in order}
+            for ins in reversed(b.instrs):
+                defs = [d for d in ins.defs() if d in order]
+                for n in defs + [u for u in ins.uses() if u in order]:
+                    self.cost[n] += weight
+                if ins.kind == 'call':
+                    # Registers do not survive a call
+                    self.across_call |= live - set(defs)
+                for d in defs if edges else ():
+                    for other in live:
+                        if other != d and not (ins.kind == 'copy' and ins.args[0] == other):
+                            self.add_edge(d, other)
+                    if ins.kind == 'binary':
+                        # Two-address code: MOV d, l / OP d, r must not overwrite r
+                        left, right = ins.args
+                        if right in order and right != left and right != d:
+                            self.add_edge(d, right)
+                    if ins.kind == 'copy' and ins.args[0] in order:
+                        self.moves.append((d, ins.args[0]))
+                live.difference_update(ins.defs())
+                live.update(u for u in ins.uses() if u in order)
+
+    def add_edge(self, a, b):
+        self.adj[a].add(b)
+        self.adj[b].add(a)
+
+    def find(self, n):
+        while n in self.parent:
+            n = self.parent[n]
+        return n
+
+    def nodes(self):
+        return sorted(self.adj, key=self.order.get)
+
+    def neighbours(self, n):
+        return sorted(self.adj[n], key=self.order.get)
+
+    def coalesce(self, k):
+        """Merge copy-related nodes while the Briggs test keeps the graph k-colourable."""
+        changed = True
+        while changed:
+            changed = False
+            for a, b in self.moves:
+                a, b = self.find(a), self.find(b)
+                if a == b or b in self.adj[a] or a in self.across_call or b in self.across_call:
+                    continue
+                # Briggs: fewer than k neighbours of significant degree, counted
+                # without building the merged set and only as far as k
+                significant = 0
+                for m in chain(self.adj[a], (m for m in self.adj[b] if m not in self.adj[a])):
+                    if len(self.adj[m]) >= k:
+                        significant += 1
+                        if significant >= k:
+                            break
+                if significant >= k:
+                    continue
+                if self.order[b] < self.order[a]:
+                    a, b = b, a
+                for m in self.adj.pop(b):
+                    self.adj[m].discard(b)
+                    self.adj[m].add(a)
+                    self.adj[a].add(m)
+                self.parent[b] = a
+                self.cost[a] += self.cost.pop(b)
+                changed = True
+
+
+def allocate_registers(ir_lines, registers=DEFAULT_REGISTERS, mode='graph'):
+    """Allocate registers for a whole IR listing.
+
+    Returns the rewritten IR lines and the allocator statistics.
+    """
+    program = parse_program(ir_lines)
+    allocator = RegisterAllocator(registers, mode)
+    for func in program.functions:
+        allocator.run(func)
+    return program.render(), allocator.stats()
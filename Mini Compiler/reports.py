@@ -0,0 +1,186 @@
+from artifacts import ARTIFACT_REPORTS, render_artifact
+from ir_generator import IRGenerator
+from lexer import format_tokens
+from mini_ast import pretty_print
+from parser import Parser
+from semantic import SemanticAnalyzer
+import os
+import queue
+import threading
+
+# == Report files, in the order the phases produce them ===
+REPORT_FILES = [
+    'lexical_output.txt',
+    'syntax_output.txt',
+    'symbol_table_output.txt',
+    'semantic_report.txt',
+    'ast_dump.txt',
+    'intermediate_code_output.txt',
+    'assembly_output.asm',
+]
+X86_REPORT = 'assembly_output.s'       # only when x86 output was requested
+
+# Short names for selecting reports (--reports lexical,ir)
+REPORT_ALIASES = {
+    'lexical': 'lexical_output.txt',
+    'syntax': 'syntax_output.txt',
+    'symbols': 'symbol_table_output.txt',
+    'semantic': 'semantic_report.txt',
+    'ast': 'ast_dump.txt',
+    'ir': 'intermediate_code_output.txt',
+    'asm': 'assembly_output.asm',
+    'x86': X86_REPORT,
+}
+
+
+def select_reports(reports):
+    """File names of the selected reports, in the order they are produced.
+
+    reports is True (all of them), False or None (none), or an iterable of
+    report file names and REPORT_ALIASES keys. Raises ValueError for a name
+    that is neither.
+    """
+    if reports is True:
+        return REPORT_FILES + [X86_REPORT]
+    names = set()
+    for name in reports or ():
+        name = REPORT_ALIASES.get(name, name)
+        if name not in REPORT_ALIASES.values():
+            raise ValueError(f"unknown report {name!r}")
+        names.add(name)
+    return [name for name in REPORT_ALIASES.values() if name in names]
+
+
+def report_file(name, fmt='text'):
+    """File name report name is written to in format fmt: the tokens, symbols
+    and IR reports can be .jsonl or .bin artifacts (see artifacts.py) instead."""
+    if fmt != 'text' and name in ARTIFACT_REPORTS:
+        return f"{os.path.splitext(name)[0]}.{fmt}"
+    return name
+
+
+def render_report(result, name, fmt='text'):
+    """Text of one report, from the artifacts in a CompileResult (bytes for a
+    .bin artifact)."""
+    if fmt != 'text' and name in ARTIFACT_REPORTS:
+        return render_artifact(ARTIFACT_REPORTS[name], result, fmt)
+    if name == 'lexical_output.txt':
+        return format_tokens(result.tokens)
+    if name == 'syntax_output.txt':
+        return Parser(result.tokens).format_syntax_output(result.program)
+    if name == 'symbol_table_output.txt':
+        return result.symtab.format_table()
+    if name == 'semantic_report.txt':
+        analyzer = SemanticAnalyzer()
+        analyzer.symtab, analyzer.errors = result.symtab, result.warnings
+        return analyzer.format_semantic_output()
+    if name == 'ast_dump.txt':
+        return "".join(line + '\n' for line in pretty_print(result.program))
+    if name == 'intermediate_code_output.txt':
+        irgen = IRGenerator(debug=False)
+        irgen.code = result.ir
+        return irgen.format_output()
+    if name == 'assembly_output.asm':
+        return "".join(line + '\n' for line in result.asm)
+    if name == X86_REPORT:
+        return "".join(line + '\n' for line in result.x86)
+    raise ValueError(f"unknown report {name!r}")
+
+
+def render_reports(result, reports=True, fmt='text'):
+    """Render the selected reports (see select_reports) into result.reports."""
+    for name in select_reports(reports):
+        if name != X86_REPORT or result.x86 is not None:
+            result.reports[report_file(name, fmt)] = render_report(result, name, fmt)
+
+
+def write_report(path, text):
+    with open(path, 'wb' if isinstance(text, bytes) else 'w',
+              encoding=None if isinstance(text, bytes) else 'utf-8') as f:
+        f.write(text)
+
+
+class ReportSink:
+    """Produces the selected reports of one compilation as its phases finish.
+
+    The compiler calls ready() with the reports whose artifacts are complete.
+    Without a directory they are rendered into result.reports by flush().
+    With one, a background thread renders each report as soon as it is ready
+    and writes it there, so the formatting and the file output overlap with
+    the phases that follow; flush() waits for it to catch up.
+    """
+
+    def __init__(self, result, reports, directory=None, fmt='text'):
+        self.result = result
+        self.selected = select_reports(reports)
+        self.directory = directory
+        self.fmt = fmt
+        self.submitted = set()
+        self.texts = {}         # reports the compiler produced itself
+        self.pending = []       # reports to render in flush() (no directory)
+        self.error = None       # what the writer thread raised
+        self.thread = None
+        if directory is not None and self.selected:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self.run, name='report-writer', daemon=True)
+            self.thread.start()
+
+    def ready(self, *names):
+        """The artifacts the named reports are rendered from are complete."""
+        for name in names:
+            if name not in self.selected or name in self.submitted:
+                continue
+            if name == X86_REPORT and self.result.x86 is None:
+                continue
+            self.submitted.add(name)
+            if self.thread:
+                self.queue.put(name)
+            else:
+                self.pending.append(name)
+
+    def set(self, name, text):
+        """A report whose text the compiler produced itself (a syntax error)."""
+        if name in self.selected and name not in self.submitted:
+            self.texts[name] = text
+            self.ready(name)
+
+    def emit(self, name):
+        filename = name if name in self.texts else report_file(name, self.fmt)
+        text = self.texts.get(name) or self.result.reports.get(filename)
+        if text is None:
+            text = render_report(self.result, name, self.fmt)
+        self.result.reports[filename] = text
+        if self.directory is not None:
+            write_report(os.path.join(self.directory, filename), text)
+
+    def run(self):
+        while True:
+            name = self.queue.get()
+            try:
+                if name is None:
+                    return
+                if self.error is None:
+                    self.emit(name)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Finish every report made ready so far; raises what the writer raised."""
+        if self.thread:
+            self.queue.join()
+        else:
+            for name in self.pending:
+                self.emit(name)
+            self.pending = []
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        """Stop the writer thread once it has finished the queued reports."""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
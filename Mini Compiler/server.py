@@ -0,0 +1,198 @@
+from cache import DEFAULT_CACHE_DIR, cache_key
+from collections import OrderedDict
+from compiler import CompileError, CompileOptions, compile_source
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import base64
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+# == Protocol ===
+# One JSON object per line in each direction; a connection may send any number
+# of requests and gets one response per request, in order.
+#   {"source": "...", "options": {"optimize": true, "allocator": "graph", "x86": false,
+#                                 "ssa": false, "reports": true | [name, ...],
+#                                 "format": "text"}}
+#     -> {"ok": true, "reports": {file: text}, "binary": [file, ...], "warnings": [...],
+#         "tokens": n, "functions": n, "ir_stats": {...}, "asm_stats": {...},
+#         "cache_stats": {...}}
+#     -> {"ok": false, "phase": "syntax analysis", "error": "...", "reports": {...},
+#         "binary": [...]}
+#   reports and format are as CompileOptions takes them (default: all, 'text');
+#   the reports named in "binary" (format 'bin') are base64 encoded.
+#   {"command": "ping" | "stats" | "shutdown"}
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"minicc-{os.getuid()}.sock")
+MAX_LINE = 64 * 1024 * 1024         # longest request or response line, bytes
+MEMORY_ENTRIES = 256                # responses kept in the server's own LRU
+
+
+def encode_reports(reports):
+    """(reports with bytes base64 encoded, names of those) for a JSON response."""
+    binary = [name for name, text in reports.items() if isinstance(text, bytes)]
+    encoded = dict(reports)
+    for name in binary:
+        encoded[name] = base64.b64encode(reports[name]).decode('ascii')
+    return encoded, binary
+
+
+def compile_request(source, options, cache_dir=None):
+    """Compile one request in a worker process; returns the response dict."""
+    try:
+        opts = CompileOptions(optimize=bool(options.get('optimize')),
+                              allocator=options.get('allocator', 'graph'),
+                              x86=bool(options.get('x86')), ssa=bool(options.get('ssa')),
+                              reports=options.get('reports', True),
+                              report_format=options.get('format', 'text'), cache_dir=cache_dir)
+    except (ValueError, TypeError) as e:
+        return {'ok': False, 'phase': 'request', 'error': str(e)}
+    try:
+        result = compile_source(source, opts)
+    except CompileError as e:
+        reports, binary = encode_reports(e.reports)
+        return {'ok': False, 'phase': e.phase, 'error': e.message, 'reports': reports,
+                'binary': binary}
+    except Exception as e:
+        return {'ok': False, 'phase': 'internal', 'error': f"{type(e).__name__}: {e}",
+                'reports': {}}
+    reports, binary = encode_reports(result.reports)
+    return {'ok': True, 'reports': reports, 'binary': binary, 'warnings': result.warnings,
+            'tokens': len(result.tokens), 'functions': len(result.program.functions),
+            'ir_stats': result.ir_stats, 'asm_stats': result.asm_stats,
+            'cache_stats': result.cache_stats}
+
+
+class CompileServer:
+    """asyncio server that compiles requests from a Unix domain socket.
+
+    The compiler modules are imported once and the worker processes are started
+    once, so a request costs only its compilation. Responses are kept in an
+    in-memory LRU keyed by source and options, and the workers share the
+    on-disk phase cache in cache_dir.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, jobs=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.socket_path = socket_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+        self.memory = OrderedDict()
+        self.pool = None
+        self.stopping = None
+        self.requests = 0
+        self.memory_hits = 0
+        self.compile_time = 0.0
+        self.started = time.time()
+
+    def stats(self):
+        return {'requests': self.requests, 'memory hits': self.memory_hits,
+                'compile seconds': round(self.compile_time, 3), 'workers': self.jobs,
+                'uptime seconds': round(time.time() - self.started, 1)}
+
+    async def compile(self, source, options):
+        key = cache_key('request', source, json.dumps(options, sort_keys=True))
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return self.memory[key]
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self.pool, compile_request, source, options,
+                                              self.cache_dir)
+        self.compile_time += time.perf_counter() - start
+        self.memory[key] = response
+        if len(self.memory) > MEMORY_ENTRIES:
+            self.memory.popitem(last=False)
+        return response
+
+    async def respond(self, request):
+        command = request.get('command')
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'stats':
+            return {'ok': True, 'stats': self.stats()}
+        if command == 'shutdown':
+            self.stopping.set()
+            return {'ok': True}
+        if not isinstance(request.get('source'), str):
+            return {'ok': False, 'phase': 'request', 'error': "missing 'source'"}
+        self.requests += 1
+        return await self.compile(request['source'], request.get('options') or {})
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self.respond(request)
+                except (ValueError, AttributeError) as e:
+                    response = {'ok': False, 'phase': 'request', 'error': f"bad request: {e}"}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass        # the server is shutting down
+        finally:
+            writer.close()
+
+    def remove_stale_socket(self):
+        """Delete a socket file nobody is listening on; refuse to start if someone is."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.remove(self.socket_path)
+        else:
+            raise RuntimeError(f"a compile server is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    async def serve(self):
+        self.remove_stale_socket()
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopping.set)
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs)
+        # Start every worker now rather than on the first requests
+        await asyncio.gather(*(loop.run_in_executor(self.pool, compile_request,
+                                                    'int main() { return 0; }', {})
+                               for _ in range(self.jobs)))
+        server = await asyncio.start_unix_server(self.handle, self.socket_path, limit=MAX_LINE)
+        print(f"Compile server listening on {self.socket_path} ({self.jobs} worker(s))")
+        try:
+            async with server:
+                await self.stopping.wait()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        print(f"Compile server stopped: {self.stats()}")
+
+
+if __name__ == '__main__':
+    # Usage: python server.py [--socket PATH] [-j N] [--cache-dir DIR | --no-cache]
+    args = sys.argv[1:]
+    values = {}
+    for flag in ('--socket', '-j', '--cache-dir'):
+        if flag in args:
+            at = args.index(flag)
+            values[flag] = args[at + 1]
+            del args[at:at + 2]
+    server = CompileServer(values.get('--socket', DEFAULT_SOCKET),
+                           int(values['-j']) if '-j' in values else None,
+                           None if '--no-cache' in args else values.get('--cache-dir', DEFAULT_CACHE_DIR))
+    try:
+        asyncio.run(server.serve())
+    except RuntimeError as e:
+        print(f"Compile server failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,466 @@
+import json
+import re
+import sys
+
+from cfg import is_const
+from frame import WORD_SIZE
+from peephole import parse_asm_line
+
+# == Machine ===
+STACK_TOP = 1 << 20         # SP and BP at start; the stack grows down
+DATA_BASE = 1 << 12         # address of the first .DATA item
+
+# Decoded opcodes
+(MOV, ADD, SUB, MUL, DIV, MOD, AND, OR, CMP, TEST, JCC, JMP, PUSH, POP, CALL, RET,
+ PUSH_BP, POP_BP, MOV_BP_SP, MOV_SP_BP, ADJUST_SP, HLT) = range(22)
+
+OPCODES = {'MOV': MOV, 'ADD': ADD, 'SUB': SUB, 'MUL': MUL, 'DIV': DIV, 'MOD': MOD,
+           'AND': AND, 'OR': OR, 'CMP': CMP, 'TEST': TEST, 'JMP': JMP, 'PUSH': PUSH,
+           'POP': POP, 'CALL': CALL, 'RET': RET, 'HLT': HLT}
+
+# Flag values (sign of left - right after CMP) for which a conditional jump is taken
+CONDITIONS = {'JE': frozenset((0,)), 'JNE': frozenset((-1, 1)), 'JL': frozenset((-1,)),
+              'JG': frozenset((1,)), 'JLE': frozenset((-1, 0)), 'JGE': frozenset((0, 1))}
+
+# Operand modes: (mode, value)
+CONST, DIRECT, FRAME, NEG, NOT = range(5)
+FRAME_RE = re.compile(r'^\[BP([+-]\d+)\]$')
+REGISTER_RE = re.compile(r'^[RA]\d+$')
+
+
+class SimulationError(Exception):
+    pass
+
+
+def c_div(left, right):
+    """Division with C semantics: integer division truncates toward zero."""
+    if isinstance(left, int) and isinstance(right, int):
+        q = abs(left) // abs(right)
+        return q if (left >= 0) == (right >= 0) else -q
+    return left / right
+
+
+def c_mod(left, right):
+    """Remainder with C semantics: the sign follows the dividend."""
+    if isinstance(left, int) and isinstance(right, int):
+        r = abs(left) % abs(right)
+        return r if left >= 0 else -r
+    return left - right * int(left / right)
+
+
+class CostModel:
+    """Cycles charged per instruction.
+
+    Every instruction costs the cycles of its mnemonic, plus memory_access cycles
+    for each memory operand it reads or writes (stack pushes and pops included),
+    plus taken_branch cycles when it transfers control (taken jumps, CALL, RET).
+    """
+
+    DEFAULT_CYCLES = {
+        'MOV': 1, 'ADD': 1, 'SUB': 1, 'MUL': 3, 'DIV': 20, 'MOD': 20, 'AND': 1, 'OR': 1,
+        'CMP': 1, 'TEST': 1, 'JMP': 1, 'Jcc': 1, 'PUSH': 1, 'POP': 1, 'CALL': 2, 'RET': 2,
+        'HLT': 1,
+    }
+
+    def __init__(self, cycles=None, memory_access=3, taken_branch=2):
+        self.cycles = dict(self.DEFAULT_CYCLES)
+        self.cycles.update(cycles or {})
+        self.memory_access = memory_access
+        self.taken_branch = taken_branch
+
+    @classmethod
+    def from_file(cls, filename):
+        """Load a cost model from JSON: {"cycles": {...}, "memory_access": n, "taken_branch": n}."""
+        with open(filename, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        return cls(spec.get('cycles'), spec.get('memory_access', 3), spec.get('taken_branch', 2))
+
+    def cost(self, mnemonic, accesses):
+        return self.cycles[mnemonic] + self.memory_access * accesses
+
+
+class Region:
+    """Execution counts of a function or a label's block."""
+
+    def __init__(self, name):
+        self.name = name
+        self.instructions = 0
+        self.cycles = 0
+
+
+class SimulationResult:
+    """Counters of one run, with per-function and per-label breakdowns."""
+
+    def __init__(self, return_value, instructions, cycles, memory_accesses,
+                 branches, branches_taken, functions, labels):
+        self.return_value = return_value
+        self.instructions = instructions
+        self.cycles = cycles
+        self.memory_accesses = memory_accesses
+        self.branches = branches
+        self.branches_taken = branches_taken
+        self.functions = functions      # [Region], hottest first
+        self.labels = labels            # [Region], hottest first
+
+    def report(self, top=10):
+        """Lines of a human-readable report."""
+        cpi = self.cycles / self.instructions if self.instructions else 0
+        lines = [
+            "Simulation Report",
+            "=" * 50,
+            f"Return value (R0): {self.return_value}",
+            f"Retired instructions: {self.instructions:,}",
+            f"Cycles: {self.cycles:,} (CPI {cpi:.2f})",
+            f"Memory accesses: {self.memory_accesses:,}",
+            f"Branches: {self.branches:,} executed, {self.branches_taken:,} taken",
+        ]
+        for title, regions in (("Functions", self.functions), ("Hot labels", self.labels[:top])):
+            lines.append("")
+            lines.append(f"{title}:")
+            for r in regions:
+                share = 100 * r.cycles / self.cycles if self.cycles else 0
+                lines.append(f"  {r.name:<20} {r.instructions:>12,} instr {r.cycles:>12,} cycles {share:5.1f}%")
+        return lines
+
+
+class Simulator:
+    """Cycle-counting simulator for the pseudo-assembly of AssemblyGenerator.
+
+    The listing is decoded once into a list of (opcode, a, b, target) tuples with
+    operands resolved to (mode, value) pairs, jump targets to instruction indices
+    and data labels to addresses. The run loop then only counts executions per
+    instruction; cycles, memory accesses and the breakdowns are derived from
+    those counts and the static cost of each instruction afterwards.
+    """
+
+    def __init__(self, asm_lines, cost_model=None):
+        self.cost_model = cost_model or CostModel()
+        self.code = []          # decoded instructions
+        self.source = []        # (mnemonic, line number) per instruction
+        self.labels = {}        # label -> instruction index
+        self.data = {}          # label -> address
+        self.memory = {}        # initial contents of .DATA
+        self.regions = []       # (function, label) per instruction
+        self.decode(asm_lines)
+
+    # == Decoding ===
+
+    def decode(self, asm_lines):
+        program = []            # (mnemonic, args, line number)
+        function = label = 'START'
+        section = '.CODE'
+        for number, line in enumerate(asm_lines, 1):
+            stripped = line.strip()
+            if stripped in ('.DATA', '.CODE'):
+                section = stripped
+                continue
+            e = parse_asm_line(line.rstrip('\n'))
+            if e.kind == 'other':
+                continue
+            if section == '.DATA':
+                name, _, value = stripped.split(None, 2)
+                self.data[name] = DATA_BASE + WORD_SIZE * len(self.data)
+                self.memory[self.data[name]] = self.literal(value)
+                continue
+            if e.kind == 'label':
+                label = e.op
+                if label.startswith('FUNC_') or label == 'START':
+                    function = label
+                self.labels[label] = len(program)
+                continue
+            program.append((e.op, e.args, number))
+            self.regions.append((function, label))
+        if 'START' not in self.labels:
+            # A bare listing: enter main as the startup code would
+            self.labels['START'] = len(program)
+            program += [('CALL', ['FUNC_main'], 0), ('HLT', [], 0)]
+            self.regions += [('START', 'START')] * 2
+
+        for op, args, number in program:
+            self.code.append(self.decode_instruction(op, args, number))
+            self.source.append((op, number))
+
+    def decode_instruction(self, op, args, number):
+        if op in CONDITIONS:
+            return (JCC, CONDITIONS[op], None, self.target(args[0], number))
+        if op == 'JMP':
+            return (JMP, None, None, self.target(args[0], number))
+        if op == 'CALL':
+            return (CALL, None, None, self.target(args[0], number))
+        if op == 'RET':
+            return (RET, int(args[0]) if args else 0, None, None)
+        if args == ['BP']:
+            if op == 'PUSH':
+                return (PUSH_BP, None, None, None)
+            if op == 'POP':
+                return (POP_BP, None, None, None)
+        if args == ['BP', 'SP'] and op == 'MOV':
+            return (MOV_BP_SP, None, None, None)
+        if args == ['SP', 'BP'] and op == 'MOV':
+            return (MOV_SP_BP, None, None, None)
+        if args[:1] == ['SP'] and op in ('ADD', 'SUB'):
+            amount = int(args[1])
+            return (ADJUST_SP, amount if op == 'ADD' else -amount, None, None)
+        if op not in OPCODES:
+            raise SimulationError(f"line {number}: unknown instruction '{op}'")
+        operands = [self.operand(a) for a in args]
+        return (OPCODES[op], *operands, *[None] * (3 - len(operands)))
+
+    def target(self, label, number):
+        # Calls name the function, its code starts at FUNC_<name>
+        for name in (label, f"FUNC_{label}"):
+            if name in self.labels:
+                return self.labels[name]
+        raise SimulationError(f"line {number}: unknown label '{label}'")
+
+    def literal(self, text):
+        return float(text) if '.' in text or 'e' in text.lower() else int(text)
+
+    def operand(self, text):
+        if is_const(text):
+            return (CONST, self.literal(text))
+        match = FRAME_RE.match(text)
+        if match:
+            return (FRAME, int(match.group(1)))
+        if REGISTER_RE.match(text):
+            return (DIRECT, text)
+        if text[0] == '-':
+            return (NEG, self.operand(text[1:]))
+        if text[0] == '!':
+            return (NOT, self.operand(text[1:]))
+        if text not in self.data:
+            # A name the listing never declared: give it a zeroed data word
+            self.data[text] = DATA_BASE + WORD_SIZE * len(self.data)
+            self.memory[self.data[text]] = 0
+        return (DIRECT, self.data[text])
+
+    # == Static costs ===
+
+    def memory_operands(self, operand):
+        mode, value = operand
+        if mode in (NEG, NOT):
+            return self.memory_operands(value)
+        return int(mode == FRAME or (mode == DIRECT and isinstance(value, int)))
+
+    def accesses(self, ins):
+        """Memory reads and writes of one decoded instruction."""
+        op, a, b, _ = ins
+        if op in (PUSH_BP, POP_BP, CALL, RET):
+            return 1
+        if op in (PUSH, POP):
+            return 1 + self.memory_operands(a)
+        if op in (MOV, CMP, TEST):
+            return self.memory_operands(a) + self.memory_operands(b)
+        if op in (ADD, SUB, MUL, DIV, MOD, AND, OR):
+            return 2 * self.memory_operands(a) + self.memory_operands(b)
+        return 0
+
+    def mnemonic(self, op, source):
+        """Cost model key of an instruction (pseudo-ops like MOV BP, SP keep their source mnemonic)."""
+        return 'Jcc' if op == JCC else source
+
+    # == Execution ===
+
+    def run(self, max_steps=100_000_000):
+        """Run from START until HLT and return a SimulationResult."""
+        code = self.code
+        hits = [0] * len(code)
+        taken = [0] * len(code)
+        mem = dict(self.memory)
+        mem['R0'] = 0
+        sp = bp = STACK_TOP
+        flags = 0
+        pc = self.labels['START']
+        steps = 0
+
+        def read(operand):
+            mode, value = operand
+            if mode == CONST:
+                return value
+            if mode == DIRECT:
+                return mem.get(value, 0)
+            if mode == FRAME:
+                return mem.get(bp + value, 0)
+            if mode == NEG:
+                return -read(value)
+            return int(not read(value))
+
+        def write(operand, value):
+            mode, where = operand
+            if mode == DIRECT:
+                mem[where] = value
+            elif mode == FRAME:
+                mem[bp + where] = value
+            else:
+                raise SimulationError(f"instruction {pc}: cannot write to an expression operand")
+
+        while True:
+            op, a, b, target = code[pc]
+            hits[pc] += 1
+            steps += 1
+            if steps > max_steps:
+                raise SimulationError(f"stopped after {max_steps:,} instructions")
+            if op == MOV:
+                m, x = b
+                if m == DIRECT:
+                    v = mem.get(x, 0)
+                elif m == CONST:
+                    v = x
+                elif m == FRAME:
+                    v = mem.get(bp + x, 0)
+                else:
+                    v = read(b)
+                m, x = a
+                if m == DIRECT:
+                    mem[x] = v
+                else:
+                    write(a, v)
+                pc += 1
+            elif op == JCC:
+                if flags in a:
+                    taken[pc] += 1
+                    pc = target
+                else:
+                    pc += 1
+            elif op == CMP:
+                left = read(a)
+                m, x = b
+                right = x if m == CONST else read(b)
+                flags = (left > right) - (left < right)
+                pc += 1
+            elif op == ADD or op == SUB:
+                m, x = b
+                if m == CONST:
+                    v = x
+                elif m == DIRECT:
+                    v = mem.get(x, 0)
+                else:
+                    v = read(b)
+                m, x = a
+                if m == DIRECT:
+                    mem[x] = mem.get(x, 0) + v if op == ADD else mem.get(x, 0) - v
+                else:
+                    write(a, read(a) + v if op == ADD else read(a) - v)
+                pc += 1
+            elif op == JMP:
+                taken[pc] += 1
+                pc = target
+            elif op == TEST:
+                value = read(a)
+                if b != a:
+                    value = value & read(b)
+                flags = (value > 0) - (value < 0)
+                pc += 1
+            elif op == MUL:
+                write(a, read(a) * read(b))
+                pc += 1
+            elif op == DIV or op == MOD:
+                right = read(b)
+                if right == 0:
+                    raise SimulationError(f"line {self.source[pc][1]}: division by zero")
+                write(a, (c_div if op == DIV else c_mod)(read(a), right))
+                pc += 1
+            elif op == AND:
+                write(a, int(bool(read(a)) and bool(read(b))))
+                pc += 1
+            elif op == OR:
+                write(a, int(bool(read(a)) or bool(read(b))))
+                pc += 1
+            elif op == CALL:
+                sp -= WORD_SIZE
+                mem[sp] = pc + 1
+                taken[pc] += 1
+                pc = target
+            elif op == RET:
+                taken[pc] += 1
+                pc = mem[sp]
+                sp += WORD_SIZE + a
+            elif op == PUSH:
+                sp -= WORD_SIZE
+                mem[sp] = read(a)
+                pc += 1
+            elif op == POP:
+                write(a, mem.get(sp, 0))
+                sp += WORD_SIZE
+                pc += 1
+            elif op == PUSH_BP:
+                sp -= WORD_SIZE
+                mem[sp] = bp
+                pc += 1
+            elif op == POP_BP:
+                bp = mem[sp]
+                sp += WORD_SIZE
+                pc += 1
+            elif op == MOV_BP_SP:
+                bp = sp
+                pc += 1
+            elif op == MOV_SP_BP:
+                sp = bp
+                pc += 1
+            elif op == ADJUST_SP:
+                sp += a
+                pc += 1
+            else:   # HLT
+                break
+        return self.summarize(mem.get('R0', 0), hits, taken)
+
+    def summarize(self, return_value, hits, taken):
+        model = self.cost_model
+        functions = {}
+        labels = {}
+        totals = [0, 0, 0, 0, 0]    # instructions, cycles, accesses, branches, taken
+        for pc, ins in enumerate(self.code):
+            count = hits[pc]
+            if not count:
+                continue
+            op = ins[0]
+            accesses = self.accesses(ins)
+            cycles = count * model.cost(self.mnemonic(op, self.source[pc][0]), accesses)
+            cycles += taken[pc] * model.taken_branch
+            totals[0] += count
+            totals[1] += cycles
+            totals[2] += count * accesses
+            if op in (JCC, JMP):
+                totals[3] += count
+                totals[4] += taken[pc]
+            function, label = self.regions[pc]
+            for table, name in ((functions, function), (labels, label)):
+                region = table.setdefault(name, Region(name))
+                region.instructions += count
+                region.cycles += cycles
+        hottest = lambda table: sorted(table.values(), key=lambda r: (-r.cycles, r.name))
+        return SimulationResult(return_value, *totals, hottest(functions), hottest(labels))
+
+
+def simulate_file(filename='assembly_output.asm', cost_model=None, max_steps=100_000_000):
+    """Simulate an assembly file and return the SimulationResult."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    return Simulator(lines, cost_model).run(max_steps)
+
+
+def write_report(result, filename='simulation_report.txt', top=10):
+    with open(filename, 'w', encoding='utf-8') as f:
+        for line in result.report(top):
+            f.write(line + "\n")
+    print(f"Simulation report written to {filename}")
+
+
+if __name__ == '__main__':
+    # Usage: python simulator.py [file.asm] [--costs model.json] [--top N] [--max-steps N]
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--costs', '--top', '--max-steps'):
+        if flag in args:
+            at = args.index(flag)
+            options[flag] = args[at + 1]
+            del args[at:at + 2]
+    model = CostModel.from_file(options['--costs']) if '--costs' in options else None
+    try:
+        result = simulate_file(args[0] if args else 'assembly_output.asm', model,
+                               int(options.get('--max-steps', 100_000_000)))
+    except (OSError, SimulationError) as e:
+        print(f"Simulation failed: {e}")
+        sys.exit(1)
+    for line in result.report(int(options.get('--top', 10))):
+        print(line)
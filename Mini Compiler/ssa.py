@@ -0,0 +1,305 @@
+from cfg import (Block, Instr, build_cfg, dominators, dominator_tree, dominance_frontiers,
+                 flatten, liveness, reverse_postorder)
+
+
+class SSAForm:
+    """Pruned SSA form of one IRFunction.
+
+    Construction splits critical edges, places phi functions on the iterated
+    dominance frontier of each variable's definitions (only where the variable is
+    live), and renames every definition to a fresh version `x.1`, `x.2`, ...
+    Version 0 of a variable is its original name, i.e. the value on function entry.
+    Only names local to the function are renamed; anything a call could modify is
+    left alone.
+
+    `to_ir()` translates back: each phi becomes a parallel copy at the end of its
+    predecessors, copies are sequentialised, and versions of the same variable that
+    do not interfere are coalesced back onto one name.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.origin = {}        # SSA name -> original variable
+        self.split = set()      # indices of blocks created by edge splitting
+        self.phis = 0
+        self.copies = 0
+        self.coalesced = 0
+        self.build()
+
+    # == Construction ===
+
+    def build(self):
+        func = self.func
+        blocks = build_cfg(func.body)
+        reachable = {b.index for b in reverse_postorder(blocks)}
+        for b in blocks:
+            if b.index not in reachable:
+                b.instrs = [ins for ins in b.instrs if not ins.is_code()]
+                for s in b.succs:
+                    s.preds.remove(b)
+                b.succs = []
+        self.blocks = blocks
+        self.split_critical_edges()
+
+        self.idom = dominators(self.blocks)
+        live_in, _ = liveness(self.blocks)
+        self.place_phis(live_in)
+        self.rename()
+
+    def split_critical_edges(self):
+        """Give every edge out of a conditional jump into a join point its own block."""
+        blocks = self.blocks
+        layout = []
+        tail = []
+        created = []
+        for b in blocks:
+            layout.append(b)
+            last = b.last()
+            if last is None or last.kind != 'if' or len(b.succs) < 2:
+                continue
+            for s in list(b.succs):
+                if len(s.preds) < 2:
+                    continue
+                n = Block(-1)
+                if s.label == last.target:
+                    label = self.func.new_label()
+                    n.instrs = [Instr('label', dest=label), Instr('goto', target=s.label)]
+                    last.target = label
+                    tail.append(n)
+                else:
+                    layout.append(n)
+                b.succs[b.succs.index(s)] = n
+                s.preds[s.preds.index(b)] = n
+                n.preds, n.succs = [b], [s]
+                created.append(n)
+
+        if tail:
+            last = layout[-1].last() if layout else None
+            if last is None or last.kind not in ('goto', 'return'):
+                # Falling off the end used to mean "return"; keep it that way
+                layout[-1].instrs.append(Instr('return'))
+        self.blocks = layout + tail
+        for i, b in enumerate(self.blocks):
+            b.index = i
+        self.split = {n.index for n in created}
+
+    def variables(self):
+        names = {}
+        for b in self.blocks:
+            for ins in b.instrs:
+                for d in ins.defs():
+                    if self.func.is_local(d):
+                        names.setdefault(d, set()).add(b.index)
+        return names
+
+    def place_phis(self, live_in):
+        df = dominance_frontiers(self.blocks, self.idom)
+        by_index = {b.index: b for b in self.blocks}
+        for var, def_sites in self.variables().items():
+            has_phi = set()
+            work = list(def_sites)
+            while work:
+                x = work.pop()
+                for y in df.get(x, ()):
+                    if y in has_phi or var not in live_in[y]:
+                        continue
+                    has_phi.add(y)
+                    block = by_index[y]
+                    phi = Instr('phi', dest=var, args=[var] * len(block.preds))
+                    at = 0
+                    while at < len(block.instrs) and block.instrs[at].kind == 'label':
+                        at += 1
+                    block.instrs.insert(at, phi)
+                    self.phis += 1
+                    if y not in def_sites:
+                        work.append(y)
+
+    def rename(self):
+        renamed = set(self.variables())
+        counter = {v: 0 for v in renamed}
+        stacks = {v: [v] for v in renamed}
+        for v in renamed:
+            self.origin[v] = v
+        children = dominator_tree(self.blocks, self.idom)
+        by_index = {b.index: b for b in self.blocks}
+
+        def top(name):
+            return stacks[name][-1] if name in stacks else name
+
+        todo = [('enter', self.blocks[0].index)]
+        while todo:
+            action, index = todo.pop()
+            block = by_index[index]
+            if action == 'exit':
+                for ins in block.instrs:
+                    for d in ins.defs():
+                        if d in self.origin and self.origin[d] in stacks and d != self.origin[d]:
+                            stacks[self.origin[d]].pop()
+                continue
+
+            for ins in block.instrs:
+                if ins.kind != 'phi':
+                    ins.args = [top(a) for a in ins.args]
+                if ins.kind == 'param' or not ins.defs() or ins.dest not in renamed:
+                    continue
+                var = ins.dest
+                counter[var] += 1
+                name = f"{var}.{counter[var]}"
+                self.origin[name] = var
+                stacks[var].append(name)
+                ins.dest = name
+
+            for s in block.succs:
+                j = s.preds.index(block)
+                for ins in s.instrs:
+                    if ins.kind == 'phi':
+                        ins.args[j] = top(self.origin[ins.dest] if ins.dest in self.origin else ins.dest)
+
+            todo.append(('exit', index))
+            for child in reversed(children[index]):
+                todo.append(('enter', child))
+
+    def render(self):
+        """The SSA form as IR text (phis shown as `x.3 = PHI(x.1, x.2)`)."""
+        func = self.func
+        lines = list(func.pre)
+        lines.append(f"FUNC_{func.name}:")
+        lines.extend(ins.render() for ins in flatten(self.blocks))
+        lines.append(f"END_FUNC_{func.name}:")
+        return lines
+
+    # == Destruction ===
+
+    def to_ir(self):
+        """Leave SSA form and store the result in func.body."""
+        for b in self.blocks:
+            phis = [ins for ins in b.instrs if ins.kind == 'phi']
+            if not phis:
+                continue
+            b.instrs = [ins for ins in b.instrs if ins.kind != 'phi']
+            for j, p in enumerate(b.preds):
+                moves = [(phi.dest, phi.args[j]) for phi in phis]
+                self.insert_copies(p, self.sequentialize(moves))
+
+        self.coalesce()
+        self.drop_empty_splits()
+        self.func.body = flatten(self.blocks)
+
+    def sequentialize(self, moves):
+        """Order a parallel copy so no source is overwritten before it is read."""
+        pending = {d: s for d, s in moves if d != s}
+        out = []
+        while pending:
+            sources = set(pending.values())
+            ready = [d for d in pending if d not in sources]
+            if ready:
+                for d in ready:
+                    out.append((d, pending.pop(d)))
+                continue
+            # Only cycles are left: break one with a fresh temp
+            d, s = next(iter(pending.items()))
+            tmp = self.func.new_temp()
+            out.append((tmp, s))
+            for k, v in pending.items():
+                if v == s:
+                    pending[k] = tmp
+        self.copies += len(out)
+        return [Instr('copy', dest=d, args=[s]) for d, s in out]
+
+    def insert_copies(self, block, copies):
+        last = block.last()
+        if last is not None and last.kind in ('goto', 'if', 'return'):
+            at = block.instrs.index(last)
+            block.instrs[at:at] = copies
+        else:
+            block.instrs.extend(copies)
+
+    def coalesce(self):
+        """Map non-interfering versions of each variable back onto one name."""
+        _, live_out = liveness(self.blocks)
+        interfere = set()
+        for b in self.blocks:
+            live = set(live_out[b.index])
+            for ins in reversed(b.instrs):
+                for d in ins.defs():
+                    origin = self.origin.get(d)
+                    if origin is None:
+                        continue
+                    for other in live:
+                        if other != d and self.origin.get(other) == origin and not (
+                                ins.kind == 'copy' and ins.args[0] == other):
+                            interfere.add((d, other))
+                            interfere.add((other, d))
+                live.difference_update(ins.defs())
+                live.update(ins.uses())
+
+        versions = {}
+        for name, origin in self.origin.items():
+            versions.setdefault(origin, []).append(name)
+
+        mapping = {}
+        for origin, names in versions.items():
+            # Greedy grouping: version 0 first, so the original name is kept if possible
+            names.sort(key=lambda n: (n != origin, n))
+            groups = []
+            for name in names:
+                for group in groups:
+                    if not any((name, m) in interfere for m in group):
+                        group.append(name)
+                        break
+                else:
+                    groups.append([name])
+            for k, group in enumerate(groups):
+                target = origin if k == 0 else f"{origin}.{k}"
+                for name in group:
+                    mapping[name] = target
+
+        for b in self.blocks:
+            keep = []
+            for ins in b.instrs:
+                ins.args = [mapping.get(a, a) for a in ins.args]
+                if ins.defs() and ins.kind != 'param':
+                    ins.dest = mapping.get(ins.dest, ins.dest)
+                if ins.kind == 'copy' and ins.dest == ins.args[0]:
+                    self.coalesced += 1
+                    continue
+                keep.append(ins)
+            b.instrs = keep
+
+    def drop_empty_splits(self):
+        """Remove edge-splitting blocks that ended up without any copies."""
+        retarget = {}
+        keep = []
+        for b in self.blocks:
+            if b.index in self.split and all(ins.kind in ('label', 'goto') for ins in b.instrs):
+                if b.instrs:
+                    retarget[b.instrs[0].dest] = b.instrs[-1].target
+                continue
+            keep.append(b)
+        for b in keep:
+            for ins in b.instrs:
+                if ins.is_jump() and ins.target in retarget:
+                    ins.target = retarget[ins.target]
+        self.blocks = keep
+
+
+class SSARoundTrip:
+    """Translate each function into SSA form and back out again."""
+
+    name = 'ssa'
+
+    def __init__(self):
+        self.phis = 0
+        self.copies = 0
+        self.coalesced = 0
+
+    def stats(self):
+        return {'phis placed': self.phis, 'copies inserted': self.copies,
+                'copies coalesced': self.coalesced}
+
+    def run(self, func):
+        ssa = SSAForm(func)
+        ssa.to_ir()
+        self.phis += ssa.phis
+        self.copies += ssa.copies
+        self.coalesced += ssa.coalesced
@@ -0,0 +1,248 @@
+from asm_generator import ASM_FILE_HEADER, ASM_STARTUP, NO_DATA, AssemblyGenerator
+from compiler import REPORT_FILES, CompileError, CompileOptions
+from frame import add_global, data_section
+from ir_generator import IRGenerator
+from lexer import format_tokens, iter_tokens
+from lowering import ASM_HEADER_LINES, IR_HEADER, function_ir, lower_function, merge_stats
+from mini_ast import Program, pretty_print
+from optimizer import optimize_ir, write_stats
+from parser import ParserError, StreamParser
+from semantic import SemanticAnalyzer
+import os
+import shutil
+import tempfile
+import time
+
+FLUSH_TOKENS = 4096     # tokens buffered for the lexical report while draining
+
+
+class StreamResult:
+    """Counts and statistics of a streamed compilation; the artifacts are only
+    in the report files."""
+
+    def __init__(self):
+        self.tokens = 0
+        self.functions = 0
+        self.warnings = []
+        self.ir_lines = 0
+        self.asm_lines = 0
+        self.ir_stats = {}
+        self.asm_stats = {}
+        self.paths = []         # report files written
+
+
+class ReportFiles:
+    """Report files written as <name>.part and renamed into place by publish(),
+    so a compilation that fails half way leaves no half-written reports."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+
+    def open(self, name):
+        """The (truncated) .part file of report name."""
+        if name in self.files:
+            self.files[name].close()
+        path = os.path.join(self.directory, name + '.part')
+        self.files[name] = open(path, 'w', encoding='utf-8')
+        return self.files[name]
+
+    def publish(self, names):
+        paths = []
+        for name in names:
+            f = self.files.pop(name)
+            f.close()
+            path = os.path.join(self.directory, name)
+            os.replace(f.name, path)
+            paths.append(path)
+        return paths
+
+    def discard(self):
+        for f in self.files.values():
+            f.close()
+            os.remove(f.name)
+        self.files = {}
+
+
+def collect_return_types(filename):
+    """Return types of the functions defined in filename, from a pass over its
+    tokens alone: outside braces a program only has `type name (`."""
+    return_types = {}
+    depth = 0
+    before = [None, None]
+    with open(filename, 'r', encoding='utf-8') as f:
+        for t in iter_tokens(f):
+            kind = t['TYPE']
+            if kind == 'LEFT_BRACE':
+                depth += 1
+            elif kind == 'RIGHT_BRACE':
+                depth -= 1
+            elif kind == 'LEFT_PAREN' and depth == 0 and before[0] is not None:
+                if before[0]['TYPE'] == 'KEYWORD' and before[1]['TYPE'] == 'IDENTIFIER':
+                    return_types[before[1]['VALUE']] = before[0]['VALUE']
+            before = [before[1], t]
+    return return_types
+
+
+def compile_stream(filename, out_dir='.', options=None):
+    """Compile filename function by function, writing the reports into out_dir
+    as it goes; returns a StreamResult.
+
+    The lexer reads the file line by line and the parser hands over one
+    Function at a time. Each goes through semantic analysis, IR generation,
+    the optimizer and the backend, is appended to the reports and dropped;
+    only the next function is parsed ahead, because the syntax tree marks the
+    last one differently. What is kept grows with the number of names, not
+    with the size of the program: the symbol table, the globals, and the
+    return types of all functions (calls to functions further down need
+    them), which a first pass over the tokens collects. The .DATA section of
+    the assembly comes first but is only known at the end, so the function
+    code is spooled to a temporary file.
+
+    The reports are the same as compile_source's. x86 output, the phase cache,
+    profiling and jobs are compile_source features only. Raises CompileError
+    like compile_source.
+    """
+    options = options or CompileOptions()
+    try:
+        return_types = collect_return_types(filename)
+    except RuntimeError as e:
+        raise CompileError('lexical analysis', str(e)) from e
+    os.makedirs(out_dir, exist_ok=True)
+
+    result = StreamResult()
+    files = ReportFiles(out_dir)
+    code = tempfile.TemporaryFile('w+', encoding='utf-8')       # assembly of the functions
+    literals = tempfile.TemporaryFile('w+', encoding='utf-8')   # their literal pools
+    source = open(filename, 'r', encoding='utf-8')
+    try:
+        pending = []        # tokens read since the lexical report was last written
+        lexical = files.open('lexical_output.txt')
+        lexical.write(format_tokens([]))
+
+        def read_tokens():
+            for t in iter_tokens(source):
+                pending.append(t)
+                yield t
+
+        def flush_tokens():
+            lexical.write(format_tokens(pending, header=False))
+            result.tokens += len(pending)
+            pending.clear()
+
+        tokens = read_tokens()
+        parser = StreamParser(tokens)
+        syntax = files.open('syntax_output.txt')
+        syntax.write(parser.format_syntax_output(Program([])))
+        ast = files.open('ast_dump.txt')
+        ast.write("".join(line + '\n' for line in pretty_print(Program([]))))
+        ir = files.open('intermediate_code_output.txt')
+        ir.write(IRGenerator(debug=False).format_output())
+        ir.write("".join(line + '\n' for line in IR_HEADER))
+        result.ir_lines = len(IR_HEADER)
+
+        analyzer = SemanticAnalyzer()
+        global_types = {}
+        literal_lines = 0
+        functions = parser.parse_functions()
+        try:
+            func = next(functions, None)
+            while func is not None:
+                following = next(functions, None)
+                flush_tokens()
+                syntax.write("".join(line + '\n' for line in parser.generate_ast_tree(
+                    func, 1, following is None, "    ")))
+                ast.write("".join(line + '\n' for line in pretty_print(func, 2)))
+                analyzer.visit_function(func)
+
+                chunk = function_ir(func)
+                if options.optimize:
+                    chunk, stats = optimize_ir(chunk, options.passes)
+                    result.ir_stats = merge_stats([result.ir_stats, stats])
+                ir.write("".join(line + '\n' for line in chunk))
+                result.ir_lines += len(chunk)
+
+                unit = lower_function((func.name, chunk, options.optimize, options.allocator,
+                                       return_types))
+                code.write("".join(line + '\n' for line in unit.asm))
+                result.asm_lines += len(unit.asm)
+                if unit.frame:
+                    for name, kind in unit.frame.globals.items():
+                        add_global(global_types, name, kind)
+                    pool = data_section({}, [unit.frame])
+                    literals.write("".join(line + '\n' for line in pool))
+                    literal_lines += len(pool)
+                result.asm_stats = merge_stats([result.asm_stats, unit.stats])
+                result.functions += 1
+                func = following
+        except ParserError as e:
+            # Like compile_source: the whole lexical report and the error
+            for _ in tokens:
+                if len(pending) >= FLUSH_TOKENS:
+                    flush_tokens()
+            flush_tokens()
+            files.open('syntax_output.txt').write(f"Syntax Error: {e}\n")
+            files.publish(['lexical_output.txt', 'syntax_output.txt'])
+            raise CompileError('syntax analysis', str(e)) from e
+        flush_tokens()
+
+        result.warnings = analyzer.errors
+        files.open('symbol_table_output.txt').write(analyzer.symtab.format_table())
+        files.open('semantic_report.txt').write(analyzer.format_semantic_output())
+
+        # The assembly file: header, .DATA (globals, then the literal pools), code
+        asm = files.open('assembly_output.asm')
+        prologue = list(ASM_FILE_HEADER)
+        if not global_types and not literal_lines:
+            prologue.append(NO_DATA)
+        prologue += data_section(global_types, [])
+        asm.write("".join(line + '\n' for line in prologue))
+        literals.seek(0)
+        shutil.copyfileobj(literals, asm)
+        header = AssemblyGenerator().generate_asm([])[:ASM_HEADER_LINES]
+        asm.write("".join(line + '\n' for line in ASM_STARTUP + header))
+        code.seek(0)
+        shutil.copyfileobj(code, asm)
+        result.asm_lines += len(prologue) + literal_lines + len(ASM_STARTUP) + len(header)
+        if 'frame' in result.asm_stats:
+            result.asm_stats['frame']['globals'] = len(global_types)
+
+        result.paths = files.publish(REPORT_FILES)
+        return result
+    finally:
+        files.discard()
+        source.close()
+        code.close()
+        literals.close()
+
+
+def run_stream(filename='input.c', out_dir='.', options=None):
+    """Command-line driver for compile_stream: compile and print a summary.
+
+    Returns the exit status.
+    """
+    options = options or CompileOptions()
+    start = time.perf_counter()
+    try:
+        result = compile_stream(filename, out_dir, options)
+    except FileNotFoundError:
+        print(f"Error: Could not find {filename}")
+        return 1
+    except CompileError as e:
+        print(f"{e.phase.capitalize()} failed: {e.message}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for path in result.paths:
+        print(f"  Wrote {path}")
+    print(f"  Generated {result.tokens} tokens")
+    print(f"  Found {result.functions} function(s)")
+    if result.warnings:
+        print(f"Semantic analysis completed with {len(result.warnings)} warnings")
+    else:
+        print("Semantic analysis completed - No errors found")
+    if options.optimize:
+        write_stats(result.ir_stats)
+        write_stats(result.asm_stats)
+    print(f"  Streamed {result.functions} function(s) in {elapsed:.2f} s")
+    return 0
@@ -0,0 +1,196 @@
+from cfg import Instr, build_cfg, flatten, is_const, is_temp, liveness, NEGATED_RELOP, SWAPPED_RELOP
+from loops import find_loops, insert_preheader
+
+
+def fold(op, a, b):
+    """Fold two integer literals, or return None."""
+    if not (is_const(a) and is_const(b)) or '.' in a + b or 'e' in (a + b).lower():
+        return None
+    x, y = int(a), int(b)
+    return str(x * y if op == '*' else x + y)
+
+
+class InductionVariables:
+    """Induction-variable strength reduction with linear-function test replacement.
+
+    A basic IV is a local `i` whose only definition in the loop is `i = i +/- c`
+    (possibly through a temp) with c loop-invariant. Every derived IV `t = i * k`
+    (k invariant) becomes a copy of a new variable s that is set to i * k in the
+    preheader and bumped by c * k right after each update of i. When k is a non-zero
+    literal, the exit test on i is rewritten as a test on s, and i is deleted if
+    nothing else reads it.
+    """
+
+    name = 'ivsr'
+
+    def __init__(self):
+        self.reduced = 0
+        self.tests = 0
+        self.removed = 0
+
+    def stats(self):
+        return {'multiplications reduced': self.reduced, 'tests replaced': self.tests,
+                'induction variables removed': self.removed}
+
+    def run(self, func):
+        """Strength-reduce the loops of one IRFunction in place."""
+        blocks = build_cfg(func.body)
+        loops, _ = find_loops(blocks)
+        by_index = {b.index: b for b in blocks}
+        # Rewriting a loop only makes names dead, so liveness computed once stays
+        # a safe over-approximation; readers counts the instructions reading a name
+        self.live_in, _ = liveness(blocks)
+        self.readers = {}
+        for ins in func.body:
+            for u in set(ins.uses()):
+                self.readers[u] = self.readers.get(u, 0) + 1
+        for loop in loops:
+            if loop.header.label:
+                self.reduce_loop(func, blocks, by_index, loop, loops)
+        func.body = flatten(blocks)
+
+    def reduce_loop(self, func, blocks, by_index, loop, loops):
+        body = [by_index[i] for i in sorted(loop.blocks)]
+        instrs = [ins for b in body for ins in b.instrs]
+        defs = {}
+        has_call = False
+        for ins in instrs:
+            has_call = has_call or ins.kind == 'call'
+            for d in ins.defs():
+                defs.setdefault(d, []).append(ins)
+
+        def invariant(operand):
+            if is_const(operand):
+                return True
+            return operand not in defs and (func.is_local(operand) or not has_call)
+
+        def is_float(operand):
+            if is_const(operand):
+                return '.' in operand or 'e' in operand.lower()
+            return func.declared_type(operand) == 'float'
+
+        ivs = self.basic_ivs(func, defs, invariant)
+        if not ivs:
+            return
+
+        # Derived IVs: t = i * k / t = k * i
+        reduced = {}        # (i, k) -> s
+        preheader = []
+        for ins in instrs:
+            if ins.kind != 'binary' or ins.op != '*':
+                continue
+            a, b = ins.args
+            if a in ivs and invariant(b):
+                iv, k = a, b
+            elif b in ivs and invariant(a):
+                iv, k = b, a
+            else:
+                continue
+            if is_float(k) or is_float(iv):
+                continue
+            key = (iv, k)
+            if key not in reduced:
+                s = func.new_temp()
+                reduced[key] = s
+                preheader.append(Instr('binary', dest=s, op='*', args=[iv, k]))
+                op, c, update = ivs[iv]
+                step = k if c == '1' else fold('*', c, k)
+                if step is None:
+                    step = func.new_temp()
+                    preheader.append(Instr('binary', dest=step, op='*', args=[c, k]))
+                bump = Instr('binary', dest=s, op=op, args=[s, step])
+                for b in body:
+                    if update in b.instrs:
+                        b.instrs.insert(b.instrs.index(update) + 1, bump)
+            ins.kind, ins.op, ins.args = 'copy', None, [reduced[key]]
+            self.reduced += 1
+
+        if not reduced:
+            return
+        replaced = self.replace_test(func, body, ivs, reduced, invariant, preheader)
+        if replaced is not None:
+            self.tests += 1
+            self.remove_iv(body, loop, replaced, ivs[replaced])
+        pre = insert_preheader(func, blocks, loop, preheader, loops)
+        by_index[pre.index] = pre
+        # The preheader reads nothing the header did not
+        self.live_in[pre.index] = self.live_in[loop.header.index]
+
+    def basic_ivs(self, func, defs, invariant):
+        """{i: (op, step, update instruction)} for the basic IVs of a loop."""
+        ivs = {}
+        for name, ds in defs.items():
+            if len(ds) != 1 or is_temp(name) or not func.is_local(name):
+                continue
+            ins = ds[0]
+            step_ins = ins
+            if ins.kind == 'copy' and is_temp(ins.args[0]) and len(defs.get(ins.args[0], ())) == 1:
+                step_ins = defs[ins.args[0]][0]
+            if step_ins.kind != 'binary' or step_ins.op not in ('+', '-'):
+                continue
+            a, b = step_ins.args
+            if a == name and invariant(b):
+                ivs[name] = (step_ins.op, b, ins)
+            elif b == name and step_ins.op == '+' and invariant(a):
+                ivs[name] = ('+', a, ins)
+        return ivs
+
+    def replace_test(self, func, body, ivs, reduced, invariant, preheader):
+        """Rewrite the loop exit test on i as a test on a reduced IV. Returns i or None."""
+        for b in body:
+            last = b.last()
+            if last is None or last.kind != 'if':
+                continue
+            # Either `IF i < n GOTO L`, or `t = i < n` followed by `IF t == 0 GOTO L`
+            cmp_ins, relop_holder = last, last
+            if last.args[1] == '0' and last.op in ('==', '!=') and is_temp(last.args[0]):
+                for ins in b.instrs:
+                    if ins.kind == 'binary' and ins.dest == last.args[0] and ins.op in NEGATED_RELOP:
+                        cmp_ins = relop_holder = ins
+            if cmp_ins.op not in NEGATED_RELOP:
+                continue
+            a, n = cmp_ins.args
+            op = cmp_ins.op
+            if n in ivs and a not in ivs:
+                a, n, op = n, a, SWAPPED_RELOP[op]
+            if a not in ivs or not invariant(n):
+                continue
+            for (iv, k), s in reduced.items():
+                if iv != a or not is_const(k) or int(k) == 0:
+                    continue
+                if int(k) < 0:
+                    op = SWAPPED_RELOP[op]
+                limit = fold('*', n, k)
+                if limit is None:
+                    limit = func.new_temp()
+                    preheader.append(Instr('binary', dest=limit, op='*', args=[n, k]))
+                relop_holder.op = op
+                relop_holder.args = [s, limit]
+                return a
+        return None
+
+    def remove_iv(self, body, loop, iv, info):
+        """Delete the updates of i when its value is no longer needed."""
+        _, _, update = info
+        chain = [update]
+        if update.kind == 'copy':
+            src = update.args[0]
+            step = [ins for b in body for ins in b.instrs if src in ins.defs()]
+            if self.readers.get(src) != 1:
+                return
+            chain += step
+
+        for inside, outside in loop.exit_edges():
+            if iv in self.live_in[outside.index]:
+                return
+        in_chain = {id(ins) for ins in chain}
+        for b in body:
+            for ins in b.instrs:
+                if id(ins) not in in_chain and iv in ins.uses():
+                    return
+        for b in body:
+            b.instrs = [ins for ins in b.instrs if id(ins) not in in_chain]
+        for ins in chain:
+            for u in set(ins.uses()):
+                self.readers[u] -= 1
+        self.removed += 1
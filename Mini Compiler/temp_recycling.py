@@ -0,0 +1,88 @@
+import re
+
+from cfg import build_cfg, flatten, is_temp, liveness
+
+TEMP_WORD_RE = re.compile(r'\bt\d+\b')
+
+
+class TempRecycler:
+    """Renumber temps per function so that temps with disjoint lifetimes share a name.
+
+    IRGenerator numbers temps across the whole program, so every temp becomes its own
+    memory operand. This pass builds an interference graph of the temps from a
+    backward liveness analysis, colours it greedily in order of first appearance and
+    renames the temps of every function to t1..tk, k being the number of colours.
+    """
+
+    name = 'temps'
+
+    def __init__(self):
+        self.before = 0
+        self.after = 0
+        self.peaks = {}
+
+    def stats(self):
+        peaks = ", ".join(f"{name} {peak}" for name, peak in self.peaks.items())
+        return {'temps before': self.before, 'temps after': self.after,
+                'peak live temps': peaks or 'none'}
+
+    def run(self, func):
+        """Rename the temps of one IRFunction in place."""
+        blocks = build_cfg(func.body)
+        _, live_out = liveness(blocks)
+
+        edges = {}
+        peak = 0
+        for b in blocks:
+            live = {n for n in live_out[b.index] if is_temp(n)}
+            peak = max(peak, len(live))
+            for ins in reversed(b.instrs):
+                for d in ins.defs():
+                    if not is_temp(d):
+                        continue
+                    edges.setdefault(d, set())
+                    for other in live:
+                        if other != d and not (ins.kind == 'copy' and ins.args[0] == other):
+                            edges[d].add(other)
+                            edges.setdefault(other, set()).add(d)
+                    # The assembly is two-address (MOV d, l / OP d, r): d must not share r's name
+                    if ins.kind == 'binary':
+                        left, right = ins.args
+                        if is_temp(right) and right != left and right != d:
+                            edges[d].add(right)
+                            edges.setdefault(right, set()).add(d)
+                live.difference_update(ins.defs())
+                live.update(n for n in ins.uses() if is_temp(n))
+                peak = max(peak, len(live))
+            # Temps live on entry to the block are all live at the same time
+            for n in live:
+                edges.setdefault(n, set()).update(live - {n})
+
+        order = []
+        seen = set()
+        for ins in func.body:
+            for n in ins.defs() + ins.uses():
+                if is_temp(n) and n not in seen:
+                    seen.add(n)
+                    order.append(n)
+
+        colour = {}
+        for n in order:
+            taken = {colour[m] for m in edges.get(n, ()) if m in colour}
+            c = 0
+            while c in taken:
+                c += 1
+            colour[n] = c
+        mapping = {n: f"t{c + 1}" for n, c in colour.items()}
+
+        for ins in flatten(blocks):
+            ins.args = [mapping.get(a, a) for a in ins.args]
+            if ins.dest is not None and ins.kind != 'label':
+                ins.dest = mapping.get(ins.dest, ins.dest)
+            if ins.kind == 'comment':
+                ins.text = TEMP_WORD_RE.sub(lambda m: mapping.get(m.group(), m.group()), ins.text)
+        func.temp_count = 0
+
+        self.before += len(order)
+        self.after += len(set(mapping.values()))
+        self.peaks[func.name] = peak
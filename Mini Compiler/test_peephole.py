@@ -0,0 +1,29 @@
+from compiler import CompileOptions, compile_source
+from peephole import PeepholeOptimizer
+from simulator import Simulator
+
+# Run with: python -m pytest -q (from Mini Compiler/)
+
+UNARY_PROGRAMS = {
+    'int main(){int a;int b;a=3;b=-a;b=-b;return b;}': 3,
+    'int main(){int a;int b;a=3;b=!a;b=!b;return b;}': 1,
+}
+
+
+def run(source, optimize, allocator='graph'):
+    options = CompileOptions(optimize=optimize, allocator=allocator, reports=False,
+                             cache_dir=None)
+    return Simulator(compile_source(source, options).asm).run().return_value
+
+
+def test_unary_operand_reads_its_register():
+    # MOV R4, -R4 reads R4, so the MOV R4, -R1 before it must stay
+    asm = ['FUNC_main:', '    MOV R4, -R1', '    MOV R4, -R4', '    MOV R0, R4', '    RET']
+    assert PeepholeOptimizer().optimize(asm)[1:3] == ['    MOV R4, -R1', '    MOV R4, -R4']
+
+
+def test_unary_programs_under_optimization():
+    for source, expected in UNARY_PROGRAMS.items():
+        assert run(source, optimize=False) == expected
+        for allocator in ('graph', 'linear'):
+            assert run(source, optimize=True, allocator=allocator) == expected
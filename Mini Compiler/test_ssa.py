@@ -0,0 +1,33 @@
+from benchmarks import CALL_PROGRAM, SAMPLE_PROGRAM, VM_PROGRAMS
+from compiler import CompileOptions, compile_source
+from optimizer import SSA_PIPELINE, optimize_ir
+from simulator import Simulator
+from vm import run_ir
+
+# Run with: python -m pytest -q (from Mini Compiler/)
+
+PROGRAMS = dict(VM_PROGRAMS, sample=SAMPLE_PROGRAM, calls=CALL_PROGRAM)
+
+
+def compile_program(source, optimize=False, ssa=False):
+    options = CompileOptions(optimize=optimize, ssa=ssa, reports=False, cache_dir=None)
+    return compile_source(source, options)
+
+
+def test_round_trip_runs_identically():
+    phis = 0
+    for source in PROGRAMS.values():
+        ir = compile_program(source).ir
+        for passes in (['ssa'], SSA_PIPELINE):
+            round_trip, stats = optimize_ir(ir, passes)
+            phis += stats['ssa']['phis placed']
+            assert run_ir(round_trip).return_value == run_ir(ir).return_value
+    assert phis > 0     # the programs have loops, so something was merged
+
+
+def test_ssa_option_compiles_the_same_program():
+    for source in PROGRAMS.values():
+        results = [compile_program(source, optimize=True, ssa=ssa) for ssa in (False, True)]
+        assert 'ssa' in results[1].ir_stats and 'ssa' not in results[0].ir_stats
+        values = [Simulator(r.asm).run(max_steps=10_000_000).return_value for r in results]
+        assert values[0] == values[1]
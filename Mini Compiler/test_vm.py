@@ -0,0 +1,26 @@
+from compiler import CompileOptions, compile_source
+from vm import run_ir
+
+# Run with: python -m pytest -q (from Mini Compiler/)
+
+CONVERSION_PROGRAMS = {
+    'int main(){int r; r = 7/2.0; return r;}': 3,
+    'int f(float a){return a;} int main(){return f(2.5);}': 2,
+    'float g(){return 7;} int main(){float x; x = 7; return x/2*10 + g()/2;}': 38,
+    'float h(float a){return a/2;} int main(){return h(5)*10;}': 25,
+}
+
+
+def run(source, optimize=False):
+    options = CompileOptions(optimize=optimize, reports=False, cache_dir=None)
+    return run_ir(compile_source(source, options).ir).return_value
+
+
+def test_values_take_their_declared_types():
+    for source, expected in CONVERSION_PROGRAMS.items():
+        assert run(source) == expected
+        assert run(source, optimize=True) == expected
+
+
+def test_extra_arguments_are_dropped():
+    assert run('int h(int a){return a;} int main(){return h(1, 2, 3);}') == 1
@@ -0,0 +1,179 @@
+from cfg import (build_cfg, dominators, dominator_tree, flatten, is_const, is_temp,
+                 COMMUTATIVE_OPS, SWAPPED_RELOP)
+
+
+class ValueNumbering:
+    """Dominator-based value numbering.
+
+    Every name and literal gets a value number (VN); an expression is keyed by its
+    operator and the VNs of its operands, so `a * b` computed again while `a` and `b`
+    still hold the same values maps to the same VN and the earlier temp is reused.
+    Tables are inherited down the dominator tree. Reassigning a variable gives it a
+    fresh VN, which invalidates every expression that used the old one.
+    """
+
+    name = 'gvn'
+
+    def __init__(self):
+        self.vn_count = 0
+        self.replaced = 0
+
+    def new_vn(self):
+        self.vn_count += 1
+        return self.vn_count
+
+    def stats(self):
+        return {'expressions reused': self.replaced}
+
+    def run(self, func):
+        """Value-number one IRFunction in place."""
+        blocks = build_cfg(func.body)
+        idom = dominators(blocks)
+        if not idom:
+            return
+        children = dominator_tree(blocks, idom)
+        self.func = func
+        self.blocks = blocks
+
+        def_count = {}
+        for ins in func.body:
+            for d in ins.defs():
+                def_count[d] = def_count.get(d, 0) + 1
+        # Temps assigned exactly once can simply be renamed to an equal temp
+        self.single = {n for n, c in def_count.items() if c == 1 and is_temp(n)}
+        self.alias = {}
+        self.removed = set()
+        self.block_defs = {}
+        self.block_calls = {}
+        for b in blocks:
+            defs = set()
+            for ins in b.instrs:
+                defs.update(ins.defs())
+            self.block_defs[b.index] = defs
+            self.block_calls[b.index] = any(ins.kind == 'call' for ins in b.instrs)
+
+        entry = blocks[0].index
+        stack = [(entry, ({}, {}, {}))]
+        while stack:
+            index, state = stack.pop()
+            block = blocks[index]
+            if index != entry:
+                self.kill_on_entry(block, idom[index], state)
+            self.number_block(block, state)
+
+            kids = children[index]
+            for i, child in enumerate(kids):
+                # The last child may take over the parent's tables instead of a copy
+                if i == len(kids) - 1:
+                    stack.append((child, state))
+                else:
+                    var_vn, exprs, holders = state
+                    stack.append((child, (dict(var_vn), dict(exprs),
+                                          {k: list(v) for k, v in holders.items()})))
+
+        for b in blocks:
+            b.instrs = [ins for ins in b.instrs if id(ins) not in self.removed]
+            for ins in b.instrs:
+                ins.args = [self.resolve(a) for a in ins.args]
+        func.body = flatten(blocks)
+
+    def resolve(self, name):
+        while name in self.alias:
+            name = self.alias[name]
+        return name
+
+    def kill_on_entry(self, block, dom, state):
+        """Invalidate names that may be redefined between the dominator and this block."""
+        region = set()
+        pending = list(block.preds)
+        while pending:
+            p = pending.pop()
+            if p.index == dom or p.index in region:
+                continue
+            region.add(p.index)
+            pending.extend(p.preds)
+        if not region:
+            return
+        var_vn = state[0]
+        killed = set()
+        for index in region:
+            killed |= self.block_defs[index]
+            if self.block_calls[index]:
+                killed.update(n for n in var_vn if not self.func.is_local(n))
+        for name in killed:
+            if name in var_vn:
+                self.assign(state, name, self.new_vn())
+
+    def assign(self, state, name, vn):
+        var_vn, _, holders = state
+        old = var_vn.get(name)
+        if old is not None and old in holders:
+            holders[old] = [h for h in holders[old] if h != name]
+        var_vn[name] = vn
+        holders.setdefault(vn, []).append(name)
+
+    def operand_vn(self, state, operand):
+        var_vn, exprs, _ = state
+        if is_const(operand):
+            key = ('const', operand)
+            if key not in exprs:
+                exprs[key] = self.new_vn()
+            return exprs[key]
+        if operand not in var_vn:
+            self.assign(state, operand, self.new_vn())
+        return var_vn[operand]
+
+    def expr_key(self, state, ins):
+        if ins.kind == 'binary':
+            op = ins.op
+            left = self.operand_vn(state, ins.args[0])
+            right = self.operand_vn(state, ins.args[1])
+            if op in ('>', '>='):
+                op, left, right = SWAPPED_RELOP[op], right, left
+            elif op in COMMUTATIVE_OPS and left > right:
+                left, right = right, left
+            return (op, left, right)
+        if ins.kind == 'unary':
+            return (ins.op, self.operand_vn(state, ins.args[0]))
+        return ('cast', ins.op, self.operand_vn(state, ins.args[0]))
+
+    def pick_holder(self, names):
+        for name in names:
+            if name in self.single:
+                return name
+        return names[0] if names else None
+
+    def number_block(self, block, state):
+        var_vn, exprs, holders = state
+        for ins in block.instrs:
+            kind = ins.kind
+            if kind == 'copy':
+                self.assign(state, ins.dest, self.operand_vn(state, ins.args[0]))
+
+            elif kind in ('binary', 'unary', 'cast'):
+                key = self.expr_key(state, ins)
+                vn = exprs.get(key)
+                holder = self.pick_holder(holders.get(vn, [])) if vn is not None else None
+                if holder is None:
+                    vn = self.new_vn()
+                    exprs[key] = vn
+                elif holder == ins.dest:
+                    self.removed.add(id(ins))
+                    self.replaced += 1
+                elif ins.dest in self.single and holder in self.single:
+                    self.alias[ins.dest] = holder
+                    self.removed.add(id(ins))
+                    self.replaced += 1
+                else:
+                    ins.kind, ins.op, ins.args = 'copy', None, [holder]
+                    self.replaced += 1
+                self.assign(state, ins.dest, vn)
+
+            elif kind == 'call':
+                # A call may change anything that is not local to this function
+                for name in [n for n in var_vn if not self.func.is_local(n)]:
+                    self.assign(state, name, self.new_vn())
+                self.assign(state, ins.dest, self.new_vn())
+
+            elif kind == 'param':
+                self.assign(state, ins.dest, self.new_vn())
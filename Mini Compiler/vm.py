@@ -0,0 +1,377 @@
+import sys
+from array import array
+
+from cfg import is_const, parse_program
+from frame import FrameLayout, base_name, operand_type, value_type
+from simulator import c_div, c_mod
+
+# == Bytecode ===
+# Every instruction is four ints in one array('i'): opcode and three operands.
+# Operands are slot indices into the frame of the running function, except for
+# jump targets (code indices), function numbers and global numbers.
+WIDTH = 4
+
+(MOV, ADD, SUB, MUL, DIV, MOD, EQ, NE, LT, GT, LE, GE, AND, OR, NEG, NOT,
+ TO_INT, TO_FLOAT, JMP, IF_EQ, IF_NE, IF_LT, IF_GT, IF_LE, IF_GE,
+ ARG, CALL, RET, GLOAD, GSTORE) = range(30)
+
+BINARY_OPCODES = {'+': ADD, '-': SUB, '*': MUL, '/': DIV, '%': MOD, '==': EQ, '!=': NE,
+                  '<': LT, '>': GT, '<=': LE, '>=': GE, '&&': AND, '||': OR}
+IF_OPCODES = {'==': IF_EQ, '!=': IF_NE, '<': IF_LT, '>': IF_GT, '<=': IF_LE, '>=': IF_GE}
+OPCODE_NAMES = ('MOV', 'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'EQ', 'NE', 'LT', 'GT', 'LE',
+                'GE', 'AND', 'OR', 'NEG', 'NOT', 'TO_INT', 'TO_FLOAT', 'JMP', 'IF_EQ',
+                'IF_NE', 'IF_LT', 'IF_GT', 'IF_LE', 'IF_GE', 'ARG', 'CALL', 'RET',
+                'GLOAD', 'GSTORE')
+
+
+class VMError(Exception):
+    pass
+
+
+class FunctionCode:
+    """Layout of one compiled function: where its code starts and what a fresh frame holds."""
+
+    def __init__(self, name, number):
+        self.name = name
+        self.number = number
+        self.entry = 0              # code index of the first instruction
+        self.slots = {}             # operand text -> slot index
+        self.template = []          # initial frame: constants, then zeros
+        self.param_start = 0        # slot of the first parameter
+        self.param_count = 0
+        self.scratch = 0            # slot for converted arguments and return values
+
+
+class BytecodeCompiler:
+    """Compile IR (IRGenerator output, optimized or not) to bytecode.
+
+    Each function gets a frame of slots: its constants first (so every operand is
+    a slot and no instruction has to tell literals from variables), then the
+    parameters in order, then the other locals and temps. Names that belong to
+    no function are globals, loaded into and stored from scratch slots around
+    the instructions that use them.
+
+    Values keep C's int/float semantics: a value stored in a declared int or
+    float local, passed to a parameter or returned is converted to its type
+    with TO_INT or TO_FLOAT, where the inferred type of the value differs.
+    """
+
+    def __init__(self):
+        self.code = array('i')
+        self.functions = {}         # name -> FunctionCode
+        self.globals = {}           # name -> global number
+        self.layout = None          # frame.FrameLayout, for its type inference
+        self.param_types = {}       # function name -> [parameter type]
+
+    def compile(self, ir_lines):
+        program = parse_program(ir_lines)
+        self.layout = FrameLayout(program.functions)
+        for number, func in enumerate(program.functions):
+            self.functions[func.name] = FunctionCode(func.name, number)
+            self.param_types[func.name] = [ptype for ptype, _ in func.params]
+        for func in program.functions:
+            self.compile_function(func)
+        return self
+
+    def compile_function(self, func):
+        fc = self.functions[func.name]
+        fc.entry = len(self.code) // WIDTH
+        types = self.layout.infer_types(func)
+        declared = dict(func.locals)
+        declared.update((name, ptype) for ptype, name in func.params)
+        names = func.param_names()
+        fc.param_count = len(names)
+        constants = []
+        for ins in func.body:
+            for a in ins.args:
+                if is_const(a) and a not in constants:
+                    constants.append(a)
+            for n in ins.defs() + ins.uses():
+                if n not in names and not is_const(n):
+                    names.append(n)
+        fc.param_start = len(constants)
+        for text in constants:
+            fc.slots[text] = len(fc.template)
+            fc.template.append(float(text) if '.' in text or 'e' in text.lower() else int(text))
+        shared = set()              # the globals this function touches
+        for n in names:
+            fc.slots[n] = len(fc.template)
+            fc.template.append(0)
+            if not func.is_local(n):
+                self.globals.setdefault(n, len(self.globals))
+                shared.add(n)
+        fc.scratch = len(fc.template)
+        fc.template.append(0)
+
+        # The call each argument belongs to: its arguments come right before it
+        arg_of = {}                 # index in func.body -> (callee, position)
+        pending = []
+        for i, ins in enumerate(func.body):
+            if ins.kind == 'arg':
+                pending.append(i)
+            elif ins.kind == 'call':
+                arg_of.update((j, (ins.op, position)) for position, j in enumerate(pending))
+                pending = []
+
+        labels = {}
+        fixups = []                 # (code index of a jump target operand, label)
+        for i, ins in enumerate(func.body):
+            k = ins.kind
+            if k == 'label':
+                labels[ins.dest] = len(self.code) // WIDTH
+                continue
+            if k in ('comment', 'blank', 'param'):
+                continue
+            for a in ins.uses():
+                if a in shared:
+                    self.emit(GLOAD, fc.slots[a], self.globals[a])
+            src = [fc.slots[a] for a in ins.args]
+            dest = fc.slots.get(ins.dest) if ins.defs() else None
+            if k == 'copy':
+                self.emit(MOV, dest, src[0])
+            elif k == 'binary':
+                self.emit(BINARY_OPCODES[ins.op], dest, src[0], src[1])
+            elif k == 'unary':
+                if ins.op == '-':
+                    self.emit(NEG, dest, src[0])
+                elif ins.op == '!':
+                    self.emit(NOT, dest, src[0])
+                else:
+                    self.emit(MOV, dest, src[0])
+            elif k == 'cast':
+                self.emit(TO_FLOAT if ins.op == 'float' else TO_INT, dest, src[0])
+            elif k == 'arg':
+                callee, position = arg_of.get(i, (None, 0))
+                params = self.param_types.get(callee, [])
+                wanted = params[position] if position < len(params) else None
+                self.emit(ARG, self.convert(fc, operand_type(types, ins.args[0]), wanted, src[0]))
+            elif k == 'call':
+                if ins.op not in self.functions:
+                    raise VMError(f"{func.name}: call to unknown function '{ins.op}'")
+                self.emit(CALL, dest, self.functions[ins.op].number)
+            elif k == 'return':
+                if src:
+                    src[0] = self.convert(fc, operand_type(types, ins.args[0]), func.ret_type,
+                                          src[0])
+                self.emit(RET, src[0] if src else -1)
+            elif k == 'goto':
+                fixups.append((len(self.code) + 1, ins.target))
+                self.emit(JMP, 0)
+            elif k == 'if':
+                fixups.append((len(self.code) + 3, ins.target))
+                self.emit(IF_OPCODES[ins.op], src[0], src[1], 0)
+            else:
+                raise VMError(f"{func.name}: cannot compile '{ins.render().strip()}'")
+            if dest is not None and base_name(ins.dest) in declared:
+                self.convert(fc, value_type(ins, types, self.layout.return_types),
+                             declared[base_name(ins.dest)], dest, dest)
+            if dest is not None and ins.dest in shared:
+                self.emit(GSTORE, self.globals[ins.dest], dest)
+        self.emit(RET, -1)          # falling off the end returns 0
+        for at, label in fixups:
+            if label not in labels:
+                raise VMError(f"{func.name}: jump to unknown label '{label}'")
+            self.code[at] = labels[label]
+
+    def convert(self, fc, kind, wanted, src, dest=None):
+        """Slot holding the value of slot src as a wanted ('int', 'char' or 'float');
+        emits TO_INT or TO_FLOAT into dest (the scratch slot by default) when kind,
+        the type src holds, differs."""
+        if wanted not in ('int', 'char', 'float') or (kind == 'float') == (wanted == 'float'):
+            return src
+        dest = fc.scratch if dest is None else dest
+        self.emit(TO_FLOAT if wanted == 'float' else TO_INT, dest, src)
+        return dest
+
+    def emit(self, op, a=0, b=0, c=0):
+        self.code.extend((op, a, b, c))
+
+    def disassemble(self):
+        """Readable listing of the bytecode, one instruction per line."""
+        starts = {fc.entry: fc.name for fc in self.functions.values()}
+        lines = []
+        for i in range(0, len(self.code), WIDTH):
+            if i // WIDTH in starts:
+                lines.append(f"{starts[i // WIDTH]}:")
+            op, a, b, c = self.code[i:i + WIDTH]
+            lines.append(f"  {i // WIDTH:5d}  {OPCODE_NAMES[op]:<9}{a:5d}{b:5d}{c:5d}")
+        return lines
+
+
+class VMResult:
+    def __init__(self, return_value, instructions, calls):
+        self.return_value = return_value
+        self.instructions = instructions
+        self.calls = calls
+
+
+class VirtualMachine:
+    """Register VM executing the bytecode of a BytecodeCompiler.
+
+    Values are Python ints and floats with C semantics for division, remainder
+    and casts; arithmetic on two ints stays an int. The compiler has inserted
+    the conversions to declared types (see BytecodeCompiler). Calls push the caller's
+    (frame, return index, result slot) on an explicit stack, so deep recursion
+    does not touch the Python stack.
+    """
+
+    def __init__(self, compiled):
+        self.code = list(compiled.code)     # list indexing is faster than array's
+        by_number = sorted(compiled.functions.values(), key=lambda fc: fc.number)
+        self.entries = [fc.entry * WIDTH for fc in by_number]
+        self.templates = [fc.template for fc in by_number]
+        self.param_starts = [fc.param_start for fc in by_number]
+        self.param_counts = [fc.param_count for fc in by_number]
+        self.functions = compiled.functions
+        self.global_count = len(compiled.globals)
+
+    def run(self, entry='main', args=(), max_steps=1_000_000_000):
+        if entry not in self.functions:
+            raise VMError(f"no function '{entry}'")
+        code = self.code
+        entries = self.entries
+        templates = self.templates
+        param_starts = self.param_starts
+        param_counts = self.param_counts
+        fc = self.functions[entry]
+        frame = list(fc.template)
+        start = self.param_starts[fc.number]
+        args = list(args)[:fc.param_count]
+        frame[start:start + len(args)] = args
+        glob = [0] * self.global_count
+        stack = []
+        pending = []
+        pc = entries[fc.number]
+        steps = 0
+        calls = 0
+        while True:
+            op = code[pc]
+            a = code[pc + 1]
+            steps += 1
+            if op == MOV:
+                frame[a] = frame[code[pc + 2]]
+                pc += WIDTH
+            elif op == ADD:
+                frame[a] = frame[code[pc + 2]] + frame[code[pc + 3]]
+                pc += WIDTH
+            elif op == SUB:
+                frame[a] = frame[code[pc + 2]] - frame[code[pc + 3]]
+                pc += WIDTH
+            elif op == IF_LT:
+                pc = code[pc + 3] * WIDTH if frame[a] < frame[code[pc + 2]] else pc + WIDTH
+            elif op == IF_GE:
+                pc = code[pc + 3] * WIDTH if frame[a] >= frame[code[pc + 2]] else pc + WIDTH
+            elif op == IF_LE:
+                pc = code[pc + 3] * WIDTH if frame[a] <= frame[code[pc + 2]] else pc + WIDTH
+            elif op == IF_GT:
+                pc = code[pc + 3] * WIDTH if frame[a] > frame[code[pc + 2]] else pc + WIDTH
+            elif op == IF_EQ:
+                pc = code[pc + 3] * WIDTH if frame[a] == frame[code[pc + 2]] else pc + WIDTH
+            elif op == IF_NE:
+                pc = code[pc + 3] * WIDTH if frame[a] != frame[code[pc + 2]] else pc + WIDTH
+            elif op == JMP:
+                pc = a * WIDTH
+            elif op == MUL:
+                frame[a] = frame[code[pc + 2]] * frame[code[pc + 3]]
+                pc += WIDTH
+            elif op <= GE and op >= EQ:
+                left = frame[code[pc + 2]]
+                right = frame[code[pc + 3]]
+                if op == LT:
+                    frame[a] = int(left < right)
+                elif op == GE:
+                    frame[a] = int(left >= right)
+                elif op == LE:
+                    frame[a] = int(left <= right)
+                elif op == GT:
+                    frame[a] = int(left > right)
+                elif op == EQ:
+                    frame[a] = int(left == right)
+                else:
+                    frame[a] = int(left != right)
+                pc += WIDTH
+            elif op == DIV or op == MOD:
+                left = frame[code[pc + 2]]
+                right = frame[code[pc + 3]]
+                if type(left) is int and type(right) is int and left >= 0 and right > 0:
+                    # Python and C agree here
+                    frame[a] = left // right if op == DIV else left % right
+                elif right == 0:
+                    raise VMError("division by zero")
+                else:
+                    frame[a] = (c_div if op == DIV else c_mod)(left, right)
+                pc += WIDTH
+            elif op == ARG:
+                pending.append(frame[a])
+                pc += WIDTH
+            elif op == CALL:
+                number = code[pc + 2]
+                stack.append((frame, pc + WIDTH, a))
+                frame = templates[number][:]
+                start = param_starts[number]
+                if len(pending) > param_counts[number]:
+                    del pending[param_counts[number]:]      # extra arguments are dropped
+                frame[start:start + len(pending)] = pending
+                pending = []
+                pc = entries[number]
+                calls += 1
+                if len(stack) > 100_000:
+                    raise VMError("call stack overflow")
+            elif op == RET:
+                value = frame[a] if a >= 0 else 0
+                if not stack:
+                    break
+                frame, pc, dest = stack.pop()
+                frame[dest] = value
+            elif op == GLOAD:
+                frame[a] = glob[code[pc + 2]]
+                pc += WIDTH
+            elif op == GSTORE:
+                glob[a] = frame[code[pc + 2]]
+                pc += WIDTH
+            elif op == NEG:
+                frame[a] = -frame[code[pc + 2]]
+                pc += WIDTH
+            elif op == NOT:
+                frame[a] = int(not frame[code[pc + 2]])
+                pc += WIDTH
+            elif op == AND:
+                frame[a] = int(bool(frame[code[pc + 2]]) and bool(frame[code[pc + 3]]))
+                pc += WIDTH
+            elif op == OR:
+                frame[a] = int(bool(frame[code[pc + 2]]) or bool(frame[code[pc + 3]]))
+                pc += WIDTH
+            elif op == TO_INT:
+                frame[a] = int(frame[code[pc + 2]])
+                pc += WIDTH
+            elif op == TO_FLOAT:
+                frame[a] = float(frame[code[pc + 2]])
+                pc += WIDTH
+            else:
+                raise VMError(f"bad opcode {op} at {pc // WIDTH}")
+            if steps > max_steps:
+                raise VMError(f"stopped after {max_steps:,} instructions")
+        return VMResult(value, steps, calls)
+
+
+def run_ir(ir_lines, entry='main', max_steps=1_000_000_000):
+    """Compile IR lines and run one function; returns a VMResult."""
+    return VirtualMachine(BytecodeCompiler().compile(ir_lines)).run(entry, max_steps=max_steps)
+
+
+if __name__ == '__main__':
+    # Usage: python vm.py [intermediate_code_output.txt] [--disassemble]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    filename = args[0] if args else 'intermediate_code_output.txt'
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            compiled = BytecodeCompiler().compile(f.readlines())
+        if '--disassemble' in sys.argv:
+            for line in compiled.disassemble():
+                print(line)
+        result = VirtualMachine(compiled).run()
+    except (OSError, VMError) as e:
+        print(f"VM failed: {e}")
+        sys.exit(1)
+    print(f"Returned {result.return_value} after {result.instructions:,} instructions "
+          f"({result.calls:,} calls)")
@@ -0,0 +1,392 @@
+import sys
+
+from cfg import is_const, parse_program
+from frame import FrameLayout, base_name, is_float_literal, align
+
+# == System V AMD64 ABI ===
+INT_ARG_REGISTERS = ('%edi', '%esi', '%edx', '%ecx', '%r8d', '%r9d')
+FLOAT_ARG_REGISTERS = tuple(f"%xmm{i}" for i in range(8))
+SLOT_SIZE = 8               # every IR name gets one eightbyte below %rbp
+STACK_ALIGNMENT = 16        # %rsp at a call instruction
+
+INT_SETCC = {'==': 'sete', '!=': 'setne', '<': 'setl', '>': 'setg', '<=': 'setle', '>=': 'setge'}
+INT_JCC = {'==': 'je', '!=': 'jne', '<': 'jl', '>': 'jg', '<=': 'jle', '>=': 'jge'}
+INT_ARITH = {'+': 'addl', '-': 'subl', '*': 'imull'}
+FLOAT_ARITH = {'+': 'addsd', '-': 'subsd', '*': 'mulsd', '/': 'divsd'}
+# ucomisd flags read like an unsigned compare; a < b is tested as b > a so that
+# an unordered (NaN) comparison is false, as in C
+FLOAT_ORDER = {'<': ('a', True), '<=': ('ae', True), '>': ('a', False), '>=': ('ae', False)}
+
+
+class X86Error(Exception):
+    pass
+
+
+class X86Generator:
+    """Lower IR to x86-64 GNU assembler (AT&T syntax) following the System V ABI.
+
+    Every local, temp and parameter lives in an eightbyte slot of the frame and
+    is loaded into scratch registers per instruction, like gcc -O0 does. ints are
+    32-bit and wrap; float values are kept as doubles in the slots and rounded to
+    single precision when stored into a variable declared float, and when passed
+    to or returned from a function. Stores, arguments and return values convert
+    between int and float the way C assignments do.
+    """
+
+    def __init__(self, ir_lines):
+        self.program = parse_program(ir_lines)
+        self.functions = {f.name: f for f in self.program.functions}
+        self.typing = FrameLayout(self.program.functions)
+        self.lines = []
+        self.literals = {}          # float value -> pool label
+        self.globals = {}           # name -> 'int' / 'float'
+
+    def generate(self):
+        """Return the lines of the assembly file."""
+        self.lines = ["    .text"]
+        for func in self.program.functions:
+            self.emit_function(func)
+        if self.literals:
+            self.lines += ["", "    .section .rodata", "    .align 8"]
+            for value, label in self.literals.items():
+                self.lines += [f"{label}:", f"    .double {value!r}"]
+        if self.globals:
+            self.lines += ["", "    .bss", "    .align 8"]
+            for name in self.globals:
+                self.lines += [f"{name}:", f"    .zero {SLOT_SIZE}"]
+        self.lines += ["", '    .section .note.GNU-stack,"",@progbits']
+        return self.lines
+
+    def emit(self, line):
+        self.lines.append("    " + line)
+
+    # == Functions ===
+
+    def emit_function(self, func):
+        self.func = func
+        self.types = self.typing.infer_types(func)
+        self.slots = {}
+        for name in func.param_names():
+            self.slots[name] = f"-{SLOT_SIZE * (len(self.slots) + 1)}(%rbp)"
+        for ins in func.body:
+            for n in ins.defs() + ins.uses():
+                if n in self.slots:
+                    continue
+                if func.is_local(n):
+                    self.slots[n] = f"-{SLOT_SIZE * (len(self.slots) + 1)}(%rbp)"
+                else:
+                    self.globals.setdefault(n, self.kind(n))
+
+        self.lines += ["", f"    .globl {func.name}", f"    .type {func.name}, @function",
+                       f"{func.name}:"]
+        self.emit("pushq %rbp")
+        self.emit("movq %rsp, %rbp")
+        size = align(SLOT_SIZE * len(self.slots), STACK_ALIGNMENT)
+        if size:
+            self.emit(f"subq ${size}, %rsp")
+        self.emit_parameters(func)
+
+        pending = []
+        for ins in func.body:
+            k = ins.kind
+            if k in ('comment', 'blank', 'param'):
+                continue
+            if k == 'label':
+                self.lines.append(f"{self.label(ins.dest)}:")
+            elif k == 'arg':
+                pending.append(ins.args[0])
+            elif k == 'call':
+                self.emit_call(ins.dest, ins.op, pending)
+                pending = []
+            elif k == 'copy':
+                self.emit_copy(ins.dest, ins.args[0])
+            elif k == 'binary':
+                self.emit_binary(ins.dest, ins.op, *ins.args)
+            elif k == 'unary':
+                self.emit_unary(ins.dest, ins.op, ins.args[0])
+            elif k == 'cast':
+                self.emit_copy(ins.dest, ins.args[0], 'float' if ins.op == 'float' else 'int')
+            elif k == 'goto':
+                self.emit(f"jmp {self.label(ins.target)}")
+            elif k == 'if':
+                self.emit_if(ins.op, ins.args[0], ins.args[1], ins.target)
+            elif k == 'return':
+                self.emit_return(ins.args[0] if ins.args else None)
+            else:
+                raise X86Error(f"{func.name}: cannot lower '{ins.render().strip()}'")
+        self.emit_return(None)
+        self.lines.append(f"    .size {func.name}, .-{func.name}")
+
+    def emit_parameters(self, func):
+        """Copy the incoming arguments (registers, then stack) into their slots."""
+        ints = floats = stack = 0
+        for ptype, name in func.params:
+            slot = self.slots[name]
+            if ptype == 'float':
+                if floats < len(FLOAT_ARG_REGISTERS):
+                    reg = FLOAT_ARG_REGISTERS[floats]
+                    floats += 1
+                else:
+                    reg = '%xmm8'
+                    self.emit(f"movss {16 + SLOT_SIZE * stack}(%rbp), {reg}")
+                    stack += 1
+                self.emit(f"cvtss2sd {reg}, {reg}")
+                self.emit(f"movsd {reg}, {slot}")
+            else:
+                if ints < len(INT_ARG_REGISTERS):
+                    self.emit(f"movl {INT_ARG_REGISTERS[ints]}, {slot}")
+                    ints += 1
+                else:
+                    self.emit(f"movl {16 + SLOT_SIZE * stack}(%rbp), %eax")
+                    self.emit(f"movl %eax, {slot}")
+                    stack += 1
+
+    def emit_return(self, value):
+        if value is not None:
+            if self.func.ret_type == 'float':
+                self.load_float(value, '%xmm0')
+                self.emit("cvtsd2ss %xmm0, %xmm0")
+            else:
+                self.load_int(value, '%eax')
+        elif self.func.name == 'main':
+            self.emit("movl $0, %eax")
+        self.emit("leave")
+        self.emit("ret")
+
+    def emit_call(self, dest, name, args):
+        callee = self.functions.get(name)
+        if callee is not None and len(callee.params) != len(args):
+            raise X86Error(f"{self.func.name}: {name} takes {len(callee.params)} arguments, got {len(args)}")
+        kinds = [ptype for ptype, _ in callee.params] if callee else [self.kind(a) for a in args]
+        in_int, in_float, on_stack = [], [], []
+        for arg, kind in zip(args, kinds):
+            if kind == 'float' and len(in_float) < len(FLOAT_ARG_REGISTERS):
+                in_float.append(arg)
+            elif kind != 'float' and len(in_int) < len(INT_ARG_REGISTERS):
+                in_int.append(arg)
+            else:
+                on_stack.append((arg, kind))
+
+        padding = SLOT_SIZE * (len(on_stack) % 2)
+        if padding:
+            self.emit(f"subq ${padding}, %rsp")
+        for arg, kind in reversed(on_stack):
+            if kind == 'float':
+                self.load_float(arg, '%xmm0')
+                self.emit("cvtsd2ss %xmm0, %xmm0")
+                self.emit("movd %xmm0, %eax")
+            else:
+                self.load_int(arg, '%eax')
+            self.emit("pushq %rax")
+        for arg, reg in zip(in_int, INT_ARG_REGISTERS):
+            self.load_int(arg, reg)
+        for arg, reg in zip(in_float, FLOAT_ARG_REGISTERS):
+            self.load_float(arg, reg)
+            self.emit(f"cvtsd2ss {reg}, {reg}")
+        self.emit(f"movl ${len(in_float)}, %eax")    # vector registers used, for varargs callees
+        self.emit(f"call {name}")
+        if on_stack:
+            self.emit(f"addq ${SLOT_SIZE * len(on_stack) + padding}, %rsp")
+        if callee is not None and callee.ret_type == 'float':
+            self.emit("cvtss2sd %xmm0, %xmm0")
+            self.store_float(dest)
+        else:
+            self.store_int(dest)
+
+    # == Instructions ===
+
+    def emit_copy(self, dest, src, kind=None):
+        if (kind or self.kind(dest)) == 'float':
+            self.load_float(src, '%xmm0')
+            self.store_float(dest)
+        else:
+            self.load_int(src, '%eax')
+            self.store_int(dest)
+
+    def emit_binary(self, dest, op, left, right):
+        floating = 'float' in (self.kind(left), self.kind(right))
+        if op in ('&&', '||'):
+            self.truth(left, '%al')
+            self.truth(right, '%cl')
+            self.emit(f"{'andb' if op == '&&' else 'orb'} %cl, %al")
+            self.emit("movzbl %al, %eax")
+            self.store_int(dest)
+        elif op in INT_SETCC:
+            self.compare(left, right, op, floating)
+            self.emit("movzbl %al, %eax")
+            self.store_int(dest)
+        elif floating:
+            if op not in FLOAT_ARITH:
+                raise X86Error(f"{self.func.name}: '{op}' is not defined on float")
+            self.load_float(left, '%xmm0')
+            self.load_float(right, '%xmm1')
+            self.emit(f"{FLOAT_ARITH[op]} %xmm1, %xmm0")
+            self.store_float(dest)
+        elif op in ('/', '%'):
+            self.load_int(left, '%eax')
+            self.load_int(right, '%ecx')
+            self.emit("cltd")
+            self.emit("idivl %ecx")
+            self.store_int(dest, '%eax' if op == '/' else '%edx')
+        else:
+            self.load_int(left, '%eax')
+            self.load_int(right, '%ecx')
+            self.emit(f"{INT_ARITH[op]} %ecx, %eax")
+            self.store_int(dest)
+
+    def emit_unary(self, dest, op, src):
+        if op == '!':
+            self.truth(src, '%al')
+            self.emit("xorb $1, %al")
+            self.emit("movzbl %al, %eax")
+            self.store_int(dest)
+        elif op == '-' and self.kind(src) == 'float':
+            self.load_float(src, '%xmm0')
+            self.emit("movq %xmm0, %rax")
+            self.emit("btcq $63, %rax")     # flip the sign bit
+            self.emit("movq %rax, %xmm0")
+            self.store_float(dest)
+        elif op == '-':
+            self.load_int(src, '%eax')
+            self.emit("negl %eax")
+            self.store_int(dest)
+        else:
+            self.emit_copy(dest, src)
+
+    def emit_if(self, op, left, right, target):
+        floating = 'float' in (self.kind(left), self.kind(right))
+        label = self.label(target)
+        if not floating:
+            self.load_int(left, '%eax')
+            self.load_int(right, '%ecx')
+            self.emit("cmpl %ecx, %eax")
+            self.emit(f"{INT_JCC[op]} {label}")
+            return
+        self.compare(left, right, op, True)
+        self.emit("testb %al, %al")
+        self.emit(f"jne {label}")
+
+    def compare(self, left, right, op, floating):
+        """Set %al to 1 if 'left op right' holds, else 0."""
+        if not floating:
+            self.load_int(left, '%eax')
+            self.load_int(right, '%ecx')
+            self.emit("cmpl %ecx, %eax")
+            self.emit(f"{INT_SETCC[op]} %al")
+            return
+        if op in FLOAT_ORDER:
+            condition, swap = FLOAT_ORDER[op]
+            first, second = (right, left) if swap else (left, right)
+            self.load_float(first, '%xmm0')
+            self.load_float(second, '%xmm1')
+            self.emit("ucomisd %xmm1, %xmm0")
+            self.emit(f"set{condition} %al")
+            return
+        self.load_float(left, '%xmm0')
+        self.load_float(right, '%xmm1')
+        self.emit("ucomisd %xmm1, %xmm0")
+        if op == '==':
+            self.emit("sete %al")
+            self.emit("setnp %cl")      # unordered compares unequal
+            self.emit("andb %cl, %al")
+        else:
+            self.emit("setne %al")
+            self.emit("setp %cl")
+            self.emit("orb %cl, %al")
+
+    def truth(self, operand, reg8):
+        """Set reg8 to 1 if operand is non-zero."""
+        if self.kind(operand) == 'float':
+            self.load_float(operand, '%xmm0')
+            self.emit("xorpd %xmm1, %xmm1")
+            self.emit("ucomisd %xmm1, %xmm0")
+            self.emit(f"setne {reg8}")
+            self.emit("setp %dl")
+            self.emit(f"orb %dl, {reg8}")
+        else:
+            self.load_int(operand, '%edx')
+            self.emit("testl %edx, %edx")
+            self.emit(f"setne {reg8}")
+
+    # == Operands ===
+
+    def kind(self, operand):
+        """'float' or 'int' (char is an int here)."""
+        if is_const(operand):
+            return 'float' if is_float_literal(operand) else 'int'
+        kind = self.types.get(base_name(operand), 'int')
+        return 'float' if kind == 'float' else 'int'
+
+    def location(self, name):
+        return self.slots.get(name) or f"{name}(%rip)"
+
+    def label(self, name):
+        return f".L{name}"
+
+    def load_int(self, operand, reg):
+        if is_const(operand):
+            self.emit(f"movl ${int(float(operand))}, {reg}")
+        elif self.kind(operand) == 'float':
+            self.emit(f"cvttsd2si {self.location(operand)}, {reg}")
+        else:
+            self.emit(f"movl {self.location(operand)}, {reg}")
+
+    def load_float(self, operand, reg):
+        if is_const(operand):
+            value = float(operand)
+            label = self.literals.setdefault(value, f".LC{len(self.literals)}")
+            self.emit(f"movsd {label}(%rip), {reg}")
+        elif self.kind(operand) == 'float':
+            self.emit(f"movsd {self.location(operand)}, {reg}")
+        else:
+            self.emit(f"cvtsi2sdl {self.location(operand)}, {reg}")
+
+    def store_int(self, dest, reg='%eax'):
+        if self.kind(dest) == 'float':
+            self.emit(f"cvtsi2sdl {reg}, %xmm0")
+            self.store_float(dest)
+        else:
+            self.emit(f"movl {reg}, {self.location(dest)}")
+
+    def store_float(self, dest):
+        """Store %xmm0 into dest, converting or rounding to the type of dest."""
+        if self.kind(dest) != 'float':
+            self.emit(f"cvttsd2si %xmm0, %eax")
+            self.emit(f"movl %eax, {self.location(dest)}")
+            return
+        if self.declared(dest) == 'float':
+            self.emit("cvtsd2ss %xmm0, %xmm0")
+            self.emit("cvtss2sd %xmm0, %xmm0")
+        self.emit(f"movsd %xmm0, {self.location(dest)}")
+
+    def declared(self, name):
+        return self.func.declared_type(base_name(name))
+
+
+def generate_x86(ir_lines):
+    """x86-64 assembly lines for IR lines."""
+    return X86Generator(ir_lines).generate()
+
+
+def write_x86(lines, asm_filename='assembly_output.s'):
+    with open(asm_filename, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + "\n")
+    print(f"x86-64 assembly written to {asm_filename}")
+
+
+def generate_x86_from_ir(ir_filename='intermediate_code_output.txt', asm_filename='assembly_output.s'):
+    """Write the x86-64 translation of an IR file; returns the number of lines written."""
+    with open(ir_filename, 'r', encoding='utf-8') as f:
+        lines = generate_x86(f.readlines())
+    write_x86(lines, asm_filename)
+    return len(lines)
+
+
+if __name__ == '__main__':
+    # Usage: python x86_backend.py [intermediate_code_output.txt] [assembly_output.s]
+    try:
+        generate_x86_from_ir(*sys.argv[1:3])
+    except (OSError, X86Error) as e:
+        print(f"x86-64 code generation failed: {e}")
+        sys.exit(1)
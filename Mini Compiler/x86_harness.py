@@ -0,0 +1,147 @@
+from lexer import tokenize
+from parser import Parser
+from ir_generator import IRGenerator
+from optimizer import optimize_ir
+from x86_backend import generate_x86
+from benchmarks import SAMPLE_PROGRAM, CALL_PROGRAM, VM_PROGRAMS
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Programs that are valid C as well, so gcc can compile the same source
+FLOAT_PROGRAM = """
+float area(float r) {
+    return r * r * 3.5;
+}
+
+int main() {
+    float total;
+    int i;
+    total = 0.0;
+    for (i = 1; i <= 100; i = i + 1) {
+        total = total + area(i * 0.5);
+    }
+    if (total > 1000.0 && !(total < 0.0)) {
+        total = total / 100;
+    }
+    return total;
+}
+"""
+
+MANY_ARGS_PROGRAM = """
+int mix(int a, int b, int c, int d, int e, int f, int g, int h) {
+    return a - b + c * d - e / 2 + f % 5 - g + h * 3;
+}
+
+float blend(float a, int b, float c, int d) {
+    return a * b - c / d;
+}
+
+int main() {
+    int s;
+    int i;
+    s = 0;
+    for (i = -20; i < 20; i = i + 1) {
+        s = s + mix(i, 2, i, -3, i * 7, i, 1, -i);
+        s = s + blend(i * 1.5, i, 2.25, 4);
+    }
+    return s;
+}
+"""
+
+# Long enough for the run time to dominate process start-up
+HEAVY_PROGRAM = """
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+int main() {
+    int i;
+    int s;
+    s = 0;
+    for (i = 0; i < 3000000; i = i + 1) {
+        s = s + i % 7 * (i / 3);
+    }
+    return s + fib(30);
+}
+"""
+
+HARNESS_PROGRAMS = {
+    'sample': SAMPLE_PROGRAM,
+    'calls': CALL_PROGRAM,
+    'float': FLOAT_PROGRAM,
+    'many args': MANY_ARGS_PROGRAM,
+    'heavy': HEAVY_PROGRAM,
+}
+HARNESS_PROGRAMS.update(VM_PROGRAMS)
+
+
+def compile_to_x86(source, optimize=False):
+    """x86-64 assembly text for a Mini C program."""
+    program = Parser(tokenize(source)).parse()
+    ir_lines = IRGenerator(debug=False).generate(program)
+    if optimize:
+        ir_lines, _ = optimize_ir(ir_lines)
+    return "\n".join(generate_x86(ir_lines)) + "\n"
+
+
+def run_binary(path, repeat):
+    """Exit code of an executable and its fastest wall-clock time over repeat runs."""
+    best = None
+    code = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        code = subprocess.run([path]).returncode
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return code, best
+
+
+def check_program(name, source, workdir, optimize=False, repeat=3, cc='gcc'):
+    """Build a program with both compilers, run both and compare. Returns True on a match."""
+    stem = os.path.join(workdir, name.replace(' ', '_'))
+    with open(stem + '.c', 'w', encoding='utf-8') as f:
+        f.write(source)
+    with open(stem + '.s', 'w', encoding='utf-8') as f:
+        f.write(compile_to_x86(source, optimize))
+    subprocess.run([cc, '-o', stem + '.mini', stem + '.s'], check=True)
+    subprocess.run([cc, '-O0', '-w', '-o', stem + '.gcc', stem + '.c'], check=True)
+
+    mini_code, mini_time = run_binary(stem + '.mini', repeat)
+    gcc_code, gcc_time = run_binary(stem + '.gcc', repeat)
+    match = mini_code == gcc_code
+    print(f"  {name:<12} exit {mini_code:>3} / gcc {gcc_code:>3}  "
+          f"{mini_time * 1000:8.2f} ms / gcc {gcc_time * 1000:8.2f} ms  "
+          f"{'OK' if match else 'MISMATCH'}")
+    return match
+
+
+def run_harness(programs=None, optimize=False, repeat=3, cc='gcc'):
+    """Check every program against gcc -O0; returns the names of the mismatches."""
+    failed = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, source in (programs or HARNESS_PROGRAMS).items():
+            try:
+                if not check_program(name, source, workdir, optimize, repeat, cc):
+                    failed.append(name)
+            except subprocess.CalledProcessError as e:
+                print(f"  {name:<12} build failed: {e}")
+                failed.append(name)
+    return failed
+
+
+if __name__ == '__main__':
+    # Usage: python x86_harness.py [-O] [--repeat N] [--cc gcc]
+    args = sys.argv[1:]
+    repeat = int(args[args.index('--repeat') + 1]) if '--repeat' in args else 3
+    cc = args[args.index('--cc') + 1] if '--cc' in args else 'gcc'
+    print("Mini C Compiler - x86-64 backend vs gcc -O0")
+    print("=" * 50)
+    failed = run_harness(optimize='-O' in args, repeat=repeat, cc=cc)
+    print(f"\n{len(HARNESS_PROGRAMS) - len(failed)} of {len(HARNESS_PROGRAMS)} programs match")
+    sys.exit(1 if failed else 0)